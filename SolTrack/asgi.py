@@ -2,6 +2,12 @@
 ASGI config for SolTrack project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests for settings.LIVE_FEED_PATH go to the Server-Sent Events feed in
+dashboard/live.py; everything else is handled by Django.
+
+In production this is the Procfile's 'web' process. The dashboard pages and
+the JSON API are async views whose queries run on the async_db thread pool
+(see dashboard/async_db.py and 'manage.py bench_concurrency').
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -13,4 +19,14 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SolTrack.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up (the feed uses the ORM).
+from django.conf import settings  # noqa: E402
+from dashboard.live import live_feed_app  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] == settings.LIVE_FEED_PATH:
+        return await live_feed_app(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -56,15 +56,20 @@ INSTALLED_APPS = [
     'dashboard',
 ]
 
+# Everything here is async-capable, so under ASGI the async views run without
+# a thread per request; a single sync-only entry would undo that (see
+# dashboard/middleware.py). ProfilingMiddleware is sync-only but opt-in.
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'dashboard.middleware.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'dashboard.middleware.RPCStatsMiddleware',
+    'dashboard.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'SolTrack.urls'
@@ -155,3 +160,153 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Logging
+# The dashboard modules (worker, indexer, reconcile, bulk import, views) log
+# through logging.getLogger(__name__); their messages go to the console.
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'timestamped': {
+            'format': '[{asctime}] {levelname} {name}: {message}',
+            'datefmt': '%H:%M:%S',
+            'style': '{',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'timestamped',
+        },
+    },
+    'loggers': {
+        'dashboard': {
+            'handlers': ['console'],
+            'level': os.getenv('DASHBOARD_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+
+# Compiled contract artifacts (see dashboard/artifacts.py)
+# Built by 'python manage.py compile_contracts' at release time.
+
+SOLC_VERSION = os.getenv('SOLC_VERSION', '0.5.16')
+ARTIFACT_DIR = os.getenv('ARTIFACT_DIR', os.path.join(BASE_DIR, 'artifacts'))
+
+# Seconds to keep gas price / fee history / connectivity checks before asking
+# the RPC node again (see dashboard/chain_cache.py). chain_id is kept forever.
+CHAIN_METADATA_TTL = float(os.getenv('CHAIN_METADATA_TTL', '12'))
+
+# JSON-RPC batching (see dashboard/rpc.py). Calls issued while a batch is in
+# flight are always coalesced; RPC_BATCH_WINDOW adds an optional wait (seconds)
+# before sending to collect more of them.
+RPC_BATCH_WINDOW = float(os.getenv('RPC_BATCH_WINDOW', '0'))
+RPC_MAX_BATCH_SIZE = int(os.getenv('RPC_MAX_BATCH_SIZE', '50'))
+RPC_POOL_SIZE = int(os.getenv('RPC_POOL_SIZE', '10'))
+
+# Queued transaction jobs the worker signs with consecutive nonces and
+# broadcasts in one JSON-RPC batch (see dashboard/jobs.py send_queued_jobs).
+TX_SEND_BATCH = int(os.getenv('TX_SEND_BATCH', '50'))
+
+# Gas limit = eth_estimateGas result (cached per function and bytecode, see
+# dashboard/gas.py) times this margin.
+GAS_ESTIMATE_MARGIN = float(os.getenv('GAS_ESTIMATE_MARGIN', '1.2'))
+
+# CSV bulk imports (see dashboard/bulk.py): rows queued per transaction, and
+# the largest file accepted.
+BULK_IMPORT_CHUNK = int(os.getenv('BULK_IMPORT_CHUNK', '200'))
+BULK_IMPORT_MAX_ROWS = int(os.getenv('BULK_IMPORT_MAX_ROWS', '5000'))
+
+# Ids reserved per process for app-assigned primary keys (see dashboard/ids.py).
+# Larger blocks mean fewer writes to id_sequences but bigger gaps on restart.
+ID_BLOCK_SIZE = int(os.getenv('ID_BLOCK_SIZE', '10'))
+
+# Contracts per page on the active/completed listings (see dashboard/pagination.py).
+CONTRACTS_PAGE_SIZE = int(os.getenv('CONTRACTS_PAGE_SIZE', '24'))
+
+# Most changed contracts the JSON API returns for one ?since= poll (see
+# dashboard/api.py); past this the client is told to reload the listing.
+CONTRACTS_API_DELTA_LIMIT = int(os.getenv('CONTRACTS_API_DELTA_LIMIT', '500'))
+
+# Sensor telemetry ingest (see dashboard/telemetry.py). The endpoint is disabled
+# until a token is set.
+TELEMETRY_INGEST_TOKEN = os.getenv('TELEMETRY_INGEST_TOKEN', '')
+TELEMETRY_MAX_BATCH = int(os.getenv('TELEMETRY_MAX_BATCH', '10000'))
+
+# Prometheus scrape endpoint /metrics (see dashboard/metrics.py). Scrapers send
+# 'Authorization: Bearer <METRICS_TOKEN>'; when empty, only staff users see it.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Per-request query/template profiling (see dashboard/profiling.py): X-Profile-*
+# headers and a summary of the last PROFILING_WINDOW requests per view on
+# /dashboard/profiling/. Off unless PROFILING_ENABLED=1.
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', '0') == '1'
+PROFILING_WINDOW = int(os.getenv('PROFILING_WINDOW', '200'))
+
+# Threshold alerting (see dashboard/alerting.py): how long readings must stay
+# above a contract's threshold before it goes to Alert, and back at or below
+# it before it returns to OK.
+ALERT_BREACH_MINUTES = float(os.getenv('ALERT_BREACH_MINUTES', '5'))
+ALERT_CLEAR_MINUTES = float(os.getenv('ALERT_CLEAR_MINUTES', '5'))
+
+# Alert incidents (see dashboard/incidents.py): a breach that starts within
+# ALERT_MERGE_MINUTES of the previous one ending reopens that incident. The
+# alerts page shows the latest ALERT_RING_SIZE incidents from a per-process
+# buffer reloaded from the database every ALERT_RING_TTL seconds.
+ALERT_MERGE_MINUTES = float(os.getenv('ALERT_MERGE_MINUTES', '15'))
+ALERT_RING_SIZE = int(os.getenv('ALERT_RING_SIZE', '50'))
+ALERT_RING_TTL = float(os.getenv('ALERT_RING_TTL', '5'))
+
+# Transfer event indexer (see dashboard/indexer.py). Block ranges start at
+# INDEXER_BLOCK_RANGE and adapt to the node between 1 and INDEXER_MAX_BLOCK_RANGE;
+# a reorg of the last indexed block re-indexes the last INDEXER_REORG_DEPTH blocks.
+# A fresh index starts at INDEXER_START_BLOCK if set, otherwise at the block of
+# the earliest confirmed deployment, or INDEXER_INITIAL_WINDOW blocks before the
+# head when there is none (never from genesis).
+INDEXER_START_BLOCK = int(os.environ['INDEXER_START_BLOCK']) if os.getenv('INDEXER_START_BLOCK') else None
+INDEXER_INITIAL_WINDOW = int(os.getenv('INDEXER_INITIAL_WINDOW', '50000'))
+INDEXER_BLOCK_RANGE = int(os.getenv('INDEXER_BLOCK_RANGE', '2000'))
+INDEXER_MAX_BLOCK_RANGE = int(os.getenv('INDEXER_MAX_BLOCK_RANGE', '10000'))
+INDEXER_REORG_DEPTH = int(os.getenv('INDEXER_REORG_DEPTH', '12'))
+INDEXER_ADDRESS_BATCH = int(os.getenv('INDEXER_ADDRESS_BATCH', '500'))
+INDEXER_TARGET_LOGS = int(os.getenv('INDEXER_TARGET_LOGS', '5000'))
+
+# Status reconciliation against the chain (see dashboard/reconcile.py): open
+# contracts are checked RECONCILE_BATCH_SIZE at a time, and 'sent' jobs older
+# than RECONCILE_STALE_SECONDS are assumed to have been missed by the worker.
+RECONCILE_BATCH_SIZE = int(os.getenv('RECONCILE_BATCH_SIZE', '500'))
+RECONCILE_STALE_SECONDS = int(os.getenv('RECONCILE_STALE_SECONDS', '120'))
+
+# Caches. 'fragments' holds the rendered contract cards of the listings (see
+# dashboard/fragments.py). Any Django cache backend works: the default keeps
+# them per process; FileBasedCache or a Redis/Memcached backend shares them
+# between processes.
+FRAGMENT_CACHE_ALIAS = 'fragments'
+FRAGMENT_CACHE_TIMEOUT = int(os.getenv('FRAGMENT_CACHE_TIMEOUT', '3600'))
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    FRAGMENT_CACHE_ALIAS: {
+        'BACKEND': os.getenv('FRAGMENT_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('FRAGMENT_CACHE_LOCATION', 'contract-cards'),
+        'TIMEOUT': FRAGMENT_CACHE_TIMEOUT,
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('FRAGMENT_CACHE_MAX_ENTRIES', '5000'))},
+    },
+}
+
+# Threads the async views run their queries on under ASGI (see
+# dashboard/async_db.py); also the most database connections one worker opens
+# for them.
+ASYNC_DB_THREADS = int(os.getenv('ASYNC_DB_THREADS', '16'))
+
+# Server-Sent Events live feed (see dashboard/live.py), served by SolTrack/asgi.py.
+LIVE_FEED_PATH = '/dashboard/live/'
+LIVE_FEED_INTERVAL = float(os.getenv('LIVE_FEED_INTERVAL', '1'))
+LIVE_FEED_KEEPALIVE = float(os.getenv('LIVE_FEED_KEEPALIVE', '15'))
+LIVE_FEED_QUEUE_SIZE = int(os.getenv('LIVE_FEED_QUEUE_SIZE', '1000'))
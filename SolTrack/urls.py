@@ -17,8 +17,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from dashboard.views import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('',include('accounts.urls')),
     path('dashboard/',include('dashboard.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -0,0 +1,136 @@
+"""
+Threshold-breach evaluation for ingested temperature readings.
+
+evaluate_readings() runs on every ingest batch (see telemetry.write_readings).
+The batch is turned into NumPy arrays and compared against the thresholds of
+all Active contracts it touches in one pass. Consecutive readings on the
+same side of a threshold form a "run"; a contract goes to Alert once a run
+above its threshold has lasted ALERT_BREACH_MINUTES and back to OK once a
+run at or below it has lasted ALERT_CLEAR_MINUTES. A single spike or dip
+therefore never flips the state. Runs carry over between batches through the
+contract_health row, which also holds the state the views display.
+"""
+import datetime
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Contract, ContractHealth
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _to_ms(moment):
+    return (moment - _EPOCH) // datetime.timedelta(milliseconds=1)
+
+
+def _from_ms(ms):
+    return _EPOCH + datetime.timedelta(milliseconds=int(ms))
+
+
+def evaluate_readings(rows, now=None):
+    """
+    Updates contract_health from (contract_id, device_id, recorded_at,
+    temperature) rows and returns the state changes as a list of
+    (contract_id, new_state, started_at, peak_temperature) in time order.
+    started_at is when the run that caused the change began.
+    """
+    if not rows:
+        return []
+    now = now or timezone.now()
+    breach_ms = settings.ALERT_BREACH_MINUTES * 60_000
+    clear_ms = settings.ALERT_CLEAR_MINUTES * 60_000
+
+    thresholds = dict(
+        Contract.objects.filter(contract_id__in={row[0] for row in rows}, status='Active')
+        .values_list('contract_id', 'temperature_threshold')
+    )
+    rows = [row for row in rows if row[0] in thresholds]
+    if not rows:
+        return []
+    previous = ContractHealth.objects.in_bulk(list(thresholds))
+
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    times = np.fromiter((_to_ms(row[2]) for row in rows), dtype=np.int64, count=len(rows))
+    temps = np.fromiter((row[3] for row in rows), dtype=np.float64, count=len(rows))
+
+    # Sort by contract, then time; drop readings older than what was already evaluated.
+    order = np.lexsort((times, ids))
+    ids, times, temps = ids[order], times[order], temps[order]
+    contracts, inverse = np.unique(ids, return_inverse=True)
+    prev_latest = np.array(
+        [_to_ms(previous[c].latest_recorded_at) if c in previous else -1 for c in contracts.tolist()],
+        dtype=np.int64,
+    )
+    fresh = times > prev_latest[inverse]
+    if not fresh.all():
+        ids, times, temps = ids[fresh], times[fresh], temps[fresh]
+        if not len(ids):
+            return []
+        contracts, inverse = np.unique(ids, return_inverse=True)
+
+    threshold = np.array([thresholds[c] for c in contracts.tolist()])
+    above = temps > threshold[inverse]
+
+    # Runs: maximal stretches of one contract's readings on the same side.
+    n = len(ids)
+    first_of_contract = np.ones(n, dtype=bool)
+    first_of_contract[1:] = ids[1:] != ids[:-1]
+    run_starts = np.flatnonzero(first_of_contract | np.r_[True, above[1:] != above[:-1]])
+    run_ends = np.r_[run_starts[1:] - 1, n - 1]
+    run_above = above[run_starts]
+    run_contract = inverse[run_starts]
+    run_began = times[run_starts].copy()
+    run_peak = np.maximum.reduceat(temps, run_starts)
+
+    # A contract's first run continues the run stored in contract_health when
+    # it is on the same side of the threshold.
+    for r in np.flatnonzero(first_of_contract[run_starts]).tolist():
+        health = previous.get(int(contracts[run_contract[r]]))
+        if health is not None and health.above_threshold == bool(run_above[r]):
+            run_began[r] = _to_ms(health.run_started_at)
+
+    run_duration = times[run_ends] - run_began
+    breached = run_above & (run_duration >= breach_ms)
+    cleared = ~run_above & (run_duration >= clear_ms)
+
+    state = {c: (previous[c].state if c in previous else ContractHealth.STATE_OK) for c in contracts.tolist()}
+    changed_at = {}
+    changes = []
+    # Only runs long enough to matter are walked in Python; there are few.
+    for r in np.flatnonzero(breached | cleared).tolist():
+        contract_id = int(contracts[run_contract[r]])
+        new_state = ContractHealth.STATE_ALERT if breached[r] else ContractHealth.STATE_OK
+        if state[contract_id] != new_state:
+            state[contract_id] = new_state
+            changed_at[contract_id] = now
+            changes.append((contract_id, new_state, _from_ms(run_began[r]), float(run_peak[r])))
+
+    # Per contract: its last reading and the run that reading belongs to.
+    last_rows = np.r_[np.flatnonzero(first_of_contract)[1:] - 1, n - 1]
+    last_runs = np.r_[np.flatnonzero(first_of_contract[run_starts])[1:] - 1, len(run_starts) - 1]
+    ContractHealth.objects.bulk_create(
+        [
+            ContractHealth(
+                contract_id=contract_id,
+                state=state[contract_id],
+                state_changed_at=changed_at.get(
+                    contract_id, previous[contract_id].state_changed_at if contract_id in previous else None
+                ),
+                latest_temperature=float(temps[row]),
+                latest_recorded_at=_from_ms(times[row]),
+                above_threshold=bool(above[row]),
+                run_started_at=_from_ms(run_began[run]),
+            )
+            for contract_id, row, run in zip(contracts.tolist(), last_rows.tolist(), last_runs.tolist())
+        ],
+        update_conflicts=True,
+        unique_fields=['contract_id'],
+        update_fields=[
+            'state', 'state_changed_at', 'latest_temperature', 'latest_recorded_at',
+            'above_threshold', 'run_started_at', 'updated_at',
+        ],
+    )
+    changes.sort(key=lambda change: change[2])
+    return changes
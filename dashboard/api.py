@@ -0,0 +1,189 @@
+"""
+Read-only JSON API for contract state, built for cheap polling.
+
+Every change to a contract goes through ContractQuerySet.update_versioned(),
+which bumps contracts.version and contracts.updated_at. From those:
+
+- /api/contracts/<id>/ has the ETag "<id>-<version>" and Last-Modified
+  updated_at, so an unchanged contract costs one primary-key lookup and a
+  304 with no body.
+- /api/contracts/active/ and /api/contracts/completed/ have an ETag built
+  from MAX(updated_at) over the whole table (one read of the updated_at
+  index) plus the query string; nothing changed anywhere means 304.
+- The listings take ?since=<token from a previous response> and then only
+  return the contracts changed after it: rows still in the listing under
+  "contracts" and ids that left it under "removed". A client keeps its page
+  current by moving those rows instead of reloading the whole page.
+
+Contracts are never deleted by the app, so deletions are not reported.
+
+The views are async (see async_db): each loads what the conditional GET
+needs with one run_db() call, so @condition's ETag and Last-Modified
+functions read it from the request without querying, and a changed
+response costs one more call for its rows.
+"""
+import datetime
+import hashlib
+
+from django.conf import settings
+from django.db.models import Max
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import condition, require_GET
+
+from .async_db import run_db
+from .models import Contract
+from .pagination import keyset_page
+
+# Listing name -> (Contract.status, fields per row, newest first?)
+LISTINGS = {
+    'active': ('Active', ('contract_id', 'status', 'product_name', 'contract_address', 'end_date'), False),
+    'completed': ('Completed', ('contract_id', 'status', 'product_name', 'end_date', 'temperature_threshold'), True),
+}
+DETAIL_FIELDS = (
+    'contract_id', 'status', 'product_name', 'buyer_address', 'seller_address', 'quantity', 'price',
+    'start_date', 'end_date', 'contract_address', 'temperature_threshold',
+)
+
+# 'since' is the newest updated_at a response saw, but a change committed
+# just after it can carry a slightly earlier updated_at; re-sending this much
+# history catches it. Clients apply rows by id, so repeats are harmless.
+SINCE_OVERLAP = datetime.timedelta(seconds=2)
+
+
+def _row(contract, fields):
+    row = {}
+    for field in fields + ('version',):
+        value = getattr(contract, field)
+        if isinstance(value, datetime.datetime):
+            value = value.isoformat()
+        elif field == 'price':
+            value = str(value)
+        row[field] = value
+    return row
+
+
+def _json(payload, status=200):
+    response = JsonResponse(payload, status=status)
+    # Let browsers keep the body but always revalidate it.
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+# --- Conditional GET (Django's @condition calls these before the view) ---
+
+def _list_etag(request, listing):
+    latest = _table_updated_at(request)
+    raw = f"{listing}|{latest.isoformat() if latest else '-'}|{request.GET.urlencode()}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+
+def _list_last_modified(request, listing):
+    return _table_updated_at(request)
+
+
+def _latest_update():
+    return Contract.objects.aggregate(latest=Max('updated_at'))['latest']
+
+
+def _table_updated_at(request):
+    # Loaded by the view before @condition asks for the ETag and Last-Modified.
+    return request._contracts_updated_at
+
+
+def _load_contract(contract_id):
+    return Contract.objects.only(*DETAIL_FIELDS, 'version', 'updated_at').filter(contract_id=contract_id).first()
+
+
+def _contract(request, contract_id):
+    return request._contract
+
+
+def _contract_etag(request, contract_id):
+    contract = _contract(request, contract_id)
+    return f"{contract.contract_id}-{contract.version}" if contract else None
+
+
+def _contract_last_modified(request, contract_id):
+    contract = _contract(request, contract_id)
+    return contract.updated_at if contract else None
+
+
+# --- Rows ---
+
+def _listing_page(status, fields, after, descending):
+    rows, next_cursor = keyset_page(
+        Contract.objects.filter(status=status).only(*fields, 'version'), after, descending=descending,
+    )
+    return [_row(c, fields) for c in rows], next_cursor
+
+
+def _changed_since(since, fields, limit):
+    return list(
+        Contract.objects.filter(updated_at__gte=since - SINCE_OVERLAP)
+        .only(*fields, 'version', 'updated_at')
+        .order_by('updated_at')[:limit + 1]
+    )
+
+
+# --- Views ---
+
+@require_GET
+async def contract_list_api(request, listing):
+    request._contracts_updated_at = await run_db(_latest_update)
+    return await _contract_list(request, listing)
+
+
+@condition(etag_func=_list_etag, last_modified_func=_list_last_modified)
+async def _contract_list(request, listing):
+    if listing not in LISTINGS:
+        return _json({'error': f"Unknown listing '{listing}'."}, status=404)
+    status, fields, descending = LISTINGS[listing]
+    # The next token is the newest updated_at in the table, so polling an
+    # unchanged table repeats the same URL and gets the same ETag (a 304).
+    latest = _table_updated_at(request)
+
+    raw_since = request.GET.get('since')
+    if raw_since is None:
+        # 1. Full page, keyset-paginated like the HTML listing.
+        rows, next_cursor = await run_db(_listing_page, status, fields, request.GET.get('after'), descending)
+        return _json({
+            'contracts': rows,
+            'next': next_cursor,
+            'since': latest.isoformat() if latest else None,
+        })
+
+    # 2. Delta: every contract changed since the token, whatever its status now.
+    since = parse_datetime(raw_since)
+    if since is None or timezone.is_naive(since):
+        return _json({'error': "'since' must be a timestamp from a previous response."}, status=400)
+    next_since = max(since, latest) if latest else since
+
+    limit = settings.CONTRACTS_API_DELTA_LIMIT
+    changed = await run_db(_changed_since, since, fields, limit)
+    if len(changed) > limit:
+        # Cheaper for the client to reload the listing than to replay this.
+        return _json({'reset': True, 'since': next_since.isoformat()})
+
+    return _json({
+        'contracts': [_row(c, fields) for c in changed if c.status == status],
+        'removed': [c.contract_id for c in changed if c.status != status],
+        'since': next_since.isoformat(),
+    })
+
+
+@require_GET
+async def contract_detail_api(request, contract_id):
+    request._contract = await run_db(_load_contract, contract_id)
+    return await _contract_detail(request, contract_id)
+
+
+@condition(etag_func=_contract_etag, last_modified_func=_contract_last_modified)
+async def _contract_detail(request, contract_id):
+    contract = _contract(request, contract_id)
+    if contract is None:
+        return _json({'error': f"Contract {contract_id} not found."}, status=404)
+    row = _row(contract, DETAIL_FIELDS)
+    row['updated_at'] = contract.updated_at.isoformat()
+    return _json(row)
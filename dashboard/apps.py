@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dashboard'
+
+    def ready(self):
+        # Warm the in-memory artifact cache from disk (never compiles here).
+        from . import artifacts
+        artifacts.load_cached()
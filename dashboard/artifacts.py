@@ -0,0 +1,227 @@
+"""
+Compiled-artifact cache for the SimpleTransfer contract.
+
+Artifacts (ABI + bytecode) are keyed by the hash of the Solidity source, the
+solc version and the compiler settings, and are kept both in memory and on
+disk under settings.ARTIFACT_DIR. `python manage.py compile_contracts` builds
+them ahead of time and also stores them in the contract_artifacts registry:
+it runs as the Procfile release step, whose files do not reach the web and
+worker processes, so those load the artifact from the database when the
+file is missing. The deploy path only ever reads a cached artifact and fails
+with ArtifactMissing rather than running solc in a request.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+
+
+# Solidity Code (SimpleTransfer Contract)
+solidity_code = '''
+pragma solidity 0.5.16;
+
+contract SimpleTransfer {
+event Transfer(address indexed from, address indexed to, uint256 value);
+
+function Deposit(address payable _to) public payable {
+require(msg.value > 0, "Must send some Ether");
+_to.transfer(msg.value);
+emit Transfer(msg.sender, _to, msg.value);
+}
+
+function Refund(address payable _to) public payable {
+require(msg.value > 0, "Must send some Ether");
+_to.transfer(msg.value);
+emit Transfer(msg.sender, _to, msg.value);
+}
+
+}
+'''
+
+# Must match the pragma above; compile_source() is pinned to it.
+SOLC_VERSION = getattr(settings, 'SOLC_VERSION', '0.5.16')
+
+COMPILER_SETTINGS = {
+    'output_values': ['abi', 'bin'],
+    'optimize': False,
+}
+
+_memory_cache = {}
+_lock = threading.Lock()
+
+
+def artifact_key(source=solidity_code, solc_version=SOLC_VERSION, compiler_settings=COMPILER_SETTINGS):
+    """Returns the cache key for a (source, solc version, settings) triple."""
+    digest = hashlib.sha256()
+    digest.update(source.encode('utf-8'))
+    digest.update(str(solc_version).encode('utf-8'))
+    digest.update(json.dumps(compiler_settings, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _artifact_path(key):
+    return os.path.join(settings.ARTIFACT_DIR, f"{key}.json")
+
+
+def _read_from_disk(key):
+    try:
+        with open(_artifact_path(key), encoding='utf-8') as fh:
+            artifact = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    # A file left behind by an older key scheme is treated as a miss.
+    if artifact.get('key') != key:
+        return None
+    return artifact
+
+
+def _write_to_disk(artifact):
+    os.makedirs(settings.ARTIFACT_DIR, exist_ok=True)
+    # Write to a temp file first so concurrent workers never read half a file.
+    fd, tmp_path = tempfile.mkstemp(dir=settings.ARTIFACT_DIR, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+        json.dump(artifact, fh)
+    os.replace(tmp_path, _artifact_path(artifact['key']))
+
+
+def _compile(key, source, solc_version, compiler_settings):
+    # Imported here so that only the build step pays for loading solcx.
+    from solcx import compile_source, get_installed_solc_versions, install_solc
+
+    if solc_version not in {str(v) for v in get_installed_solc_versions()}:
+        install_solc(solc_version)
+
+    compiled_sol = compile_source(source, solc_version=solc_version, **compiler_settings)
+    contract_name, contract_interface = compiled_sol.popitem()
+    return {
+        'key': key,
+        'contract_name': contract_name.split(':')[-1],
+        'solc_version': str(solc_version),
+        'abi': contract_interface['abi'],
+        'bytecode': contract_interface['bin'],
+    }
+
+
+def load_cached(source=solidity_code):
+    """
+    Returns the artifact for `source` from memory or disk, or None if it has
+    not been built yet. Never invokes the compiler.
+    """
+    key = artifact_key(source)
+    artifact = _memory_cache.get(key)
+    if artifact is None:
+        artifact = _read_from_disk(key)
+        if artifact is not None:
+            _memory_cache[key] = artifact
+    return artifact
+
+
+def build_artifact(source=solidity_code, force=False):
+    """Compiles `source` (unless already cached) and stores the result on disk and in memory."""
+    key = artifact_key(source)
+    with _lock:
+        artifact = None if force else load_cached(source)
+        if artifact is None:
+            artifact = _compile(key, source, SOLC_VERSION, COMPILER_SETTINGS)
+            _write_to_disk(artifact)
+            _memory_cache[key] = artifact
+    return artifact
+
+
+class ArtifactMissing(Exception):
+    pass
+
+
+def _read_from_db(key):
+    from .models import ContractArtifact
+
+    row = ContractArtifact.objects.filter(artifact_key=key).exclude(bytecode='').first()
+    if row is None:
+        return None
+    return {
+        'key': key,
+        'contract_name': row.contract_name,
+        'solc_version': SOLC_VERSION,
+        'abi': row.abi,
+        'bytecode': row.bytecode,
+    }
+
+
+def get_artifact(source=solidity_code):
+    """
+    Returns the compiled artifact for `source` from memory, disk or the
+    contract_artifacts registry. Never compiles: raises ArtifactMissing if
+    compile_contracts has not run.
+    """
+    artifact = load_cached(source)
+    if artifact is None:
+        key = artifact_key(source)
+        artifact = _read_from_db(key)
+        if artifact is None:
+            raise ArtifactMissing(
+                f"No compiled SimpleTransfer artifact {key[:12]} in {settings.ARTIFACT_DIR} or contract_artifacts. "
+                "Run 'python manage.py compile_contracts' (the Procfile release step) and restart."
+            )
+        _memory_cache[key] = artifact
+    return artifact
+
+
+# --- ABI REGISTRY (contract_artifacts table) ---
+
+_registered_abis = {}  # abi_hash -> abi, for this process
+
+
+def abi_hash(abi):
+    """SHA-256 of the canonical ABI JSON; the contract_artifacts primary key."""
+    canonical = json.dumps(abi, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def register_abi(artifact):
+    """Ensures `artifact`'s ABI is in the registry and returns its abi_hash."""
+    from .models import ContractArtifact
+
+    key = abi_hash(artifact['abi'])
+    if key not in _registered_abis:
+        ContractArtifact.objects.get_or_create(
+            abi_hash=key,
+            defaults={
+                'contract_name': artifact.get('contract_name', ''),
+                'abi': artifact['abi'],
+                'bytecode': artifact.get('bytecode', ''),
+            },
+        )
+        _registered_abis[key] = artifact['abi']
+    return key
+
+
+def store_artifact(artifact):
+    """Saves `artifact` in the contract_artifacts registry under its abi_hash and artifact key."""
+    from .models import ContractArtifact
+
+    key = abi_hash(artifact['abi'])
+    ContractArtifact.objects.update_or_create(
+        abi_hash=key,
+        defaults={
+            'contract_name': artifact['contract_name'],
+            'abi': artifact['abi'],
+            'bytecode': artifact['bytecode'],
+            'artifact_key': artifact['key'],
+        },
+    )
+    _registered_abis[key] = artifact['abi']
+    return key
+
+
+def get_abi(key):
+    """Returns the ABI stored under `key`, loading it from the registry once per process."""
+    from .models import ContractArtifact
+
+    abi = _registered_abis.get(key)
+    if abi is None:
+        abi = ContractArtifact.objects.values_list('abi', flat=True).get(abi_hash=key)
+        _registered_abis[key] = abi
+    return abi
@@ -0,0 +1,48 @@
+"""
+Database access for the async views.
+
+Django's async ORM (aget(), ain_bulk(), async for) hands every query to
+sync_to_async(thread_sensitive=True). Under ASGI that thread is a new one
+for each request, so each request also opens a new database connection and
+pays a thread hand-off per query. The async views instead run each step's
+queries as one call on a fixed pool of ASYNC_DB_THREADS threads:
+
+- connections stay open per pool thread (CONN_MAX_AGE applies as under
+  WSGI), and at most ASYNC_DB_THREADS queries run at once however many
+  requests are waiting;
+- a waiting request is a coroutine on the event loop, not a held thread.
+
+Each call checks its thread's connection first with close_old_connections(),
+as Django does at the start of a request, and counts its queries towards the
+request's profile when profiling is on.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from .profiling import within_current
+
+_executor = None
+_lock = threading.Lock()
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(settings.ASYNC_DB_THREADS, thread_name_prefix='async-db')
+    return _executor
+
+
+def _call(fn, args, kwargs):
+    close_old_connections()
+    return within_current(fn, *args, **kwargs)
+
+
+async def run_db(fn, *args, **kwargs):
+    """Runs `fn(*args, **kwargs)`, which may use the ORM, on the database thread pool."""
+    return await sync_to_async(_call, thread_sensitive=False, executor=_pool())(fn, args, kwargs)
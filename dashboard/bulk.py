@@ -0,0 +1,258 @@
+"""
+Bulk contract creation from a CSV file.
+
+A CSV with one contract per row (buyer_address, seller_address, product_name,
+price, quantity) comes in through the upload form on the active listing or
+'python manage.py import_contracts'. It is handled in two steps:
+
+1. create_import() validates every row and stores it in bulk_import_rows,
+   with the reason for each row that is rejected.
+2. queue_import() turns the valid rows into Pending contracts and deploy
+   jobs, BULK_IMPORT_CHUNK rows at a time. Each chunk is one transaction of
+   bulk_create()s plus the import's next_line checkpoint, so an import that
+   stops halfway is resumed from the first line that is not queued yet.
+
+Sending and confirming is left to the transaction queue.
+jobs.send_queued_jobs() signs a whole batch of deploy jobs with consecutive
+nonces and broadcasts them in one JSON-RPC batch. The ReceiptWatcher then
+confirms them together once per block. import_results() reads each row's
+progress back from its job and contract.
+"""
+import csv
+import datetime
+import io
+import logging
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import artifacts
+from .ids import contract_ids
+from .models import BulkImport, BulkImportRow, Contract, TransactionJob
+
+# Accepted header names for each column (case-insensitive).
+COLUMNS = {
+    'buyer_address': ('buyer_address', 'buyer'),
+    'seller_address': ('seller_address', 'seller'),
+    'product_name': ('product_name', 'product'),
+    'price': ('price', 'payment_amount'),
+    'quantity': ('quantity',),
+}
+
+
+class BulkImportError(ValueError):
+    """The file as a whole cannot be imported (bad header, too many rows)."""
+
+
+logger = logging.getLogger(__name__)
+
+
+def _header_map(header):
+    names = [name.strip().lower() for name in header]
+    mapping = {}
+    for column, aliases in COLUMNS.items():
+        for alias in aliases:
+            if alias in names:
+                mapping[column] = names.index(alias)
+                break
+        else:
+            raise BulkImportError(f"Missing column '{column}' in the CSV header.")
+    return mapping
+
+
+def _validate(values):
+    """Returns (field values, list of problems) for one CSV row."""
+    from eth_utils import is_address
+
+    problems = []
+    for column in ('buyer_address', 'seller_address'):
+        if not is_address(values[column]):
+            problems.append(f"{column} is not an address")
+    if not values['product_name']:
+        problems.append("product_name is empty")
+    elif len(values['product_name']) > 100:
+        problems.append("product_name is longer than 100 characters")
+
+    try:
+        price = Decimal(values['price'])
+        if not price.is_finite() or price <= 0 or price != price.quantize(Decimal('0.01')) or price >= 10**10:
+            raise InvalidOperation
+    except InvalidOperation:
+        problems.append("price must be a positive amount with at most 2 decimals")
+        price = None
+    try:
+        quantity = int(values['quantity'])
+        if quantity <= 0:
+            raise ValueError
+    except ValueError:
+        problems.append("quantity must be a positive whole number")
+        quantity = None
+
+    fields = {
+        'buyer_address': values['buyer_address'][:42],
+        'seller_address': values['seller_address'][:42],
+        'product_name': values['product_name'][:100],
+        'price': price,
+        'quantity': quantity,
+    }
+    return fields, problems
+
+
+def parse_csv(text):
+    """
+    Parses CSV text into unsaved BulkImportRow objects, one per data line.
+    Rows that fail validation are kept with status 'invalid' and the reasons.
+    """
+    reader = csv.reader(io.StringIO(text))
+    header = next(reader, None)
+    if header is None:
+        raise BulkImportError("The CSV file is empty.")
+    mapping = _header_map(header)
+
+    rows = []
+    for cells in reader:
+        if not any(cell.strip() for cell in cells):
+            continue
+        if len(rows) >= settings.BULK_IMPORT_MAX_ROWS:
+            raise BulkImportError(f"More than {settings.BULK_IMPORT_MAX_ROWS} rows; split the file.")
+        values = {
+            column: cells[index].strip() if index < len(cells) else ''
+            for column, index in mapping.items()
+        }
+        fields, problems = _validate(values)
+        rows.append(BulkImportRow(
+            line_number=reader.line_num,
+            status=BulkImportRow.STATUS_INVALID if problems else BulkImportRow.STATUS_PENDING,
+            error='; '.join(problems),
+            **fields,
+        ))
+    return rows
+
+
+def create_import(text, source=''):
+    """Validates `text` and stores the import with all of its rows."""
+    rows = parse_csv(text)
+    with transaction.atomic():
+        bulk_import = BulkImport.objects.create(source=source[:255], total_rows=len(rows))
+        for row in rows:
+            row.bulk_import = bulk_import
+        BulkImportRow.objects.bulk_create(rows, batch_size=500)
+    invalid = sum(1 for row in rows if row.status == BulkImportRow.STATUS_INVALID)
+    logger.info("import #%s stored %s rows (%s invalid).", bulk_import.import_id, len(rows), invalid)
+    return bulk_import
+
+
+def queue_import(bulk_import, chunk_size=None):
+    """
+    Creates the Pending contracts and deploy jobs of every valid row from the
+    import's checkpoint on. Returns the number of rows queued by this call.
+    """
+    chunk_size = chunk_size or settings.BULK_IMPORT_CHUNK
+    artifact_id = artifacts.register_abi(artifacts.get_artifact())
+    queued = 0
+
+    while True:
+        rows = list(bulk_import.rows.filter(
+            line_number__gte=bulk_import.next_line, status=BulkImportRow.STATUS_PENDING,
+        ).order_by('line_number')[:chunk_size])
+        if not rows:
+            break
+
+        # 1. Ids are reserved outside the transaction (see dashboard/ids.py).
+        ids = contract_ids.allocate(len(rows))
+        now = timezone.now()
+
+        # 2. Contracts, jobs, rows and checkpoint commit together, so a chunk
+        #    is either fully queued or not at all.
+        with transaction.atomic():
+            Contract.objects.bulk_create([
+                Contract(
+                    contract_id=contract_id,
+                    buyer_address=row.buyer_address,
+                    seller_address=row.seller_address,
+                    product_name=row.product_name,
+                    quantity=row.quantity,
+                    price=row.price,
+                    start_date=now,
+                    end_date=now + datetime.timedelta(days=7),
+                    contract_address='0x',
+                    artifact_id=artifact_id,
+                    temperature_threshold=-8.0,
+                    status='Pending',
+                )
+                for row, contract_id in zip(rows, ids)
+            ])
+            job_objects = TransactionJob.objects.bulk_create([
+                TransactionJob(kind=TransactionJob.KIND_DEPLOY, contract_id=contract_id) for contract_id in ids
+            ])
+            for row, contract_id, job in zip(rows, ids, job_objects):
+                row.status = BulkImportRow.STATUS_QUEUED
+                row.contract_id = contract_id
+                row.job_id = job.job_id
+            BulkImportRow.objects.bulk_update(rows, ['status', 'contract_id', 'job_id'])
+
+            bulk_import.next_line = rows[-1].line_number + 1
+            bulk_import.error = ''
+            bulk_import.save(update_fields=['next_line', 'error', 'updated_at'])
+
+        queued += len(rows)
+        logger.info("import #%s queued lines %s-%s (contracts %s-%s).", bulk_import.import_id,
+                    rows[0].line_number, rows[-1].line_number, ids[0], ids[-1])
+
+    bulk_import.state = BulkImport.STATE_QUEUED
+    bulk_import.save(update_fields=['state', 'updated_at'])
+    return queued
+
+
+def record_failure(bulk_import, error):
+    """Stores why queuing stopped; the checkpoint says where to resume."""
+    bulk_import.error = str(error)
+    bulk_import.save(update_fields=['error', 'updated_at'])
+    logger.warning("import #%s stopped before line %s: %s", bulk_import.import_id, bulk_import.next_line, error)
+
+
+# Deploy progress of a queued row, from its job state.
+ROW_PROGRESS = {
+    TransactionJob.STATE_QUEUED: 'queued',
+    TransactionJob.STATE_SENT: 'sent',
+    TransactionJob.STATE_CONFIRMED: 'deployed',
+    TransactionJob.STATE_FAILED: 'failed',
+}
+
+
+def import_results(bulk_import):
+    """Returns (per-row result dicts in line order, {progress: count})."""
+    rows = list(bulk_import.rows.order_by('line_number'))
+    queued = [row for row in rows if row.status == BulkImportRow.STATUS_QUEUED]
+    job_map = TransactionJob.objects.only('state', 'tx_hash', 'error').in_bulk([row.job_id for row in queued])
+    addresses = dict(Contract.objects.filter(
+        contract_id__in=[row.contract_id for row in queued]
+    ).values_list('contract_id', 'contract_address'))
+
+    results = []
+    counts = {}
+    for row in rows:
+        job = job_map.get(row.job_id)
+        if row.status != BulkImportRow.STATUS_QUEUED:
+            progress = row.status
+        else:
+            progress = ROW_PROGRESS[job.state] if job else 'queued'
+        counts[progress] = counts.get(progress, 0) + 1
+        results.append({
+            'row': row,
+            'progress': progress,
+            'contract_address': addresses.get(row.contract_id) if progress == 'deployed' else None,
+            'tx_hash': job.tx_hash if job else '',
+            'error': row.error or (job.error if job else ''),
+        })
+    return results, counts
+
+
+def open_deploy_jobs(bulk_import):
+    """Deploy jobs of the import that are not confirmed or failed yet."""
+    return TransactionJob.objects.filter(
+        job_id__in=bulk_import.rows.filter(status=BulkImportRow.STATUS_QUEUED).values('job_id'),
+        state__in=TransactionJob.OPEN_STATES,
+    )
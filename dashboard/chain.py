@@ -0,0 +1,76 @@
+"""
+Lazily built, per-process Web3 connection and deployer account.
+
+Nothing chain-related happens at import time: the provider, the signer and
+the web3 package itself are only loaded the first time get_client() is
+called. Read-only views, manage.py commands and tests therefore never pay
+for it, and a missing SEPOLIA_RPC_URL / DEPLOYER_PRIVATE_KEY only matters to
+code that actually talks to the chain. warm_up() builds the client ahead of
+time; gunicorn.conf.py calls it after each worker boots when CHAIN_WARMUP=1.
+"""
+import os
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+
+class ChainClient:
+    def __init__(self, rpc_url, private_key):
+        from eth_account import Account
+        from web3 import Web3
+
+        from .rpc import BatchingHTTPProvider
+
+        if not rpc_url:
+            raise ImproperlyConfigured("SEPOLIA_RPC_URL is not set.")
+        if not private_key:
+            raise ImproperlyConfigured("DEPLOYER_PRIVATE_KEY is not set.")
+
+        self.web3 = Web3(BatchingHTTPProvider(
+            rpc_url,
+            window=settings.RPC_BATCH_WINDOW,
+            max_batch_size=settings.RPC_MAX_BATCH_SIZE,
+            pool_size=settings.RPC_POOL_SIZE,
+        ))
+        # Get the deployer account address from the private key
+        self.deployer_account = Account.from_key(private_key)
+        self.deployer_address = self.deployer_account.address # The address used for transactions
+        self.deployer_private_key = private_key
+
+
+def get_client():
+    """Returns this process's ChainClient, building it on first use."""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _lock:
+            # Re-check under the lock; also rebuild after a fork so worker
+            # processes never share the parent's HTTP connection pool.
+            if _client is None or _client_pid != pid:
+                _client = ChainClient(os.getenv("SEPOLIA_RPC_URL"), os.getenv("DEPLOYER_PRIVATE_KEY"))
+                _client_pid = pid
+    return _client
+
+
+def get_web3():
+    return get_client().web3
+
+
+def warm_up(connect=True):
+    """
+    Builds the client ahead of the first request. With `connect`, also
+    fetches chain_id so the first transaction does not pay for it.
+    """
+    client = get_client()
+    if connect:
+        from .chain_cache import chain_metadata
+        chain_metadata.chain_id
+    return client
@@ -0,0 +1,115 @@
+"""
+Process-local cache for chain metadata.
+
+chain_id never changes for a given RPC endpoint, so it is fetched once. Gas
+price, fee history and the connectivity check change every block or so and
+are kept for a short TTL; the worker can also refresh them from a background
+thread so the send path never waits on them. Hit/miss counters are kept per
+key for monitoring.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from .chain import get_web3
+
+logger = logging.getLogger(__name__)
+
+
+class ChainMetadata:
+    def __init__(self, web3=None, ttl=None):
+        self._web3 = web3
+        self.ttl = ttl if ttl is not None else settings.CHAIN_METADATA_TTL
+        self._lock = threading.Lock()
+        self._values = {}   # key -> (value, expires_at); expires_at None = permanent
+        self._loaders = {}  # key -> (loader, ttl), so refresh() can reload entries
+        self._counters = {}
+        self._refresher = None
+
+    @property
+    def web3(self):
+        # Without an explicit instance, use the lazily built per-process client.
+        return self._web3 if self._web3 is not None else get_web3()
+
+    def _count(self, key, outcome):
+        counters = self._counters.setdefault(key, {'hits': 0, 'misses': 0})
+        counters[outcome] += 1
+
+    def _store(self, key, value, ttl):
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._values[key] = (value, expires_at)
+
+    def _get(self, key, loader, ttl):
+        now = time.monotonic()
+        with self._lock:
+            self._loaders.setdefault(key, (loader, ttl))
+            cached = self._values.get(key)
+            if cached is not None and (cached[1] is None or cached[1] > now):
+                self._count(key, 'hits')
+                return cached[0]
+            self._count(key, 'misses')
+
+        # Load outside the lock so one slow RPC call does not block other keys.
+        value = loader()
+        self._store(key, value, ttl)
+        return value
+
+    @property
+    def chain_id(self):
+        return self._get('chain_id', lambda: self.web3.eth.chain_id, ttl=None)
+
+    @property
+    def gas_price(self):
+        return self._get('gas_price', lambda: self.web3.eth.gas_price, ttl=self.ttl)
+
+    def fee_history(self, block_count=5, reward_percentiles=(25, 50, 75)):
+        key = f"fee_history:{block_count}:{','.join(map(str, reward_percentiles))}"
+        return self._get(
+            key,
+            lambda: self.web3.eth.fee_history(block_count, 'latest', list(reward_percentiles)),
+            ttl=self.ttl,
+        )
+
+    def is_connected(self):
+        return self._get('is_connected', self.web3.is_connected, ttl=self.ttl)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._values.clear()
+            else:
+                self._values.pop(key, None)
+
+    def refresh(self):
+        """Reloads every short-lived entry (not chain_id) ahead of its expiry."""
+        with self._lock:
+            loaders = {key: entry for key, entry in self._loaders.items() if entry[1] is not None}
+        for key, (loader, ttl) in loaders.items():
+            self._store(key, loader(), ttl)
+
+    def start_background_refresh(self, interval=None):
+        """Starts a daemon thread that refreshes fee data every `interval` seconds."""
+        if self._refresher is not None:
+            return
+        interval = interval or self.ttl / 2
+
+        def run():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.warning("Chain metadata refresh failed: %s", e)
+                time.sleep(interval)
+
+        self._refresher = threading.Thread(target=run, name='chain-metadata-refresh', daemon=True)
+        self._refresher.start()
+
+    def stats(self):
+        with self._lock:
+            return {key: dict(counters) for key, counters in self._counters.items()}
+
+
+chain_metadata = ChainMetadata()
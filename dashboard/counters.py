@@ -0,0 +1,55 @@
+"""
+Counter rows that hand out blocks of consecutive values.
+
+Contract ids (dashboard/ids.py, id_sequences) and deployer nonces
+(dashboard/nonces.py, deployer_nonces) both keep the next value to hand out
+in one row and reserve from it with a single UPDATE, which holds the row
+(Postgres) or database (SQLite) write lock until commit, so two processes
+never get the same block.
+
+SQLite answers a competing writer on a shared-cache database (Django's
+in-memory test database) with "database table is locked" straight away
+instead of waiting for the busy timeout; the reservation is retried a few
+times with a short backoff in that case.
+"""
+import time
+
+from django.db import OperationalError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+SQLITE_LOCK_RETRIES = 8
+SQLITE_LOCK_BACKOFF = 0.005  # seconds, doubled on each retry
+
+
+def _sqlite_locked(error):
+    return connection.vendor == 'sqlite' and 'locked' in str(error)
+
+
+def _reserve(model, key, field, count, first_value):
+    rows = model.objects.filter(pk=key)
+    increment = {field: F(field) + count, 'updated_at': timezone.now()}
+    with transaction.atomic():
+        if not rows.update(**increment):
+            first = first_value()
+            _, created = model.objects.get_or_create(pk=key, defaults={field: first + count})
+            if created:
+                return first
+            # Another process created the row first; reserve from it.
+            rows.update(**increment)
+        return rows.values_list(field, flat=True).get() - count
+
+
+def reserve_block(model, key, field, count, first_value):
+    """
+    Adds `count` to `field` of the `model` row with primary key `key` and
+    returns the first value of the reserved block. A missing row is created,
+    starting at `first_value()`.
+    """
+    for attempt in range(SQLITE_LOCK_RETRIES):
+        try:
+            return _reserve(model, key, field, count, first_value)
+        except OperationalError as e:
+            if not _sqlite_locked(e) or attempt == SQLITE_LOCK_RETRIES - 1:
+                raise
+        time.sleep(SQLITE_LOCK_BACKOFF * 2 ** attempt)
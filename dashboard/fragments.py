@@ -0,0 +1,42 @@
+"""
+Fragment caching for the contract cards on the active/completed listings.
+
+Each card in the templates is wrapped in {% cache %} on the
+settings.FRAGMENT_CACHE_ALIAS cache, keyed by everything the card renders
+from:
+
+- contract id and version: update_versioned() bumps the version on every
+  status or address change, e.g. when process_contract_action's job confirms;
+- the contract_health stamp: moves whenever an ingest batch brings a newer
+  reading or an Alert/OK change;
+- the latest transaction job and its state (active cards only).
+
+A change to any of them yields a new key, so nothing is ever deleted
+explicitly; superseded entries age out through the cache's TIMEOUT and
+MAX_ENTRIES. The Success/Refund buttons on the active cards submit through
+one page-level form (each button sets its own formaction), so the
+per-session CSRF token is rendered once per page and never cached.
+"""
+from django.conf import settings
+
+
+def health_stamp(health):
+    """Cache-key part for a contract_health row (or its absence)."""
+    if health is None:
+        return '-'
+    return f"{int(health.updated_at.timestamp() * 1000)}"
+
+
+def job_stamp(job):
+    """Cache-key part for a contract's latest transaction job (or none)."""
+    if job is None:
+        return '-'
+    return f"{job.job_id}.{job.state}"
+
+
+def card_cache_context():
+    """Template variables read by the {% cache %} tags around the cards."""
+    return {
+        'card_cache_alias': settings.FRAGMENT_CACHE_ALIAS,
+        'card_cache_timeout': settings.FRAGMENT_CACHE_TIMEOUT,
+    }
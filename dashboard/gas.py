@@ -0,0 +1,137 @@
+"""
+Process-local cache of gas limits for the transactions the worker sends.
+
+Every SimpleTransfer deployment and every call of the same function on it
+costs the same gas, so eth_estimateGas is called once per (function selector,
+bytecode hash) and the result, plus GAS_ESTIMATE_MARGIN, is reused as the gas
+limit. Deployments use the selector 'constructor'. Compared with a flat
+2,000,000 this reserves far less of the deployer's balance per pending
+transaction.
+
+A call that forwards value costs 25,000 more gas (G_newaccount) when its
+recipient is an empty account (no balance, nonce or code, EIP-161), so the
+key also records that: recipient_kind() is NEW_ACCOUNT for those calls and
+'' otherwise. An account that is not empty stays so, and is remembered.
+
+An entry is dropped when a transaction built from it runs out of gas or the
+node rejects it for its gas, so the next one is estimated again.
+"""
+import threading
+
+from django.conf import settings
+
+DEPLOY_SELECTOR = 'constructor'
+NEW_ACCOUNT = 'new-account'
+# Node error messages that mean the gas limit was wrong.
+GAS_ERRORS = ('intrinsic gas too low', 'out of gas', 'gas required exceeds', 'exceeds block gas limit')
+
+
+def code_hash(bytecode):
+    from eth_utils import keccak
+
+    return '0x' + keccak(hexstr=bytecode).hex()
+
+
+def function_selector(abi, name):
+    """4-byte selector of the function `name` in `abi`, as 0x-prefixed hex."""
+    from eth_utils import function_abi_to_4byte_selector
+
+    for entry in abi:
+        if entry.get('type') == 'function' and entry.get('name') == name:
+            return '0x' + function_abi_to_4byte_selector(entry).hex()
+    raise ValueError(f"Function {name} is not in the ABI.")
+
+
+def is_gas_error(error):
+    message = str(error).lower()
+    return any(text in message for text in GAS_ERRORS)
+
+
+class GasEstimates:
+    def __init__(self, margin=None):
+        self._margin = margin
+        self._lock = threading.Lock()
+        self._limits = {}        # (selector, code hash, recipient kind) -> gas limit
+        self._code_hashes = {}   # artifact abi_hash -> code hash
+        self._live_accounts = set()  # lowercase addresses known not to be empty
+        self._counters = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    @property
+    def margin(self):
+        return self._margin if self._margin is not None else settings.GAS_ESTIMATE_MARGIN
+
+    def artifact_code_hash(self, artifact_id):
+        """Code hash of a registered artifact (its ABI hash if the bytecode was never stored)."""
+        from .models import ContractArtifact
+
+        with self._lock:
+            cached = self._code_hashes.get(artifact_id)
+        if cached is None:
+            bytecode = ContractArtifact.objects.values_list('bytecode', flat=True).get(abi_hash=artifact_id)
+            cached = code_hash(bytecode) if bytecode else f"abi:{artifact_id}"
+            with self._lock:
+                self._code_hashes[artifact_id] = cached
+        return cached
+
+    def recipient_kind(self, web3, transaction, recipient):
+        """NEW_ACCOUNT if `transaction` sends value and `recipient` is an empty account, else ''."""
+        if not transaction.get('value'):
+            return ''
+        address = recipient.lower()
+        with self._lock:
+            if address in self._live_accounts:
+                return ''
+
+        responses = web3.provider.make_batch_request([
+            (method, [recipient, 'latest']) for method in ('eth_getBalance', 'eth_getTransactionCount', 'eth_getCode')
+        ])
+        if not isinstance(responses, list) or any('error' in response for response in responses):
+            raise ValueError(f"Could not look up recipient {recipient} for the gas estimate.")
+        balance, nonce, code = (response['result'] for response in responses)
+        if int(balance, 16) == 0 and int(nonce, 16) == 0 and code in ('0x', ''):
+            return NEW_ACCOUNT
+        with self._lock:
+            self._live_accounts.add(address)
+        return ''
+
+    def gas_limit(self, web3, key, transaction):
+        """
+        Returns the gas limit for `transaction` (a built transaction dict),
+        estimating it the first time `key` is seen.
+        """
+        with self._lock:
+            limit = self._limits.get(key)
+            self._counters['hits' if limit is not None else 'misses'] += 1
+        if limit is not None:
+            return limit
+
+        # Estimate outside the lock so one slow RPC call does not block other keys.
+        limit = int(self._estimate(web3, transaction) * self.margin)
+        with self._lock:
+            self._limits[key] = limit
+        return limit
+
+    def _estimate(self, web3, transaction):
+        # Raw provider call: web3.eth.estimate_gas() runs the validation
+        # middleware, which asks the node for eth_chainId every time.
+        call = {field: transaction[field] for field in ('from', 'to', 'data') if transaction.get(field)}
+        call['value'] = hex(transaction.get('value', 0))
+        response = web3.provider.make_request('eth_estimateGas', [call])
+        if 'error' in response:
+            raise ValueError(f"Gas estimation failed: {response['error'].get('message', response['error'])}")
+        return int(response['result'], 16)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._limits.clear()
+                self._live_accounts.clear()
+            elif self._limits.pop(key, None) is not None:
+                self._counters['invalidations'] += 1
+
+    def stats(self):
+        with self._lock:
+            return {**self._counters, 'keys': len(self._limits)}
+
+
+gas_estimates = GasEstimates()
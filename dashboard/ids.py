@@ -0,0 +1,68 @@
+"""
+Block-reserving id allocator for tables whose ids are assigned by the app.
+
+Each process reserves a block of ids from the id_sequences table with one
+UPDATE and then hands them out from memory, so creating a contract no longer
+scans contracts for MAX(contract_id) and two concurrent creates can never pick
+the same id. Ids reserved by a process that exits are skipped, so the
+sequence may have gaps; it never repeats.
+"""
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.db.transaction import TransactionManagementError
+
+from .counters import reserve_block
+from .models import IdSequence
+
+
+class BlockAllocator:
+    def __init__(self, name, seed, block_size=None):
+        """
+        `seed` is called once, when the sequence row does not exist yet, and
+        returns the highest id already in use.
+        """
+        self.name = name
+        self.seed = seed
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0  # exclusive
+        self._lock = threading.Lock()
+
+    def _reserve(self, count):
+        # Must commit on its own: if it were rolled back together with the
+        # caller's transaction, another process could be given the same block.
+        if transaction.get_connection().in_atomic_block:
+            raise TransactionManagementError(
+                f"Allocate '{self.name}' ids before opening a transaction."
+            )
+        return reserve_block(
+            IdSequence, self.name, 'next_value', count, first_value=lambda: (self.seed() or 0) + 1,
+        )
+
+    def allocate(self, count=1):
+        """Returns `count` consecutive unused ids as a list."""
+        block_size = self.block_size or settings.ID_BLOCK_SIZE
+        with self._lock:
+            if count > self._end - self._next:
+                # Whatever is left of the current block is abandoned so the
+                # ids returned are always consecutive.
+                size = max(count, block_size)
+                self._next = self._reserve(size)
+                self._end = self._next + size
+            first = self._next
+            self._next += count
+        return list(range(first, first + count))
+
+    def next_id(self):
+        return self.allocate(1)[0]
+
+
+def _max_contract_id():
+    from .models import Contract
+    return Contract.objects.aggregate(max_id=Max('contract_id'))['max_id']
+
+
+contract_ids = BlockAllocator('contracts.contract_id', seed=_max_contract_id)
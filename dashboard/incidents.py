@@ -0,0 +1,133 @@
+"""
+Alert incidents: stored breach intervals plus a process-local ring buffer.
+
+record_changes() turns the Alert/OK transitions reported by
+dashboard.alerting into alert_incidents rows. An Alert opens an incident, or
+reopens the contract's last one when it closed less than
+ALERT_MERGE_MINUTES before the new breach began, so a flapping sensor shows
+up as one incident with a breach_count rather than a wall of duplicates. An
+OK closes the open incident.
+
+The alerts page reads from RecentIncidents, a ring buffer of the latest
+ALERT_RING_SIZE incidents. Incidents recorded by this process are pushed
+into it after commit; when it is full the oldest closed incident makes room,
+and an open one only when nothing but open incidents is left; it is reloaded from the database (two indexed,
+LIMITed queries) when it is older than ALERT_RING_TTL seconds, so changes
+made by other processes show up within that delay. Either way the page
+costs the same no matter how many readings or incidents exist.
+"""
+import datetime
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import AlertIncident, Contract, ContractHealth
+
+
+class RecentIncidents:
+    def __init__(self, size=None, ttl=None):
+        self.size = size or settings.ALERT_RING_SIZE
+        self.ttl = ttl if ttl is not None else settings.ALERT_RING_TTL
+        self._lock = threading.Lock()
+        self._ring = deque()  # oldest push first; bounded by push()
+        self._loaded_at = None
+
+    def _load(self):
+        open_incidents = list(
+            AlertIncident.objects.filter(ended_at__isnull=True).order_by('-started_at')[:self.size]
+        )
+        closed = list(
+            AlertIncident.objects.filter(ended_at__isnull=False).order_by('-ended_at')[:self.size - len(open_incidents)]
+        )
+        return closed[::-1] + open_incidents[::-1]  # oldest first, like push()
+
+    def push(self, incident):
+        with self._lock:
+            for i, existing in enumerate(self._ring):
+                if existing.incident_id == incident.incident_id:
+                    del self._ring[i]
+                    break
+            self._ring.append(incident)
+            if len(self._ring) > self.size:
+                self._ring.remove(self._eviction_candidate())
+
+    def _eviction_candidate(self):
+        # Under self._lock. Like _load(), keep open incidents over closed ones.
+        for existing in self._ring:
+            if not existing.is_open:
+                return existing
+        return min(self._ring, key=lambda i: i.started_at)
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def snapshot(self):
+        """Returns the buffered incidents: open ones first, then the most recently closed."""
+        now = time.monotonic()
+        with self._lock:
+            fresh = self._loaded_at is not None and now - self._loaded_at < self.ttl
+        if not fresh:
+            incidents = self._load()
+            with self._lock:
+                self._ring = deque(incidents)
+                self._loaded_at = now
+        with self._lock:
+            incidents = list(self._ring)
+
+        open_incidents = sorted((i for i in incidents if i.is_open), key=lambda i: i.started_at, reverse=True)
+        closed = sorted((i for i in incidents if not i.is_open), key=lambda i: i.ended_at, reverse=True)
+        return open_incidents + closed
+
+
+recent_incidents = RecentIncidents()
+
+
+def record_changes(changes):
+    """
+    Applies (contract_id, new_state, started_at, peak_temperature) changes
+    from alerting.evaluate_readings(). Must run inside the ingest transaction;
+    the ring buffer is only updated once it commits.
+    """
+    if not changes:
+        return []
+
+    contract_ids = {change[0] for change in changes}
+    thresholds = dict(
+        Contract.objects.filter(contract_id__in=contract_ids).values_list('contract_id', 'temperature_threshold')
+    )
+    merge_window = datetime.timedelta(minutes=settings.ALERT_MERGE_MINUTES)
+    touched = {}
+
+    for contract_id, new_state, started_at, peak in changes:
+        latest = touched.get(contract_id) or (
+            AlertIncident.objects.filter(contract_id=contract_id).order_by('-started_at').first()
+        )
+
+        if new_state == ContractHealth.STATE_ALERT:
+            if latest is not None and (latest.is_open or started_at - latest.ended_at <= merge_window):
+                latest.ended_at = None
+                latest.breach_count += 1
+                latest.peak_temperature = max(latest.peak_temperature, peak)
+                latest.save(update_fields=['ended_at', 'breach_count', 'peak_temperature', 'updated_at'])
+            else:
+                latest = AlertIncident.objects.create(
+                    contract_id=contract_id,
+                    threshold=thresholds.get(contract_id, 0.0),
+                    started_at=started_at,
+                    peak_temperature=peak,
+                )
+        elif latest is not None and latest.is_open:
+            # started_at of an OK change is when readings went back under the threshold.
+            latest.ended_at = started_at
+            latest.save(update_fields=['ended_at', 'updated_at'])
+        else:
+            continue
+        touched[contract_id] = latest
+
+    incidents = list(touched.values())
+    transaction.on_commit(lambda: [recent_incidents.push(incident) for incident in incidents])
+    return incidents
@@ -0,0 +1,218 @@
+"""
+Incremental indexer for SimpleTransfer Transfer(from, to, value) events.
+
+'python manage.py index_transfers' runs TransferIndexer, which walks the
+chain from its checkpoint to the head and stores every Transfer log emitted
+by a known contract address in transfer_events. Each step is a single
+JSON-RPC batch: one eth_getLogs per INDEXER_ADDRESS_BATCH addresses over the
+same block range, plus eth_getBlockByNumber for the hash of the range's last
+block. The events and the new checkpoint are written in one transaction, so
+a crash never loses or duplicates a range.
+
+Block ranges adapt to the node: a range the node rejects (too wide, too
+many results, timeout) is halved and retried; ranges that come back with
+few logs grow again, up to INDEXER_MAX_BLOCK_RANGE.
+
+A fresh index (no checkpoint) starts at INDEXER_START_BLOCK when set.
+Otherwise it starts at the block of the earliest confirmed deployment,
+taken from that job's receipt, rather than scanning from genesis. If
+contracts exist that no deploy job covers, or there is no deployment yet,
+it starts no further back than INDEXER_INITIAL_WINDOW blocks before the
+head. Older history can be fetched with --from-block.
+
+Reorgs: the checkpoint stores the hash of the last indexed block. If the
+chain no longer has that hash at that height, the last INDEXER_REORG_DEPTH
+blocks are deleted and indexed again. Deeper reorgs need a manual
+--from-block rescan.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Contract, IndexerCheckpoint, TransactionJob, TransferEvent
+from .receipts import fetch_receipts
+
+CHECKPOINT_NAME = 'transfer_events'
+# keccak256("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+
+
+logger = logging.getLogger(__name__)
+
+
+class LogRangeError(Exception):
+    """The node refused an eth_getLogs range."""
+
+
+def _topic_address(topic):
+    from eth_utils import to_checksum_address
+
+    return to_checksum_address('0x' + topic[-40:])
+
+
+class TransferIndexer:
+    def __init__(self, web3, name=CHECKPOINT_NAME, block_range=None, reorg_depth=None):
+        self.web3 = web3
+        self.name = name
+        self.block_range = block_range or settings.INDEXER_BLOCK_RANGE
+        self.reorg_depth = reorg_depth or settings.INDEXER_REORG_DEPTH
+        self.round_trips = 0
+        self.shrinks = 0
+
+    # --- RPC ---
+
+    def _batch(self, calls):
+        self.round_trips += 1
+        responses = self.web3.provider.make_batch_request(calls)
+        if not isinstance(responses, list):
+            # A single error object comes back when the node rejects the batch.
+            raise ConnectionError(f"Indexer batch failed: {responses.get('error')}")
+        return responses
+
+    def _block_hash(self, number):
+        block = self._batch([('eth_getBlockByNumber', [hex(number), False])])[0].get('result')
+        return block['hash'] if block else None
+
+    def _fetch(self, from_block, to_block, address_chunks):
+        """Returns (raw logs, hash of to_block) for one block range."""
+        calls = [
+            ('eth_getLogs', [{
+                'fromBlock': hex(from_block),
+                'toBlock': hex(to_block),
+                'address': chunk,
+                'topics': [TRANSFER_TOPIC],
+            }])
+            for chunk in address_chunks
+        ]
+        calls.append(('eth_getBlockByNumber', [hex(to_block), False]))
+        responses = self._batch(calls)
+
+        logs = []
+        for response in responses[:-1]:
+            if 'error' in response:
+                raise LogRangeError(response['error'].get('message', response['error']))
+            logs.extend(response['result'])
+        block = responses[-1].get('result')
+        if not block:
+            raise ConnectionError(f"Block {to_block} not available yet.")
+        return logs, block['hash']
+
+    # --- Checkpoint ---
+
+    def _initial_block(self, head):
+        """Where an index without a checkpoint starts (see the module docstring)."""
+        if settings.INDEXER_START_BLOCK is not None:
+            return settings.INDEXER_START_BLOCK
+
+        window_start = max(0, head - settings.INDEXER_INITIAL_WINDOW)
+        deploys = TransactionJob.objects.filter(kind=TransactionJob.KIND_DEPLOY, state=TransactionJob.STATE_CONFIRMED)
+        first_hash = deploys.order_by('job_id').values_list('tx_hash', flat=True).first()
+        receipt = fetch_receipts(self.web3, [first_hash])[0] if first_hash else None
+        if receipt is None:
+            logger.info("no deployment receipt; starting at block %s. Set INDEXER_START_BLOCK to go further back.", window_start)
+            return window_start
+
+        # Contracts deployed before the job queue existed have no deploy job.
+        untracked = set(self._addresses().values()) - set(deploys.values_list('contract_id', flat=True))
+        return min(receipt.blockNumber, window_start) if untracked else receipt.blockNumber
+
+    def _start_block(self, from_block, head):
+        """First block to index, after undoing a reorg below the checkpoint if there was one."""
+        if from_block is not None:
+            self._rewind(from_block)
+            return from_block
+
+        checkpoint = IndexerCheckpoint.objects.filter(name=self.name).first()
+        if checkpoint is None:
+            return self._initial_block(head)
+        if self._block_hash(checkpoint.block_number) == checkpoint.block_hash:
+            return checkpoint.block_number + 1
+
+        start = max(checkpoint.block_number - self.reorg_depth + 1, settings.INDEXER_START_BLOCK or 0)
+        logger.warning("block %s was reorged; re-indexing from block %s.", checkpoint.block_number, start)
+        self._rewind(start)
+        return start
+
+    def _rewind(self, start):
+        with transaction.atomic():
+            TransferEvent.objects.filter(block_number__gte=start).delete()
+            IndexerCheckpoint.objects.filter(name=self.name, block_number__gte=start).delete()
+
+    # --- Indexing ---
+
+    def _addresses(self):
+        """{lower-case address: contract_id} for every deployed contract."""
+        return {
+            address.lower(): contract_id
+            for contract_id, address in Contract.objects.exclude(contract_address__isnull=True)
+            .values_list('contract_id', 'contract_address')
+            if address and len(address) == 42 and address.startswith('0x')
+        }
+
+    def _events(self, logs, addresses):
+        return [
+            TransferEvent(
+                contract_id=addresses[log['address'].lower()],
+                contract_address=log['address'],
+                block_number=int(log['blockNumber'], 16),
+                block_hash=log['blockHash'],
+                tx_hash=log['transactionHash'],
+                log_index=int(log['logIndex'], 16),
+                from_address=_topic_address(log['topics'][1]),
+                to_address=_topic_address(log['topics'][2]),
+                value=int(log['data'], 16),
+            )
+            for log in logs
+            if not log.get('removed') and log['address'].lower() in addresses and len(log['topics']) == 3
+        ]
+
+    def run(self, from_block=None, to_block=None):
+        """
+        Indexes from the checkpoint (or `from_block`) up to `to_block`
+        (default: the current head). Returns a summary dict.
+        """
+        head = self.web3.eth.block_number if to_block is None else to_block
+        addresses = self._addresses()
+        batch = settings.INDEXER_ADDRESS_BATCH
+        address_list = sorted(addresses)
+        address_chunks = [address_list[i:i + batch] for i in range(0, len(address_list), batch)]
+
+        start = position = self._start_block(from_block, head)
+        stored = 0
+        while position <= head:
+            end = min(position + self.block_range - 1, head)
+            span = end - position + 1  # less than block_range near the head
+            try:
+                logs, block_hash = self._fetch(position, end, address_chunks)
+            except LogRangeError as e:
+                if end == position:
+                    raise
+                self.block_range = max(1, span // 2)
+                self.shrinks += 1
+                logger.info("node refused blocks %s-%s (%s); range is now %s.", position, end, e, self.block_range)
+                continue
+
+            events = self._events(logs, addresses)
+            with transaction.atomic():
+                TransferEvent.objects.bulk_create(events, ignore_conflicts=True)
+                IndexerCheckpoint.objects.update_or_create(
+                    name=self.name, defaults={'block_number': end, 'block_hash': block_hash},
+                )
+            stored += len(events)
+            position = end + 1
+
+            # Grow again while responses stay small; shrink before hitting provider result caps.
+            if len(logs) > settings.INDEXER_TARGET_LOGS:
+                self.block_range = max(1, span // 2)
+            elif len(logs) < settings.INDEXER_TARGET_LOGS // 4:
+                self.block_range = min(self.block_range * 2, settings.INDEXER_MAX_BLOCK_RANGE)
+
+        return {
+            'from_block': start,
+            'to_block': head,
+            'addresses': len(addresses),
+            'events': stored,
+            'round_trips': self.round_trips,
+            'block_range': self.block_range,
+        }
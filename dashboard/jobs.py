@@ -0,0 +1,457 @@
+"""
+Persistent transaction job queue.
+
+The views only enqueue work; 'python manage.py run_tx_worker' signs, sends and
+confirms it. Every state change is stored in transaction_jobs, so a restarted
+worker picks up where the previous one stopped.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import artifacts, gas
+from .chain import get_client
+from .chain_cache import chain_metadata
+from .gas import gas_estimates
+from .ids import contract_ids
+from .metrics import JOBS, STAGE_SECONDS, span
+from .models import Contract, TransactionJob
+from .nonces import allocate_nonce, resync_nonce
+from .receipts import fetch_receipts
+
+MAX_ATTEMPTS = 5
+GAS_LIMIT = 2000000        # only while building; the limit sent comes from dashboard/gas.py
+FUND_AMOUNT_ETH = 0.05     # initial Refund to the seller when a contract is created
+ACTION_AMOUNT_ETH = 0.001  # Placeholder for transaction execution
+
+ACTION_KINDS = {
+    'complete': TransactionJob.KIND_COMPLETE,
+    'refund': TransactionJob.KIND_REFUND,
+}
+
+# SimpleTransfer function each kind of job calls
+JOB_FUNCTIONS = {
+    TransactionJob.KIND_FUND: 'Refund',
+    TransactionJob.KIND_COMPLETE: 'Deposit',
+    TransactionJob.KIND_REFUND: 'Refund',
+}
+
+# Error prefix of 'sent' jobs whose broadcast failed in transport: the node may
+# or may not hold them, so the same signed bytes are broadcast again.
+BROADCAST_FAILED = 'Broadcast failed: '
+
+# Contract.status once each kind of job is confirmed on chain
+CONFIRMED_STATUS = {
+    TransactionJob.KIND_FUND: 'Active',
+    TransactionJob.KIND_COMPLETE: 'Completed',
+    TransactionJob.KIND_REFUND: 'Refunded',
+}
+
+logger = logging.getLogger(__name__)
+
+
+# --- ENQUEUE (called from the views) ---
+
+def enqueue_deploy(BuyerAddress, SellerAddress, ProductName, PaymentAmount, Quantity):
+    """
+    Saves the contract as 'Pending' and queues its deployment. The worker
+    fills in contract_address and activates it once the chain confirms.
+    """
+    artifact = artifacts.get_artifact()
+    next_contract_id = contract_ids.next_id()
+
+    with span('enqueue'), transaction.atomic():
+        Contract.objects.create(
+            contract_id=next_contract_id,
+            buyer_address=BuyerAddress,
+            seller_address=SellerAddress,
+            product_name=ProductName,
+            quantity=Quantity,
+            price=PaymentAmount,
+            start_date=timezone.now(),
+            end_date=timezone.now() + timezone.timedelta(days=7),
+            contract_address='0x',
+            artifact_id=artifacts.register_abi(artifact),
+            temperature_threshold=-8.0,
+            status='Pending',
+        )
+        job = TransactionJob.objects.create(kind=TransactionJob.KIND_DEPLOY, contract_id=next_contract_id)
+
+    JOBS.inc(kind=job.kind, outcome='queued')
+    return job
+
+
+def enqueue_action(contract_id, action):
+    """
+    Queues a 'complete' (Deposit to seller) or 'refund' (Refund to buyer)
+    transaction. Returns the already open job if one exists for the contract.
+    """
+    kind = ACTION_KINDS.get(action)
+    if kind is None:
+        raise ValueError(f"Invalid contract action received: {action}")
+
+    with span('enqueue'), transaction.atomic():
+        contract_db = Contract.objects.get(contract_id=contract_id)
+        if contract_db.status != 'Active':
+            raise ValueError(f"Contract ID {contract_id} is {contract_db.status}, not Active.")
+
+        open_job = TransactionJob.objects.filter(
+            contract_id=contract_id, state__in=TransactionJob.OPEN_STATES
+        ).first()
+        if open_job is not None:
+            logger.info("Contract ID %s already has open job #%s; not queuing %s.", contract_id, open_job.job_id, action)
+            return open_job
+
+        job = TransactionJob.objects.create(kind=kind, contract_id=contract_id)
+
+    JOBS.inc(kind=kind, outcome='queued')
+    return job
+
+
+# --- SEND (worker) ---
+
+def _gas_key(job, contract_db, recipient_kind=''):
+    """Gas cache key of the job's transaction: (function selector, bytecode hash, recipient kind)."""
+    if job.kind == TransactionJob.KIND_DEPLOY:
+        return gas.DEPLOY_SELECTOR, gas.code_hash(artifacts.get_artifact()['bytecode']), ''
+    abi = artifacts.get_abi(contract_db.artifact_id)
+    return (
+        gas.function_selector(abi, JOB_FUNCTIONS[job.kind]),
+        gas_estimates.artifact_code_hash(contract_db.artifact_id),
+        recipient_kind,
+    )
+
+
+def _forget_gas(job):
+    """Drops the cached gas limits used for `job`, so the next one is estimated again."""
+    contract_db = Contract.objects.only('artifact_id').get(contract_id=job.contract_id)
+    for recipient_kind in ('', gas.NEW_ACCOUNT):
+        gas_estimates.invalidate(_gas_key(job, contract_db, recipient_kind))
+
+
+def _build_transaction(client, job, nonce):
+    web3 = client.web3
+    with span('db_fetch'):
+        contract_db = Contract.objects.get(contract_id=job.contract_id)
+    tx_params = {
+        'chainId': chain_metadata.chain_id,
+        'from': client.deployer_address,
+        'nonce': nonce,
+        'gasPrice': chain_metadata.gas_price,
+        'gas': GAS_LIMIT,  # set explicitly so web3 does not estimate every transaction
+    }
+
+    recipient = None
+    if job.kind == TransactionJob.KIND_DEPLOY:
+        artifact = artifacts.get_artifact()
+        SimpleTransfer = web3.eth.contract(abi=artifact['abi'], bytecode=artifact['bytecode'])
+        tx_data = SimpleTransfer.constructor().build_transaction(tx_params)
+    else:
+        contract = web3.eth.contract(address=contract_db.contract_address, abi=artifacts.get_abi(contract_db.artifact_id))
+        function = getattr(contract.functions, JOB_FUNCTIONS[job.kind])
+        if job.kind == TransactionJob.KIND_FUND:
+            tx_params['value'] = web3.to_wei(FUND_AMOUNT_ETH, 'ether')
+            recipient = contract_db.seller_address
+        else:
+            tx_params['value'] = web3.to_wei(ACTION_AMOUNT_ETH, 'ether')
+            recipient = contract_db.seller_address if job.kind == TransactionJob.KIND_COMPLETE else contract_db.buyer_address
+        tx_data = function(recipient).build_transaction(tx_params)
+
+    with span('gas_estimate'):
+        recipient_kind = gas_estimates.recipient_kind(web3, tx_data, recipient) if recipient else ''
+        tx_data['gas'] = gas_estimates.gas_limit(web3, _gas_key(job, contract_db, recipient_kind), tx_data)
+    return tx_data
+
+
+def _fail_job(job, error):
+    job.state = TransactionJob.STATE_FAILED
+    job.error = str(error)
+    job.save(update_fields=['state', 'error', 'updated_at'])
+    JOBS.inc(kind=job.kind, outcome='failed')
+    if job.kind in (TransactionJob.KIND_DEPLOY, TransactionJob.KIND_FUND):
+        Contract.objects.filter(contract_id=job.contract_id).update_versioned(status='Failed')
+    logger.error("Job #%s FAILED: %s", job.job_id, error)
+
+
+def _retry_later(job, error, keep_nonce=False):
+    """
+    Discards the job's signed transaction and queues it to be signed again.
+    Only for transactions that will never be mined: not built, mined and
+    reverted, or shown by the chain not to have been accepted. With
+    `keep_nonce` the job is signed again at the nonce it holds, which no
+    transaction has used, so later transactions are not left behind a gap.
+    """
+    if gas.is_gas_error(error):
+        _forget_gas(job)
+    job.refresh_from_db()
+    if job.attempts >= MAX_ATTEMPTS:
+        _fail_job(job, error)
+        return
+    job.state = TransactionJob.STATE_QUEUED
+    if not keep_nonce:
+        job.nonce = None
+    job.gas_limit = None
+    job.tx_hash = ''
+    job.raw_tx = ''
+    job.error = str(error)
+    job.save(update_fields=['state', 'nonce', 'gas_limit', 'tx_hash', 'raw_tx', 'error', 'updated_at'])
+    JOBS.inc(kind=job.kind, outcome='requeued')
+    logger.warning("Job #%s send failed (attempt %s/%s), re-queued: %s", job.job_id, job.attempts, MAX_ATTEMPTS, error)
+
+
+def _not_accepted(web3, rejected):
+    """
+    Returns the (job, error) pairs the node answered with an error and whose
+    own transaction it does not know. The error alone proves nothing: 'already
+    known' or 'nonce too low' also come back when a different transaction
+    holds the nonce (after a resync, or another worker's). So each job's hash
+    is looked up, in one batch. A job the node knows, pending or mined, keeps
+    its signed transaction and stays 'sent' for the receipt watcher; signing
+    it again at a new nonce would pay twice. If the lookup gets no answer,
+    the jobs stay 'sent' and are broadcast again on the next pass.
+    """
+    try:
+        responses = web3.provider.make_batch_request(
+            [('eth_getTransactionByHash', [job.tx_hash]) for job, _ in rejected]
+        )
+    except Exception as e:
+        responses = {'error': e}
+    if not isinstance(responses, list) or any('error' in response for response in responses):
+        error = responses.get('error') if isinstance(responses, dict) else 'transaction lookup failed'
+        TransactionJob.objects.filter(job_id__in=[job.job_id for job, _ in rejected]).update(
+            error=f"{BROADCAST_FAILED}{error}",
+        )
+        logger.warning("Could not look up %s rejected job(s) (%s); sending them again.", len(rejected), error)
+        return []
+
+    not_accepted = []
+    for (job, error), response in zip(rejected, responses):
+        if response.get('result'):
+            TransactionJob.objects.filter(job_id=job.job_id).update(error=str(error))
+            logger.info("Job #%s: node answered '%s' but has its transaction; keeping it sent.", job.job_id, error)
+        else:
+            not_accepted.append((job, error))
+    return not_accepted
+
+
+def _broadcast(web3, signed_jobs):
+    """
+    Sends the signed jobs in one JSON-RPC batch. Returns (rejected, failure):
+    the (job, error) pairs the node answered with a JSON-RPC error, and the
+    error if the batch as a whole got no answer. Only the former are
+    rejections; after a timeout the node may well hold every transaction.
+    """
+    try:
+        with span('broadcast'):
+            responses = web3.provider.make_batch_request(
+                [('eth_sendRawTransaction', [job.raw_tx]) for job in signed_jobs]
+            )
+    except Exception as e:
+        return [], e
+    if not isinstance(responses, list):
+        # A single error object comes back when the node refuses the batch.
+        return [], responses.get('error')
+    return [
+        (job, response['error'].get('message', response['error']))
+        for job, response in zip(signed_jobs, responses)
+        if 'error' in response
+    ], None
+
+
+def _sign_queued(client, limit):
+    """
+    Claims up to `limit` queued jobs, signs them with a block of nonces and
+    stores the signed transactions. Returns (signed_jobs, build_failed).
+    """
+    build_failed = []
+    signed_jobs = []
+
+    with transaction.atomic():
+        with span('claim'):
+            claimed = list(
+                TransactionJob.objects.select_for_update(skip_locked=True)
+                .filter(state=TransactionJob.STATE_QUEUED).order_by('job_id')[:limit]
+            )
+        if not claimed:
+            return signed_jobs, build_failed
+        # Jobs re-queued with their nonce (see _retry_later) keep it; the rest
+        # take consecutive nonces from a freshly reserved block.
+        fresh = sum(1 for job in claimed if job.nonce is None)
+        with span('nonce'):
+            next_fresh = allocate_nonce(client.web3, client.deployer_address, count=fresh) if fresh else None
+
+        now = timezone.now()
+        for job in claimed:
+            # A job that fails to build does not use up a nonce; the next one takes it.
+            nonce = next_fresh if job.nonce is None else job.nonce
+            try:
+                with span('build'):
+                    tx_data = _build_transaction(client, job, nonce)
+                with span('sign'):
+                    signed_txn = client.deployer_account.sign_transaction(tx_data)
+            except Exception as e:
+                build_failed.append((job, e))
+                continue
+            if job.nonce is None:
+                next_fresh += 1
+            job.state = TransactionJob.STATE_SENT
+            job.nonce = nonce
+            job.gas_limit = tx_data['gas']
+            job.tx_hash = signed_txn.hash.to_0x_hex()
+            job.raw_tx = signed_txn.raw_transaction.to_0x_hex()
+            job.attempts += 1
+            job.error = ''
+            job.updated_at = now
+            signed_jobs.append(job)
+        with span('store'):
+            TransactionJob.objects.bulk_update(
+                signed_jobs, ['state', 'nonce', 'gas_limit', 'tx_hash', 'raw_tx', 'attempts', 'error', 'updated_at'],
+            )
+    return signed_jobs, build_failed
+
+
+def send_queued_jobs(limit=None):
+    """
+    Signs up to `limit` (default TX_SEND_BATCH) queued jobs with consecutive
+    nonces and broadcasts them together. Returns the number sent.
+
+    1. In one transaction: claim the jobs (rows locked by other workers are
+       skipped), reserve a block of nonces, sign, and store every signed
+       transaction before anything is broadcast.
+    2. Broadcast all of them in a single eth_sendRawTransaction batch; the
+       node accepts them in nonce order.
+    3. Jobs that could not be built, or that the node rejected and does not
+       hold, go back to the queue, and the nonce counter is resynced from
+       the node, never below a nonce an open job holds (dashboard/nonces.py).
+       A re-queued job whose nonce later sent jobs wait behind keeps it.
+
+    Several workers may run this at once: claims skip rows another worker
+    has locked, and nonce blocks and resyncs go through the counter row.
+
+    If the batch got no answer at all (e.g. a timeout), its jobs stay 'sent'
+    and their stored transactions are broadcast again, ahead of the next
+    batch; a second send of the same bytes cannot be mined twice.
+    """
+    client = get_client()
+    web3 = client.web3
+    limit = limit or settings.TX_SEND_BATCH
+    undelivered = list(TransactionJob.objects.filter(
+        state=TransactionJob.STATE_SENT, error__startswith=BROADCAST_FAILED,
+    ).order_by('nonce'))
+    signed_jobs, build_failed = _sign_queued(client, limit)
+
+    outgoing = undelivered + signed_jobs
+    rejected, failure = _broadcast(web3, outgoing) if outgoing else ([], None)
+    if failure is not None:
+        TransactionJob.objects.filter(job_id__in=[job.job_id for job in outgoing]).update(
+            error=f"{BROADCAST_FAILED}{failure}",
+        )
+        logger.warning("Broadcast of %s job(s) got no answer (%s); sending the same transactions again.", len(outgoing), failure)
+        outgoing = []
+    elif undelivered:
+        TransactionJob.objects.filter(job_id__in=[job.job_id for job in undelivered]).update(error='')
+    requeue = _not_accepted(web3, rejected) if rejected else []
+
+    pending = web3.eth.get_transaction_count(client.deployer_address, 'pending') if build_failed or requeue else None
+    for job, error in build_failed:
+        TransactionJob.objects.filter(job_id=job.job_id).update(attempts=F('attempts') + 1)
+        _retry_later(job, error, keep_nonce=True)
+    for job, error in requeue:
+        # At or above the pending count nothing holds the nonce yet. If sent
+        # jobs with higher nonces wait behind it, sign it again at the same one.
+        gap = job.nonce >= pending and TransactionJob.objects.filter(
+            state=TransactionJob.STATE_SENT, nonce__gt=job.nonce,
+        ).exists()
+        _retry_later(job, error, keep_nonce=gap)
+    if build_failed or requeue:
+        resync_nonce(web3, client.deployer_address, pending)
+
+    requeued_ids = {job.job_id for job, _ in requeue}
+    for job in outgoing:
+        if job.job_id not in requeued_ids:
+            JOBS.inc(kind=job.kind, outcome='sent')
+    return len(outgoing) - len(requeue)
+
+
+# --- CONFIRM (worker) ---
+
+def apply_receipts(settled):
+    """
+    Applies a batch of (job, receipt) pairs from the ReceiptWatcher in a
+    single DB transaction: marks jobs confirmed/failed, fills in deployed
+    contract addresses, queues initial funding and updates Contract.status.
+    """
+    if not settled:
+        return 0
+
+    confirmed_ids = []
+    deployed = []          # Contract rows with their new contract_address
+    status_updates = {}    # new status -> [contract_id, ...]
+    now = timezone.now()
+
+    with span('apply_receipts'), transaction.atomic():
+        # The reconciliation sweep (dashboard/reconcile.py) can pick up the
+        # same receipts as the worker; only jobs still 'sent' are applied.
+        still_sent = set(TransactionJob.objects.select_for_update().filter(
+            job_id__in=[job.job_id for job, _ in settled], state=TransactionJob.STATE_SENT,
+        ).values_list('job_id', flat=True))
+
+        for job, receipt in settled:
+            if job.job_id not in still_sent:
+                continue
+            if receipt.status != 1:
+                if job.gas_limit and receipt.gasUsed >= job.gas_limit:
+                    # Ran out of gas: re-estimate and send it again.
+                    _retry_later(job, f"Out of gas in block {receipt.blockNumber} (limit {job.gas_limit}).")
+                else:
+                    _fail_job(job, f"Transaction failed on-chain in block {receipt.blockNumber}.")
+                continue
+
+            confirmed_ids.append(job.job_id)
+            if job.kind == TransactionJob.KIND_DEPLOY:
+                deployed.append(Contract(
+                    contract_id=job.contract_id,
+                    contract_address=receipt.contractAddress,
+                    version=F('version') + 1,
+                    updated_at=timezone.now(),
+                ))
+            else:
+                status_updates.setdefault(CONFIRMED_STATUS[job.kind], []).append(job.contract_id)
+            # Receipt wait: from storing the signed transaction to seeing it mined.
+            STAGE_SECONDS.observe((now - job.updated_at).total_seconds(), stage='receipt_wait')
+            JOBS.inc(kind=job.kind, outcome='confirmed')
+
+        TransactionJob.objects.filter(job_id__in=confirmed_ids).update(
+            state=TransactionJob.STATE_CONFIRMED, updated_at=timezone.now()
+        )
+        if deployed:
+            Contract.objects.bulk_update(deployed, ['contract_address', 'version', 'updated_at'])
+            TransactionJob.objects.bulk_create([
+                TransactionJob(kind=TransactionJob.KIND_FUND, contract_id=c.contract_id) for c in deployed
+            ])
+        for status, contract_ids in status_updates.items():
+            Contract.objects.filter(contract_id__in=contract_ids).update_versioned(status=status)
+
+    return len(confirmed_ids)
+
+
+def resume_sent_jobs():
+    """
+    Re-broadcasts every 'sent' job that has no receipt yet. Called when the
+    worker starts, in case a previous worker died between saving and sending.
+    """
+    web3 = get_client().web3
+    sent_jobs = list(TransactionJob.objects.filter(state=TransactionJob.STATE_SENT))
+    receipts = fetch_receipts(web3, [job.tx_hash for job in sent_jobs])
+    for job, receipt in zip(sent_jobs, receipts):
+        if receipt is not None:
+            continue
+        try:
+            web3.eth.send_raw_transaction(job.raw_tx)
+            logger.info("Job #%s re-broadcast after restart. Hash: %s", job.job_id, job.tx_hash)
+        except Exception as e:
+            # Usually 'already known' (still in the mempool) or 'nonce too low' (mined).
+            logger.info("Job #%s re-broadcast skipped: %s", job.job_id, e)
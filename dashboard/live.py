@@ -0,0 +1,230 @@
+"""
+Server-Sent Events feed of per-contract temperature, Alert/OK and contract
+status changes.
+
+live_feed_app is a raw ASGI app that SolTrack/asgi.py mounts at
+settings.LIVE_FEED_PATH, in front of Django, so an open dashboard tab costs
+one idle coroutine and no thread. All connections in a process share one
+LiveFeed: a single task polls contract_health and contracts (both indexed on
+updated_at) every LIVE_FEED_INTERVAL seconds while anyone is connected and
+fans the changed rows out to each connection's queue as 'reading' and
+'contract' events. A hundred open tabs still mean two queries per interval.
+
+The poll runs outside Django's request cycle, so it calls
+close_old_connections() itself before and after each poll, as a request
+would; a connection dropped by a database restart or idle timeout is
+replaced instead of failing every poll from then on.
+
+A client that falls LIVE_FEED_QUEUE_SIZE events behind is disconnected;
+EventSource reconnects on its own and the page already shows the rendered
+state.
+"""
+import asyncio
+import datetime
+import json
+import logging
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import Contract, ContractHealth
+
+logger = logging.getLogger(__name__)
+
+# Rows committed slightly after a poll can carry an earlier updated_at than
+# the newest row that poll saw; re-reading this much history catches them.
+POLL_OVERLAP = datetime.timedelta(seconds=2)
+POLL_LIMIT = 1000
+
+
+def _event(health):
+    return {
+        'event': 'reading',
+        'contract_id': health.contract_id,
+        'temperature': health.latest_temperature,
+        'recorded_at': health.latest_recorded_at.isoformat(),
+        'state': health.state,
+    }
+
+
+def _contract_event(contract):
+    return {
+        'event': 'contract',
+        'contract_id': contract.contract_id,
+        'status': contract.status,
+        'contract_address': contract.contract_address,
+        'version': contract.version,
+    }
+
+
+class Subscriber:
+    def __init__(self, contract_ids=None, queue_size=None):
+        self.contract_ids = contract_ids
+        self.queue = asyncio.Queue(maxsize=queue_size or settings.LIVE_FEED_QUEUE_SIZE)
+        self.overflowed = False
+
+    def offer(self, events):
+        for event in events:
+            if self.contract_ids is not None and event['contract_id'] not in self.contract_ids:
+                continue
+            try:
+                self.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.overflowed = True
+                return
+
+
+class LiveFeed:
+    def __init__(self, interval=None):
+        self.interval = interval if interval is not None else settings.LIVE_FEED_INTERVAL
+        self.subscribers = set()
+        self._task = None
+        self._since = None
+        self._contracts_since = None
+        self._last_sent = {}    # contract_id -> (latest_recorded_at, state) already pushed
+        self._last_status = {}  # contract_id -> (status, contract_address) already pushed
+        self.polls = 0
+        self.events = 0
+
+    def subscribe(self, contract_ids=None):
+        subscriber = Subscriber(contract_ids)
+        self.subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+    def stats(self):
+        return {'subscribers': len(self.subscribers), 'polls': self.polls, 'events': self.events}
+
+    async def _poll(self):
+        await sync_to_async(close_old_connections)()
+        try:
+            return await self._read_changes()
+        finally:
+            await sync_to_async(close_old_connections)()
+
+    async def _read_changes(self):
+        started = timezone.now()
+        if self._since is None:
+            # First poll after going idle: only changes from now on.
+            self._since = self._contracts_since = started
+            return []
+        rows = [
+            health async for health in ContractHealth.objects.filter(
+                updated_at__gte=self._since - POLL_OVERLAP,
+            ).order_by('updated_at')[:POLL_LIMIT]
+        ]
+        contracts = [
+            contract async for contract in Contract.objects.filter(
+                updated_at__gte=self._contracts_since - POLL_OVERLAP,
+            ).only('contract_id', 'status', 'contract_address', 'version', 'updated_at')
+            .order_by('updated_at')[:POLL_LIMIT]
+        ]
+        self.polls += 1
+        if rows:
+            self._since = max(self._since, rows[-1].updated_at)
+        if contracts:
+            self._contracts_since = max(self._contracts_since, contracts[-1].updated_at)
+
+        events = []
+        for health in rows:
+            key = (health.latest_recorded_at, health.state)
+            if self._last_sent.get(health.contract_id) != key:
+                self._last_sent[health.contract_id] = key
+                events.append(_event(health))
+        for contract in contracts:
+            key = (contract.status, contract.contract_address)
+            if self._last_status.get(contract.contract_id) != key:
+                self._last_status[contract.contract_id] = key
+                events.append(_contract_event(contract))
+        return events
+
+    async def _run(self):
+        try:
+            while self.subscribers:
+                try:
+                    events = await self._poll()
+                except Exception as e:
+                    logger.warning("Live feed poll failed: %s", e)
+                    events = []
+                if events:
+                    self.events += len(events)
+                    for subscriber in list(self.subscribers):
+                        subscriber.offer(events)
+                await asyncio.sleep(self.interval)
+        finally:
+            self._since = self._contracts_since = None
+            self._last_sent.clear()
+            self._last_status.clear()
+
+
+live_feed = LiveFeed()
+
+
+def _contract_filter(scope):
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    raw = ','.join(query.get('contracts', []))
+    if not raw:
+        return None
+    try:
+        return {int(part) for part in raw.split(',') if part}
+    except ValueError:
+        return None
+
+
+def _encode(event):
+    data = {key: value for key, value in event.items() if key != 'event'}
+    return f"event: {event['event']}\ndata: {json.dumps(data)}\n\n".encode('utf-8')
+
+
+async def live_feed_app(scope, receive, send):
+    """ASGI app streaming live_feed events as text/event-stream."""
+    subscriber = live_feed.subscribe(_contract_filter(scope))
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),  # keep proxies from buffering the stream
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': b'retry: 3000\n\n', 'more_body': True})
+
+    async def wait_for_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    disconnected = asyncio.ensure_future(wait_for_disconnect())
+    try:
+        while not subscriber.overflowed:
+            next_event = asyncio.ensure_future(subscriber.queue.get())
+            done, _ = await asyncio.wait(
+                {next_event, disconnected}, timeout=settings.LIVE_FEED_KEEPALIVE,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if disconnected in done:
+                next_event.cancel()
+                return
+            if next_event not in done:
+                next_event.cancel()
+                chunk = b': keep-alive\n\n'
+            else:
+                # Send everything already queued in one write.
+                events = [next_event.result()]
+                while not subscriber.queue.empty():
+                    events.append(subscriber.queue.get_nowait())
+                chunk = b''.join(_encode(event) for event in events)
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+
+        # Too far behind: end the response and let the client reconnect.
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+    finally:
+        live_feed.unsubscribe(subscriber)
+        disconnected.cancel()
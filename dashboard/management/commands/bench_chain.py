@@ -0,0 +1,204 @@
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from dashboard import chain, jobs
+from dashboard.chain_cache import chain_metadata
+from dashboard.gas import gas_estimates
+from dashboard.models import Contract, DeployerNonce, TransactionJob
+from dashboard.receipts import ReceiptWatcher
+from dashboard.rpc_stats import track_rpc
+from dashboard.rpc_stub import STUB_DEPLOYER_KEY, StubChain
+
+
+def _percentile(values, pct):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+
+def _latency(timings):
+    ms = [t * 1000 for t in timings]
+    return {'p50_ms': round(_percentile(ms, 50), 2), 'p99_ms': round(_percentile(ms, 99), 2)}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the chain pipeline offline against an in-process JSON-RPC stub: create/action "
+        "view latency, deploys and actions per second, and RPC calls per operation. "
+        "Rows it creates are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contracts', type=int, default=200, help="Contracts to create and settle (default: 200).")
+        parser.add_argument('--latency', type=float, default=0.02,
+                            help="Seconds the stub adds to every HTTP post, like a hosted node (default: 0.02).")
+        parser.add_argument('--output', help="Optional path to write the JSON results to.")
+        parser.add_argument('--baseline', help="JSON results of an earlier run to compare against.")
+
+    # --- setup ---
+
+    def _start_chain(self, latency):
+        self.chain = StubChain(latency=latency)
+        self.client = chain.ChainClient(self.chain.start(), STUB_DEPLOYER_KEY)
+        self._saved_client = (chain._client, chain._client_pid)
+        chain._client, chain._client_pid = self.client, os.getpid()
+        chain_metadata.invalidate()
+        gas_estimates.invalidate()
+
+    def _stop_chain(self):
+        chain._client, chain._client_pid = self._saved_client
+        chain_metadata.invalidate()
+        gas_estimates.invalidate()
+        self.chain.stop()
+
+    def _cleanup(self, first_job_id, contract_ids):
+        TransactionJob.objects.filter(job_id__gte=first_job_id).delete()
+        Contract.objects.filter(contract_id__in=contract_ids).delete()
+        DeployerNonce.objects.filter(address=self.client.deployer_address).delete()
+
+    # --- measurements ---
+
+    def _post_all(self, http, url_for, payloads):
+        """POSTs each payload; returns (latencies, RPC calls per request)."""
+        timings = []
+        rpc_calls = 0
+        for key, data in payloads:
+            started = time.perf_counter()
+            response = http.post(url_for(key), data)
+            timings.append(time.perf_counter() - started)
+            rpc_calls += int(response.get('X-RPC-Calls', 0))
+        return timings, rpc_calls / max(len(payloads), 1)
+
+    def _drain(self, label, job_ids, watcher):
+        """Runs the worker loop (send, mine a block, confirm) until every job in `job_ids` is settled."""
+        started = time.perf_counter()
+        blocks = 0
+        with track_rpc(label) as stats:
+            while TransactionJob.objects.filter(job_id__in=job_ids, state__in=TransactionJob.OPEN_STATES).exists():
+                jobs.send_queued_jobs()
+                self.chain.mine()
+                blocks += 1
+                jobs.apply_receipts(watcher.poll())
+        seconds = time.perf_counter() - started
+        count = len(job_ids)
+        return {
+            'operations': count,
+            'seconds': round(seconds, 3),
+            'per_second': round(count / seconds, 1),
+            'blocks': blocks,
+            'rpc_calls_per_op': round(stats.calls / count, 2),
+            'round_trips_per_op': round(stats.round_trips / count, 3),
+        }
+
+    def _run(self, count):
+        http = Client(SERVER_NAME='localhost')
+        watcher = ReceiptWatcher(self.client.web3)
+        watcher.poll()
+        seller = '0x' + '2' * 40
+
+        # 1. Create view: saves the contract and queues its deployment.
+        timings, create_rpc = self._post_all(http, lambda _: reverse('create_contract'), [
+            (i, {'buyer_address': '0x' + '1' * 40, 'seller_address': seller,
+                 'product_name': 'Moderna', 'payment_amount': '1.50', 'quantity': '10'})
+            for i in range(count)
+        ])
+        deploy_jobs = list(TransactionJob.objects.filter(
+            job_id__gte=self.first_job_id, kind=TransactionJob.KIND_DEPLOY,
+        ).values_list('job_id', 'contract_id'))
+        self.contract_ids = [contract_id for _, contract_id in deploy_jobs]
+        create = {'requests': count, **_latency(timings), 'rpc_calls_per_request': create_rpc}
+
+        # 2. Deploy and initial funding, until the contracts are Active.
+        deploy = self._drain('bench_chain.deploy', [job_id for job_id, _ in deploy_jobs], watcher)
+        fund_jobs = list(TransactionJob.objects.filter(
+            contract_id__in=self.contract_ids, kind=TransactionJob.KIND_FUND,
+        ).values_list('job_id', flat=True))
+        fund = self._drain('bench_chain.fund', fund_jobs, watcher)
+
+        # 3. Action view (complete), then the settlement transactions.
+        timings, action_rpc = self._post_all(
+            http, lambda contract_id: reverse('process_contract_action', args=[contract_id]),
+            [(contract_id, {'action': 'complete'}) for contract_id in self.contract_ids],
+        )
+        action_view = {'requests': count, **_latency(timings), 'rpc_calls_per_request': action_rpc}
+        action_jobs = list(TransactionJob.objects.filter(
+            contract_id__in=self.contract_ids, kind=TransactionJob.KIND_COMPLETE,
+        ).values_list('job_id', flat=True))
+        actions = self._drain('bench_chain.action', action_jobs, watcher)
+
+        completed = Contract.objects.filter(contract_id__in=self.contract_ids, status='Completed').count()
+        return {
+            'create_view': create,
+            'deploy': deploy,
+            'fund': fund,
+            'action_view': action_view,
+            'action': actions,
+            'completed_contracts': completed,
+            'eth_estimateGas_calls': self.chain.method_counts.get('eth_estimateGas', 0),
+        }
+
+    # --- reporting ---
+
+    def _commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def _report(self, results, baseline):
+        self.stdout.write(f"{'stage':12} {'p50 ms':>8} {'p99 ms':>8} {'ops/s':>8} {'rpc/op':>8} {'trips/op':>9}")
+        for stage in ('create_view', 'deploy', 'fund', 'action_view', 'action'):
+            r = results[stage]
+            self.stdout.write(
+                f"{stage:12} {r.get('p50_ms', '-'):>8} {r.get('p99_ms', '-'):>8} {r.get('per_second', '-'):>8} "
+                f"{r.get('rpc_calls_per_op', r.get('rpc_calls_per_request', '-')):>8} {r.get('round_trips_per_op', '-'):>9}"
+            )
+            if baseline and stage in baseline:
+                changes = [
+                    f"{key} {baseline[stage][key]} -> {value}"
+                    for key, value in r.items()
+                    if key in ('p50_ms', 'p99_ms', 'per_second', 'rpc_calls_per_op') and baseline[stage].get(key) != value
+                ]
+                if changes:
+                    self.stdout.write(f"{'':12} vs {baseline.get('commit') or 'baseline'}: {', '.join(changes)}")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as fh:
+                baseline = json.load(fh)
+
+        self._start_chain(options['latency'])
+        self.first_job_id = (TransactionJob.objects.order_by('-job_id').values_list('job_id', flat=True).first() or 0) + 1
+        self.contract_ids = []
+        try:
+            results = self._run(options['contracts'])
+        finally:
+            self._cleanup(self.first_job_id, self.contract_ids)
+            self._stop_chain()
+
+        results = {
+            'commit': self._commit(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'contracts': options['contracts'],
+            'stub_latency_s': options['latency'],
+            'tx_send_batch': settings.TX_SEND_BATCH,
+            **results,
+        }
+        self._report(results, baseline)
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
@@ -0,0 +1,222 @@
+import asyncio
+import datetime
+import json
+import socket
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+from django.core.management.base import BaseCommand
+from django.db.backends.signals import connection_created
+from django.db.models import Max
+from django.urls import reverse
+from django.utils import timezone
+
+from dashboard.models import Contract, ContractHealth
+
+
+def _percentile(values, pct):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class _PooledWSGIServer(WSGIServer):
+    """wsgiref server with a fixed pool of request threads, like gunicorn's gthread worker."""
+    request_queue_size = 4096
+
+    def __init__(self, address, threads):
+        super().__init__(address, _QuietHandler)
+        self.pool = ThreadPoolExecutor(threads, thread_name_prefix='wsgi')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the dashboard views served by one ASGI worker (uvicorn, SolTrack/asgi.py, the "
+        "Procfile's 'web' process) with a threaded WSGI server (SolTrack/wsgi.py): requests per second and p50/p99 latency at each "
+        "concurrency. --db-latency adds a delay to every SQL query, like a hosted database. "
+        "Rows it creates are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', default='1,16,64,256',
+                            help="Comma-separated concurrent request counts (default: 1,16,64,256).")
+        parser.add_argument('--requests', type=int, default=400, help="Requests per concurrency level (default: 400).")
+        parser.add_argument('--threads', type=int, default=8,
+                            help="Request threads of the WSGI server (default: 8).")
+        parser.add_argument('--db-latency', type=float, default=0.005,
+                            help="Seconds added to every SQL query (default: 0.005).")
+        parser.add_argument('--contracts', type=int, default=24, help="Active contracts listed (default: 24).")
+        parser.add_argument('--output', help="Optional path to write the JSON results to.")
+
+    # --- setup ---
+
+    def _create_contracts(self, count):
+        now = timezone.now()
+        first_id = (Contract.objects.aggregate(top=Max('contract_id'))['top'] or 0) + 1
+        ids = list(range(first_id, first_id + count))
+        Contract.objects.bulk_create([
+            Contract(
+                contract_id=contract_id, buyer_address='0x' + '1' * 40, seller_address='0x' + '2' * 40,
+                product_name=f"Bench shipment {contract_id}", quantity=1, price=1, start_date=now,
+                end_date=now + datetime.timedelta(days=7), contract_address='0x' + '3' * 40,
+                temperature_threshold=-8.0, status='Active',
+            )
+            for contract_id in ids
+        ])
+        ContractHealth.objects.bulk_create([
+            ContractHealth(
+                contract_id=contract_id, latest_temperature=-12.5, latest_recorded_at=now, run_started_at=now,
+            )
+            for contract_id in ids
+        ])
+        return ids
+
+    def _slow_queries(self, latency):
+        # Every connection the servers open from here on sleeps before each query.
+        def delay(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def install(sender, connection, **kwargs):
+            # Fired on every reconnect of a thread's connection; add the delay once.
+            if delay not in connection.execute_wrappers:
+                connection.execute_wrappers.append(delay)
+
+        if latency > 0:
+            connection_created.connect(install, weak=False, dispatch_uid='bench_concurrency')
+
+    def _listen(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(('127.0.0.1', 0))
+        return sock
+
+    def _start_asgi(self):
+        import uvicorn
+
+        from SolTrack.asgi import application
+
+        sock = self._listen()
+        server = uvicorn.Server(uvicorn.Config(application, lifespan='off', log_level='warning', backlog=4096))
+        thread = threading.Thread(target=server.run, kwargs={'sockets': [sock]}, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+
+        def stop():
+            server.should_exit = True
+            thread.join(timeout=10)
+        return sock.getsockname()[1], stop
+
+    def _start_wsgi(self, threads):
+        from SolTrack.wsgi import application
+
+        server = _PooledWSGIServer(('127.0.0.1', 0), threads)
+        server.set_app(application)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            server.server_close()
+            thread.join(timeout=10)
+        return server.server_address[1], stop
+
+    # --- load ---
+
+    async def _get(self, port, path):
+        started = time.perf_counter()
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        await writer.wait_closed()
+        return response.split(b' ', 2)[1] == b'200', time.perf_counter() - started
+
+    async def _level(self, port, paths, concurrency, total):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(n):
+            async with semaphore:
+                return await self._get(port, paths[n % len(paths)])
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one(n) for n in range(total)))
+        seconds = time.perf_counter() - started
+        ms = sorted(elapsed * 1000 for ok, elapsed in results)
+        return {
+            'concurrency': concurrency,
+            'requests': total,
+            'errors': sum(1 for ok, _ in results if not ok),
+            'per_second': round(total / seconds, 1),
+            'p50_ms': round(_percentile(ms, 50), 2),
+            'p99_ms': round(_percentile(ms, 99), 2),
+        }
+
+    def _run(self, start, paths, levels, total):
+        port, stop = start()
+        try:
+            asyncio.run(self._level(port, paths, 1, len(paths)))  # warm-up: imports, templates, caches
+            return [asyncio.run(self._level(port, paths, level, total)) for level in levels]
+        finally:
+            stop()
+
+    def handle(self, *args, **options):
+        levels = [int(level) for level in options['concurrency'].split(',')]
+        contract_ids = self._create_contracts(options['contracts'])
+        paths = [
+            reverse('active'), reverse('completed'), reverse('alerts'), reverse('analytics'),
+            reverse('contract_history', args=[contract_ids[0]]),
+        ]
+        self._slow_queries(options['db_latency'])
+        try:
+            asgi = self._run(self._start_asgi, paths, levels, options['requests'])
+            wsgi = self._run(lambda: self._start_wsgi(options['threads']), paths, levels, options['requests'])
+        finally:
+            connection_created.disconnect(dispatch_uid='bench_concurrency')
+            ContractHealth.objects.filter(contract_id__in=contract_ids).delete()
+            Contract.objects.filter(contract_id__in=contract_ids).delete()
+
+        self.stdout.write(
+            f"{'conc':>5} | {'asgi req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'err':>4} | "
+            f"{'wsgi req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'err':>4}"
+        )
+        for a, w in zip(asgi, wsgi):
+            self.stdout.write(
+                f"{a['concurrency']:>5} | {a['per_second']:>10} {a['p50_ms']:>8} {a['p99_ms']:>8} {a['errors']:>4} | "
+                f"{w['per_second']:>10} {w['p50_ms']:>8} {w['p99_ms']:>8} {w['errors']:>4}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({
+                    'paths': paths,
+                    'db_latency_s': options['db_latency'],
+                    'wsgi_threads': options['threads'],
+                    'asgi': asgi,
+                    'wsgi': wsgi,
+                }, fh, indent=2)
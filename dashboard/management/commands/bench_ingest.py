@@ -0,0 +1,105 @@
+import datetime
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from dashboard import telemetry
+from dashboard.models import Contract
+
+BENCH_TOKEN = 'bench-ingest'
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures telemetry ingest throughput (readings/s) per batch size through the "
+        "ingest endpoint. Everything written is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-sizes', default='1,10,100,1000,5000',
+                            help="Comma-separated readings per request (default: 1,10,100,1000,5000).")
+        parser.add_argument('--readings', type=int, default=20000,
+                            help="Readings sent per batch size and format (default: 20000).")
+        parser.add_argument('--format', choices=['jsonl', 'binary', 'both'], default='both')
+        parser.add_argument('--output', help="Optional path to write the JSON results to.")
+
+    def _body(self, rows, fmt):
+        if fmt == 'binary':
+            return telemetry.pack_binary(rows), telemetry.BINARY_CONTENT_TYPE
+        lines = (
+            json.dumps({'contract_id': c, 'device_id': d, 'recorded_at': t.timestamp(), 'temperature': v})
+            for c, d, t, v in rows
+        )
+        return '\n'.join(lines).encode('utf-8'), 'application/x-ndjson'
+
+    def _run(self, client, contract_ids, batch_size, total, fmt):
+        start = timezone.now()
+        rows = [
+            (random.choice(contract_ids), f"sensor-{i % 50}", start + datetime.timedelta(milliseconds=i),
+             random.uniform(-10, 0))
+            for i in range(total)
+        ]
+        bodies = [self._body(rows[i:i + batch_size], fmt) for i in range(0, total, batch_size)]
+
+        accepted = 0
+        started = time.perf_counter()
+        for body, content_type in bodies:
+            response = client.post(reverse('ingest_readings'), body, content_type=content_type,
+                                    HTTP_AUTHORIZATION=f"Bearer {BENCH_TOKEN}")
+            if response.status_code != 200:
+                raise CommandError(f"Ingest failed ({response.status_code}): {response.content[:200]!r}")
+            accepted += response.json()['accepted']
+        elapsed = time.perf_counter() - started
+
+        return {
+            'format': fmt,
+            'batch_size': batch_size,
+            'requests': len(bodies),
+            'readings': accepted,
+            'seconds': round(elapsed, 3),
+            'readings_per_second': round(accepted / elapsed),
+            'ms_per_request': round(elapsed * 1000 / len(bodies), 3),
+        }
+
+    def handle(self, *args, **options):
+        contract_ids = list(Contract.objects.values_list('contract_id', flat=True)[:100])
+        if not contract_ids:
+            raise CommandError("bench_ingest needs at least one row in contracts.")
+
+        batch_sizes = [int(size) for size in options['batch_sizes'].split(',')]
+        formats = ['jsonl', 'binary'] if options['format'] == 'both' else [options['format']]
+        client = Client(SERVER_NAME='localhost')
+        results = []
+
+        with override_settings(TELEMETRY_INGEST_TOKEN=BENCH_TOKEN):
+            for fmt in formats:
+                for batch_size in batch_sizes:
+                    # Small batch sizes take a request per reading; cap their count.
+                    total = min(options['readings'], batch_size * 2000)
+                    try:
+                        with transaction.atomic():
+                            results.append(self._run(client, contract_ids, batch_size, total, fmt))
+                            raise _Rollback
+                    except _Rollback:
+                        pass
+
+        self.stdout.write(f"{'format':8} {'batch':>6} {'requests':>9} {'readings/s':>11} {'ms/request':>11}")
+        for r in results:
+            self.stdout.write(
+                f"{r['format']:8} {r['batch_size']:>6} {r['requests']:>9} "
+                f"{r['readings_per_second']:>11} {r['ms_per_request']:>11}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
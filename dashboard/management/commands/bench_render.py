@@ -0,0 +1,135 @@
+import datetime
+import json
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.template.loader import render_to_string
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from dashboard import fragments
+from dashboard.models import Contract, ContractHealth
+from dashboard.views import ACTIVE_LIST_FIELDS, active_card_items
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures active.html render time with and without the contract card fragment cache "
+        "for several list sizes. The contracts it creates are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='24,100,500,1000',
+                            help="Comma-separated cards per page (default: 24,100,500,1000).")
+        parser.add_argument('--repeat', type=int, default=5, help="Renders per measurement (default: 5).")
+        parser.add_argument('--backend', choices=['locmem', 'file'], default='locmem',
+                            help="Cache backend for the fragments during the run (default: locmem).")
+        parser.add_argument('--output', help="Optional path to write the JSON results to.")
+
+    def _create_contracts(self, count):
+        now = timezone.now()
+        first_id = (Contract.objects.aggregate(top=Max('contract_id'))['top'] or 0) + 1
+        ids = list(range(first_id, first_id + count))
+        Contract.objects.bulk_create([
+            Contract(
+                contract_id=contract_id, buyer_address='0x' + '1' * 40, seller_address='0x' + '2' * 40,
+                product_name=f"Bench shipment {contract_id}", quantity=1, price=1, start_date=now,
+                end_date=now + datetime.timedelta(days=7), contract_address='0x' + '3' * 40,
+                temperature_threshold=-8.0, status='Active',
+            )
+            for contract_id in ids
+        ])
+        ContractHealth.objects.bulk_create([
+            ContractHealth(
+                contract_id=contract_id, latest_temperature=-12.5, latest_recorded_at=now, run_started_at=now,
+            )
+            for contract_id in ids
+        ])
+        return ids
+
+    def _render(self, context, request, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            render_to_string('dashboard/active.html', context, request)
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings) * 1000
+
+    def _measure(self, ids, size, repeat, cache_settings):
+        contracts = list(
+            Contract.objects.filter(contract_id__in=ids[:size]).only(*ACTIVE_LIST_FIELDS).order_by('contract_id')
+        )
+        context = {
+            'contracts': active_card_items(contracts),
+            'pending_jobs': [],
+            'cursor': None,
+            'next_cursor': None,
+            **fragments.card_cache_context(),
+        }
+        request = RequestFactory().get('/dashboard/active/')
+        alias = settings.FRAGMENT_CACHE_ALIAS
+
+        with override_settings(CACHES={**cache_settings, alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}):
+            uncached = self._render(context, request, repeat)
+
+        with override_settings(CACHES=cache_settings):
+            caches[alias].clear()
+            cold = self._render(context, request, 1)
+            warm = self._render(context, request, repeat)
+            # One card changed (e.g. a confirmed status change): one miss, the rest hits.
+            context['contracts'][0]['contract'].version += 1
+            one_changed = self._render(context, request, 1)
+            caches[alias].clear()
+
+        return {
+            'cards': size,
+            'uncached_ms': round(uncached, 2),
+            'cold_ms': round(cold, 2),
+            'warm_ms': round(warm, 2),
+            'one_changed_ms': round(one_changed, 2),
+            'saved_pct': round((1 - warm / uncached) * 100, 1),
+        }
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        alias = settings.FRAGMENT_CACHE_ALIAS
+        with tempfile.TemporaryDirectory() as cache_dir:
+            if options['backend'] == 'file':
+                backend = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir}
+            else:
+                backend = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bench-render'}
+            cache_settings = {**settings.CACHES, alias: {**backend, 'OPTIONS': {'MAX_ENTRIES': max(sizes) * 4}}}
+
+            results = []
+            try:
+                with transaction.atomic():
+                    ids = self._create_contracts(max(sizes))
+                    for size in sizes:
+                        results.append(self._measure(ids, size, options['repeat'], cache_settings))
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+        self.stdout.write(f"backend: {options['backend']}")
+        self.stdout.write(
+            f"{'cards':>6} {'uncached ms':>12} {'cold ms':>9} {'warm ms':>9} {'1 changed ms':>13} {'saved':>7}"
+        )
+        for r in results:
+            self.stdout.write(
+                f"{r['cards']:>6} {r['uncached_ms']:>12} {r['cold_ms']:>9} {r['warm_ms']:>9} "
+                f"{r['one_changed_ms']:>13} {r['saved_pct']:>6}%"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
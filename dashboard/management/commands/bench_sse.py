@@ -0,0 +1,140 @@
+import asyncio
+import json
+import socket
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from dashboard.live import live_feed
+from dashboard.models import ContractHealth
+
+# A contract id no real contract uses; its contract_health row is removed afterwards.
+BENCH_CONTRACT_ID = -1
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests the Server-Sent Events live feed: opens N concurrent connections to an "
+        "in-process uvicorn server and measures connect time, fan-out latency and DB polls."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', default='100,500,1000',
+                            help="Comma-separated concurrent connection counts (default: 100,500,1000).")
+        parser.add_argument('--updates', type=int, default=3, help="Updates pushed per round (default: 3).")
+        parser.add_argument('--output', help="Optional path to write the JSON results to.")
+
+    def _start_server(self):
+        import uvicorn
+
+        from SolTrack.asgi import application
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(('127.0.0.1', 0))
+        server = uvicorn.Server(uvicorn.Config(
+            application, lifespan='off', log_level='warning', backlog=4096, timeout_keep_alive=60,
+        ))
+        thread = threading.Thread(target=server.run, kwargs={'sockets': [sock]}, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+        return server, thread, sock.getsockname()[1]
+
+    async def _connect(self, port, path):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n".encode())
+        await writer.drain()
+        status = await reader.readline()
+        if b' 200 ' not in status:
+            raise RuntimeError(f"Live feed answered {status!r}")
+        # Headers, then the initial 'retry:' line.
+        while (await reader.readline()) not in (b'\r\n', b''):
+            pass
+        await reader.readuntil(b'retry: 3000\n\n')
+        return reader, writer
+
+    async def _wait_for_event(self, reader, temperature):
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise RuntimeError("Live feed closed the connection")
+            if line.startswith(b'data: '):
+                event = json.loads(line[6:])
+                if event['contract_id'] == BENCH_CONTRACT_ID and event.get('temperature') == temperature:
+                    return time.perf_counter()
+
+    def _push_update(self, temperature):
+        now = timezone.now()
+        ContractHealth.objects.update_or_create(
+            contract_id=BENCH_CONTRACT_ID,
+            defaults={
+                'latest_temperature': temperature,
+                'latest_recorded_at': now,
+                'run_started_at': now,
+            },
+        )
+        return time.perf_counter()
+
+    async def _round(self, port, path, count, updates):
+        started = time.perf_counter()
+        clients = await asyncio.gather(*(self._connect(port, path) for _ in range(count)))
+        connect_seconds = time.perf_counter() - started
+
+        polls_before = live_feed.polls
+        latencies = []
+        for n in range(updates):
+            temperature = float(n) + count / 10000
+            waits = [asyncio.ensure_future(self._wait_for_event(reader, temperature)) for reader, _ in clients]
+            sent_at = await asyncio.to_thread(self._push_update, temperature)
+            received = await asyncio.wait_for(asyncio.gather(*waits), timeout=30)
+            latencies.extend(at - sent_at for at in received)
+        polls = live_feed.polls - polls_before
+        subscribers = live_feed.stats()['subscribers']
+
+        for _, writer in clients:
+            writer.close()
+        await asyncio.gather(*(writer.wait_closed() for _, writer in clients), return_exceptions=True)
+
+        latencies.sort()
+        return {
+            'connections': count,
+            'connected': len(clients),
+            'server_subscribers': subscribers,
+            'connect_seconds': round(connect_seconds, 3),
+            'fanout_p50_ms': round(statistics.median(latencies) * 1000, 1),
+            'fanout_p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+            'fanout_max_ms': round(latencies[-1] * 1000, 1),
+            'db_polls': polls,
+        }
+
+    def handle(self, *args, **options):
+        from django.conf import settings
+
+        counts = [int(count) for count in options['connections'].split(',')]
+        server, thread, port = self._start_server()
+        results = []
+        try:
+            for count in counts:
+                results.append(asyncio.run(self._round(port, settings.LIVE_FEED_PATH, count, options['updates'])))
+                time.sleep(settings.LIVE_FEED_INTERVAL * 2)  # let the feed go idle between rounds
+        finally:
+            server.should_exit = True
+            thread.join(timeout=10)
+            ContractHealth.objects.filter(contract_id=BENCH_CONTRACT_ID).delete()
+
+        self.stdout.write(
+            f"{'conns':>6} {'connect s':>10} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'db polls':>9}"
+        )
+        for r in results:
+            self.stdout.write(
+                f"{r['connections']:>6} {r['connect_seconds']:>10} {r['fanout_p50_ms']:>8} "
+                f"{r['fanout_p95_ms']:>8} {r['fanout_max_ms']:>8} {r['db_polls']:>9}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
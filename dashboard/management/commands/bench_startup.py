@@ -0,0 +1,78 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+# Runs in a fresh interpreter so every sample is a true cold start.
+PROBE = r'''
+import json, sys, time
+t0 = time.perf_counter()
+import django
+django.setup()
+t1 = time.perf_counter()
+import dashboard.views
+t2 = time.perf_counter()
+from django.test import Client
+from django.urls import reverse
+response = Client(SERVER_NAME='localhost').get(reverse('overview'))
+t3 = time.perf_counter()
+result = {
+    'django_setup_ms': (t1 - t0) * 1000,
+    'views_import_ms': (t2 - t1) * 1000,
+    'first_response_ms': (t3 - t2) * 1000,
+    'status_code': response.status_code,
+    'web3_loaded': 'web3' in sys.modules,
+    'solcx_loaded': 'solcx' in sys.modules,
+}
+if {warm_up}:
+    from dashboard import chain
+    t4 = time.perf_counter()
+    chain.warm_up(connect=False)
+    result['chain_warm_up_ms'] = (time.perf_counter() - t4) * 1000
+print(json.dumps(result))
+'''
+
+
+class Command(BaseCommand):
+    help = "Measures worker cold-start time and read-only view import cost in fresh interpreters."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help="Cold starts to sample (default: 5).")
+        parser.add_argument('--output', help="Optional path to write the JSON summary to.")
+
+    def _sample(self, warm_up):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'SolTrack.settings'))
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, '-c', PROBE.replace('{warm_up}', str(warm_up))],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        result['process_total_ms'] = (time.perf_counter() - start) * 1000
+        return result
+
+    def handle(self, *args, **options):
+        summary = {}
+        for label, warm_up in (('read_only', False), ('with_chain_warm_up', True)):
+            samples = [self._sample(warm_up) for _ in range(options['runs'])]
+            summary[label] = {
+                key: statistics.median(sample[key] for sample in samples)
+                for key in samples[0] if key.endswith('_ms')
+            }
+            summary[label]['web3_loaded'] = samples[0]['web3_loaded']
+            summary[label]['solcx_loaded'] = samples[0]['solcx_loaded']
+
+        for label, result in summary.items():
+            self.stdout.write(f"{label}:")
+            for key, value in result.items():
+                self.stdout.write(f"  {key:22} {value:.1f}" if isinstance(value, float) else f"  {key:22} {value}")
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(summary, fh, indent=2)
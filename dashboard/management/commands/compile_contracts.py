@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard import artifacts
+
+
+class Command(BaseCommand):
+    help = (
+        "Builds (or checks) the cached SimpleTransfer ABI/bytecode artifact and stores it in "
+        "contract_artifacts for processes that do not have the file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only verify that an up-to-date artifact exists; exit non-zero if it does not.",
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help="Recompile even if a cached artifact exists.",
+        )
+
+    def handle(self, *args, **options):
+        key = artifacts.artifact_key()
+
+        if options['check']:
+            try:
+                artifacts.get_artifact()
+            except artifacts.ArtifactMissing:
+                raise CommandError(f"Artifact {key[:12]} is missing or stale. Run 'manage.py compile_contracts'.")
+            self.stdout.write(self.style.SUCCESS(f"Artifact {key[:12]} is up to date."))
+            return
+
+        artifact = artifacts.build_artifact(force=options['force'])
+        artifacts.store_artifact(artifact)
+        self.stdout.write(self.style.SUCCESS(
+            f"Artifact {key[:12]} ready: {artifact['contract_name']} (solc {artifact['solc_version']})."
+        ))
@@ -0,0 +1,81 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard import bulk, jobs
+from dashboard.chain import get_web3
+from dashboard.models import BulkImport
+from dashboard.receipts import ReceiptWatcher
+from dashboard.rpc_stats import track_rpc
+
+
+class Command(BaseCommand):
+    help = "Creates contracts from a CSV of buyer/seller/product/price/quantity rows and queues their deployment."
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', nargs='?', help="CSV file with a header row.")
+        parser.add_argument('--resume', type=int, metavar='IMPORT_ID',
+                            help="Continue an import that stopped, from its checkpoint.")
+        parser.add_argument('--chunk-size', type=int, help="Rows per transaction (default: BULK_IMPORT_CHUNK).")
+        parser.add_argument('--deploy', action='store_true',
+                            help="Send and confirm the deployments here instead of leaving them to run_tx_worker.")
+        parser.add_argument('--interval', type=float, default=3.0,
+                            help="Seconds between polls with --deploy (default: 3).")
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            try:
+                bulk_import = BulkImport.objects.get(import_id=options['resume'])
+            except BulkImport.DoesNotExist:
+                raise CommandError(f"Import #{options['resume']} does not exist.")
+        elif options['csv_path']:
+            try:
+                with open(options['csv_path'], encoding='utf-8-sig', newline='') as f:
+                    bulk_import = bulk.create_import(f.read(), source=os.path.basename(options['csv_path']))
+            except (OSError, bulk.BulkImportError) as e:
+                raise CommandError(str(e))
+        else:
+            raise CommandError("Give a CSV file or --resume IMPORT_ID.")
+
+        try:
+            queued = bulk.queue_import(bulk_import, chunk_size=options['chunk_size'])
+        except Exception as e:
+            bulk.record_failure(bulk_import, e)
+            raise CommandError(
+                f"Import #{bulk_import.import_id} stopped before line {bulk_import.next_line}: {e}. "
+                f"Run again with --resume {bulk_import.import_id}."
+            )
+        self.stdout.write(self.style.SUCCESS(f"Import #{bulk_import.import_id}: {queued} contracts queued."))
+
+        if options['deploy']:
+            self._deploy(bulk_import, options['interval'])
+        self._report(bulk_import)
+
+    def _deploy(self, bulk_import, interval):
+        watcher = ReceiptWatcher(get_web3())
+        while bulk.open_deploy_jobs(bulk_import).exists():
+            try:
+                with track_rpc('import_contracts') as stats:
+                    sent = jobs.send_queued_jobs()
+                    confirmed = jobs.apply_receipts(watcher.poll())
+                if sent or confirmed:
+                    self.stdout.write(
+                        f"Sent {sent}, confirmed {confirmed}, "
+                        f"{bulk.open_deploy_jobs(bulk_import).count()} still open "
+                        f"({stats.round_trips:.0f} RPC round trips)."
+                    )
+            except Exception as e:
+                # Job state is in the database; just try again on the next poll.
+                self.stderr.write(f"Deploy iteration failed: {e}")
+            time.sleep(interval)
+
+    def _report(self, bulk_import):
+        results, counts = bulk.import_results(bulk_import)
+        for result in results:
+            row = result['row']
+            detail = result['contract_address'] or result['error'] or result['tx_hash']
+            contract = f"contract #{row.contract_id}" if row.contract_id else "no contract"
+            self.stdout.write(f"  line {row.line_number}: {result['progress']}, {contract}"
+                              + (f", {detail}" if detail else ""))
+        self.stdout.write(', '.join(f"{progress}: {count}" for progress, count in sorted(counts.items())))
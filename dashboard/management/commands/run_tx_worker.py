@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard import jobs, metrics
+from dashboard.chain import get_web3
+from dashboard.chain_cache import chain_metadata
+from dashboard.gas import gas_estimates
+from dashboard.receipts import ReceiptWatcher
+from dashboard.rpc_stats import track_rpc
+
+
+class Command(BaseCommand):
+    help = "Sends queued deploy/settlement transactions and confirms sent ones once per new block."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=3.0, help="Seconds between polls (default: 3).")
+        parser.add_argument('--once', action='store_true', help="Process the queue once and exit.")
+        parser.add_argument('--metrics-port', type=int,
+                            help="Serve this process's Prometheus metrics on :PORT/metrics.")
+
+    def handle(self, *args, **options):
+        watcher = ReceiptWatcher(get_web3())
+        resumed = False
+        if not options['once']:
+            # Keep gas price warm so building a transaction never waits on it.
+            chain_metadata.start_background_refresh()
+        if options['metrics_port']:
+            metrics.serve(options['metrics_port'])
+        self.stdout.write(self.style.SUCCESS("Transaction worker started."))
+
+        while True:
+            try:
+                with track_rpc('run_tx_worker'):
+                    if not chain_metadata.is_connected():
+                        self.stderr.write("Web3 not connected. Check RPC URL and network status.")
+                    else:
+                        if not resumed:
+                            jobs.resume_sent_jobs()
+                            resumed = True
+                        sent = jobs.send_queued_jobs()
+                        confirmed = jobs.apply_receipts(watcher.poll())
+                        if sent or confirmed:
+                            self.stdout.write(
+                                f"Sent {sent}, confirmed {confirmed}. Chain metadata cache: {chain_metadata.stats()}. "
+                                f"Gas estimates: {gas_estimates.stats()}"
+                            )
+            except Exception as e:
+                # Job state is in the database; just try again on the next poll.
+                self.stderr.write(f"Worker iteration failed: {e}")
+            if options['once']:
+                break
+            time.sleep(options['interval'])
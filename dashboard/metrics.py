@@ -0,0 +1,192 @@
+"""
+In-process metrics for the chain pipeline, in the Prometheus text format.
+
+span('stage') times a block into the soltrack_stage_seconds histogram, so
+every step of a transaction (enqueue, claim, nonce, DB fetch, build, sign,
+broadcast, receipt poll and wait, apply) shows where its latency goes.
+Counters record what happened to the jobs, and RPCStatsMiddleware adds each
+request's duration and JSON-RPC call count per view. The per-scope RPC
+totals from dashboard.rpc_stats are read at scrape time.
+
+Metrics live in the process that records them. The web processes serve
+theirs on /metrics; run_tx_worker and the other commands can serve theirs
+with --metrics-port. No client library is needed for this much.
+
+Under gunicorn each worker process keeps its own metrics, and /metrics
+answers with those of whichever worker took the request. Counters then
+appear to jump between scrapes. Run the web process with one worker
+(WEB_CONCURRENCY=1) when its metrics matter, or scrape every worker
+separately.
+
+/metrics needs 'Authorization: Bearer <METRICS_TOKEN>'. Without a token
+configured it is only shown to logged-in staff users.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from .rpc_stats import rpc_totals
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+
+_registry = []
+_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with _lock:
+            return self._values.get(tuple(labels[name] for name in self.labelnames), 0)
+
+    def samples(self):
+        with _lock:
+            return [(self.name, _labels(self.labelnames, key), value) for key, value in sorted(self._values.items())]
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self._values = {}  # label values -> [bucket counts..., sum, count]
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with _lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[index] += 1
+                    break
+            entry[-2] += value
+            entry[-1] += 1
+
+    def count(self, **labels):
+        with _lock:
+            entry = self._values.get(tuple(labels[name] for name in self.labelnames))
+            return entry[-1] if entry else 0
+
+    def samples(self):
+        samples = []
+        with _lock:
+            for key, entry in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, entry):
+                    cumulative += bucket_count
+                    le = (('le', _number(float(bound))),)
+                    samples.append((f"{self.name}_bucket", _labels(self.labelnames, key, le), cumulative))
+                samples.append((f"{self.name}_sum", _labels(self.labelnames, key), entry[-2]))
+                samples.append((f"{self.name}_count", _labels(self.labelnames, key), entry[-1]))
+        return samples
+
+
+STAGE_SECONDS = Histogram(
+    'soltrack_stage_seconds', "Time spent in each stage of the transaction pipeline.", ['stage'],
+)
+JOBS = Counter('soltrack_jobs_total', "Transaction jobs by kind and what happened to them.", ['kind', 'outcome'])
+REQUEST_SECONDS = Histogram('soltrack_request_seconds', "Request duration per view.", ['view'])
+REQUEST_RPC_CALLS = Histogram(
+    'soltrack_request_rpc_calls', "JSON-RPC calls made per request, per view.", ['view'], buckets=COUNT_BUCKETS,
+)
+
+
+@contextmanager
+def span(stage):
+    """Times the block into soltrack_stage_seconds{stage=...}, also when it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+
+
+def _rpc_samples():
+    # Written from dashboard.rpc_stats, which keeps counting without this module.
+    families = {
+        'soltrack_rpc_scopes_total': ("track_rpc() scopes (requests, worker iterations) per label.", 'requests'),
+        'soltrack_rpc_calls_total': ("JSON-RPC calls per label.", 'calls'),
+        'soltrack_rpc_round_trips_total': ("HTTP round trips to the node per label.", 'round_trips'),
+    }
+    totals = rpc_totals()
+    lines = []
+    for name, (documentation, field) in families.items():
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} counter")
+        for label, values in sorted(totals.items()):
+            lines.append(f'{name}{{scope="{_escape(label)}"}} {_number(values[field])}')
+    return lines
+
+
+def render():
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(f"{name}{labels} {_number(value)}" for name, labels, value in metric.samples())
+    lines.extend(_rpc_samples())
+    return '\n'.join(lines) + '\n'
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def serve(port, host='0.0.0.0'):
+    """Serves render() on http://host:port/metrics from a daemon thread (for the commands)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            data = render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
@@ -0,0 +1,92 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .metrics import REQUEST_RPC_CALLS, REQUEST_SECONDS
+from .rpc_stats import track_rpc
+
+
+class RPCStatsMiddleware:
+    """
+    Counts the JSON-RPC calls and HTTP round trips each request makes and
+    reports them (and how many round trips batching saved) as response
+    headers. Totals per view are kept in dashboard.rpc_stats.rpc_totals();
+    each request's duration and call count also go into the /metrics
+    histograms. Runs in whichever mode the handler is in, so async views
+    are not pushed onto a thread.
+
+    The views no longer call the node (the transaction worker sends and
+    confirms every transaction), so their counts are 0; the worker's
+    batching shows under the 'run_tx_worker' label.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with track_rpc('unresolved') as stats:
+            request.rpc_stats = stats
+            response = self.get_response(request)
+        return self._finish(response, stats, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with track_rpc('unresolved') as stats:
+            request.rpc_stats = stats
+            response = await self.get_response(request)
+        return self._finish(response, stats, started)
+
+    def _finish(self, response, stats, started):
+        REQUEST_SECONDS.observe(time.perf_counter() - started, view=stats.label)
+        REQUEST_RPC_CALLS.observe(stats.calls, view=stats.label)
+
+        if stats.calls:
+            response['X-RPC-Calls'] = str(stats.calls)
+            response['X-RPC-Round-Trips'] = f"{stats.round_trips:.2f}"
+            response['X-RPC-Round-Trips-Saved'] = f"{stats.saved:.2f}"
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.rpc_stats.label = request.resolver_match.view_name
+        return None
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware that also runs async. The stock one is sync-only,
+    and a sync middleware at the top of the stack makes Django hold a thread
+    for every request under ASGI. Static files are still served from a
+    thread; everything else is passed straight on.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    def _find(self, path_info):
+        return self.find_file(path_info) if self.autorefresh else self.files.get(path_info)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self._find)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
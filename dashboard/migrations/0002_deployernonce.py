@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeployerNonce',
+            fields=[
+                ('address', models.CharField(max_length=42, primary_key=True, serialize=False)),
+                ('next_nonce', models.BigIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'deployer_nonces',
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_deployernonce'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionJob',
+            fields=[
+                ('job_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('deploy', 'Deploy'), ('fund', 'Initial funding'), ('complete', 'Complete'), ('refund', 'Refund')], max_length=20)),
+                ('state', models.CharField(choices=[('queued', 'Queued'), ('sent', 'Sent'), ('confirmed', 'Confirmed'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('contract_id', models.IntegerField(db_index=True)),
+                ('nonce', models.BigIntegerField(blank=True, null=True)),
+                ('tx_hash', models.CharField(blank=True, default='', max_length=66)),
+                ('raw_tx', models.TextField(blank=True, default='')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'transaction_jobs',
+                'ordering': ['job_id'],
+                'indexes': [models.Index(fields=['state', 'job_id'], name='tx_jobs_state_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,124 @@
+import hashlib
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def abi_hash(abi):
+    # Must match dashboard.artifacts.abi_hash.
+    canonical = json.dumps(abi, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _contracts_table_exists(schema_editor):
+    # 'contracts' is unmanaged (it lives in Supabase); a fresh database such
+    # as the test database does not have it, so there is nothing to move.
+    return 'contracts' in schema_editor.connection.introspection.table_names()
+
+
+def move_abi_to_registry(apps, schema_editor):
+    if not _contracts_table_exists(schema_editor):
+        return
+
+    ContractArtifact = apps.get_model('dashboard', 'ContractArtifact')
+    connection = schema_editor.connection
+    qn = schema_editor.quote_name
+    hash_type = models.CharField(max_length=64).db_type(connection)
+
+    schema_editor.execute(f"ALTER TABLE {qn('contracts')} ADD COLUMN {qn('artifact_hash')} {hash_type} NULL")
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {qn('contract_id')}, {qn('contract_abi')} FROM {qn('contracts')}")
+        rows = cursor.fetchall()
+
+    contract_ids_by_hash = {}
+    for contract_id, abi in rows:
+        if isinstance(abi, str):
+            abi = json.loads(abi)
+        if not abi:
+            continue
+        key = abi_hash(abi)
+        if key not in contract_ids_by_hash:
+            ContractArtifact.objects.get_or_create(
+                abi_hash=key, defaults={'contract_name': 'SimpleTransfer', 'abi': abi}
+            )
+            contract_ids_by_hash[key] = []
+        contract_ids_by_hash[key].append(contract_id)
+
+    with connection.cursor() as cursor:
+        for key, contract_ids in contract_ids_by_hash.items():
+            for start in range(0, len(contract_ids), 500):
+                chunk = contract_ids[start:start + 500]
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(
+                    f"UPDATE {qn('contracts')} SET {qn('artifact_hash')} = %s "
+                    f"WHERE {qn('contract_id')} IN ({placeholders})",
+                    [key, *chunk],
+                )
+
+    schema_editor.execute(f"ALTER TABLE {qn('contracts')} DROP COLUMN {qn('contract_abi')}")
+
+
+def restore_abi_column(apps, schema_editor):
+    if not _contracts_table_exists(schema_editor):
+        return
+
+    ContractArtifact = apps.get_model('dashboard', 'ContractArtifact')
+    connection = schema_editor.connection
+    qn = schema_editor.quote_name
+    abi_type = models.JSONField().db_type(connection)
+
+    schema_editor.execute(f"ALTER TABLE {qn('contracts')} ADD COLUMN {qn('contract_abi')} {abi_type} NULL")
+    with connection.cursor() as cursor:
+        for artifact in ContractArtifact.objects.all():
+            cursor.execute(
+                f"UPDATE {qn('contracts')} SET {qn('contract_abi')} = %s WHERE {qn('artifact_hash')} = %s",
+                [json.dumps(artifact.abi), artifact.abi_hash],
+            )
+    schema_editor.execute(f"ALTER TABLE {qn('contracts')} DROP COLUMN {qn('artifact_hash')}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_transactionjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractArtifact',
+            fields=[
+                ('abi_hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('contract_name', models.CharField(blank=True, default='', max_length=100)),
+                ('abi', models.JSONField()),
+                ('bytecode', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'contract_artifacts',
+            },
+        ),
+        # Django does not alter unmanaged tables, so the column changes on
+        # 'contracts' are done by hand and the model state is updated alongside.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(move_abi_to_registry, restore_abi_column),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='contract',
+                    name='artifact',
+                    field=models.ForeignKey(
+                        blank=True, db_column='artifact_hash', db_constraint=False, null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name='contracts', to='dashboard.contractartifact',
+                    ),
+                ),
+                migrations.RemoveField(
+                    model_name='contract',
+                    name='contract_abi',
+                ),
+            ],
+        ),
+    ]
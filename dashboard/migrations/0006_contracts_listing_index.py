@@ -0,0 +1,40 @@
+from django.db import migrations, models
+
+
+LISTING_INDEX = models.Index(fields=['status', 'end_date', 'contract_id'], name='contracts_status_end_idx')
+
+
+def _existing_indexes(schema_editor):
+    # Returns None when the unmanaged 'contracts' table does not exist (e.g. in
+    # the test database); otherwise the names of its indexes and constraints.
+    connection = schema_editor.connection
+    if 'contracts' not in connection.introspection.table_names():
+        return None
+    with connection.cursor() as cursor:
+        return set(connection.introspection.get_constraints(cursor, 'contracts'))
+
+
+def add_listing_index(apps, schema_editor):
+    existing = _existing_indexes(schema_editor)
+    if existing is None or LISTING_INDEX.name in existing:
+        return
+    schema_editor.add_index(apps.get_model('dashboard', 'Contract'), LISTING_INDEX)
+
+
+def remove_listing_index(apps, schema_editor):
+    existing = _existing_indexes(schema_editor)
+    if existing is None or LISTING_INDEX.name not in existing:
+        return
+    schema_editor.remove_index(apps.get_model('dashboard', 'Contract'), LISTING_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0005_idsequence'),
+    ]
+
+    # 'contracts' is unmanaged, so Django will not create Meta.indexes for it.
+    operations = [
+        migrations.RunPython(add_listing_index, remove_listing_index),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0006_contracts_listing_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TemperatureReading',
+            fields=[
+                ('reading_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('contract_id', models.IntegerField()),
+                ('device_id', models.CharField(max_length=64)),
+                ('recorded_at', models.DateTimeField()),
+                ('temperature', models.FloatField()),
+                ('received_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'temperature_readings',
+                'indexes': [models.Index(fields=['contract_id', 'recorded_at'], name='readings_contract_time_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0007_temperaturereading'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReadingRollupHour',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('contract_id', models.IntegerField()),
+                ('bucket', models.DateTimeField()),
+                ('count', models.IntegerField()),
+                ('total', models.FloatField()),
+                ('min_temp', models.FloatField()),
+                ('max_temp', models.FloatField()),
+            ],
+            options={
+                'db_table': 'reading_rollups_1h',
+                'constraints': [models.UniqueConstraint(fields=('contract_id', 'bucket'), name='rollups_1h_contract_bucket_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReadingRollupMinute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('contract_id', models.IntegerField()),
+                ('bucket', models.DateTimeField()),
+                ('count', models.IntegerField()),
+                ('total', models.FloatField()),
+                ('min_temp', models.FloatField()),
+                ('max_temp', models.FloatField()),
+            ],
+            options={
+                'db_table': 'reading_rollups_1m',
+                'constraints': [models.UniqueConstraint(fields=('contract_id', 'bucket'), name='rollups_1m_contract_bucket_uniq')],
+            },
+        ),
+    ]
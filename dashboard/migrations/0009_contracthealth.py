@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0008_reading_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractHealth',
+            fields=[
+                ('contract_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('state', models.CharField(choices=[('ok', 'OK'), ('alert', 'Alert')], default='ok', max_length=10)),
+                ('state_changed_at', models.DateTimeField(blank=True, null=True)),
+                ('latest_temperature', models.FloatField()),
+                ('latest_recorded_at', models.DateTimeField()),
+                ('above_threshold', models.BooleanField(default=False)),
+                ('run_started_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'contract_health',
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0009_contracthealth'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertIncident',
+            fields=[
+                ('incident_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('contract_id', models.IntegerField()),
+                ('threshold', models.FloatField()),
+                ('started_at', models.DateTimeField()),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+                ('peak_temperature', models.FloatField()),
+                ('breach_count', models.PositiveIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'alert_incidents',
+                'indexes': [models.Index(fields=['contract_id', '-started_at'], name='incidents_contract_idx'), models.Index(fields=['-ended_at'], name='incidents_ended_idx'), models.Index(condition=models.Q(('ended_at__isnull', True)), fields=['-started_at'], name='incidents_open_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0010_alertincident'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contracthealth',
+            index=models.Index(fields=['updated_at'], name='contract_health_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,86 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+UPDATED_INDEX = models.Index(fields=['updated_at'], name='contracts_updated_idx')
+
+
+def _contracts_table_exists(schema_editor):
+    # 'contracts' is unmanaged (it lives in Supabase); a fresh database such
+    # as the test database does not have it.
+    return 'contracts' in schema_editor.connection.introspection.table_names()
+
+
+def _new_fields():
+    version = models.IntegerField(default=1)
+    version.set_attributes_from_name('version')
+    updated_at = models.DateTimeField(default=django.utils.timezone.now)
+    updated_at.set_attributes_from_name('updated_at')
+    return version, updated_at
+
+
+def add_version_columns(apps, schema_editor):
+    if not _contracts_table_exists(schema_editor):
+        return
+    # Plain ALTER TABLE ... ADD COLUMN: schema_editor.add_field() would make
+    # SQLite rebuild the table from the historical model, which knows nothing
+    # about the columns and indexes the Supabase schema has and Django doesn't.
+    # Existing rows get version 1 and updated_at = now.
+    qn = schema_editor.quote_name
+    for field in _new_fields():
+        default = schema_editor.quote_value(schema_editor.effective_default(field))
+        schema_editor.execute(
+            f"ALTER TABLE {qn('contracts')} ADD COLUMN {qn(field.column)} "
+            f"{field.db_type(schema_editor.connection)} NOT NULL DEFAULT {default}"
+        )
+        if schema_editor.connection.vendor == 'postgresql':
+            # Like add_field(): the default only fills existing rows.
+            schema_editor.execute(f"ALTER TABLE {qn('contracts')} ALTER COLUMN {qn(field.column)} DROP DEFAULT")
+
+
+def remove_version_columns(apps, schema_editor):
+    if not _contracts_table_exists(schema_editor):
+        return
+    qn = schema_editor.quote_name
+    for field in _new_fields():
+        schema_editor.execute(f"ALTER TABLE {qn('contracts')} DROP COLUMN {qn(field.column)}")
+
+
+def add_updated_index(apps, schema_editor):
+    if _contracts_table_exists(schema_editor):
+        schema_editor.add_index(apps.get_model('dashboard', 'Contract'), UPDATED_INDEX)
+
+
+def remove_updated_index(apps, schema_editor):
+    if _contracts_table_exists(schema_editor):
+        schema_editor.remove_index(apps.get_model('dashboard', 'Contract'), UPDATED_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0011_contract_health_updated_idx'),
+    ]
+
+    # Django does not alter unmanaged tables, so the columns and index on
+    # 'contracts' are added by hand and the model state is updated alongside.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(add_version_columns, remove_version_columns),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='contract',
+                    name='version',
+                    field=models.IntegerField(default=1),
+                ),
+                migrations.AddField(
+                    model_name='contract',
+                    name='updated_at',
+                    field=models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+        ),
+        migrations.RunPython(add_updated_index, remove_updated_index),
+    ]
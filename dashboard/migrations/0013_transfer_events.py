@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0012_contract_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexerCheckpoint',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('block_number', models.BigIntegerField()),
+                ('block_hash', models.CharField(max_length=66)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'indexer_checkpoints',
+            },
+        ),
+        migrations.CreateModel(
+            name='TransferEvent',
+            fields=[
+                ('event_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('contract_id', models.IntegerField()),
+                ('contract_address', models.CharField(max_length=42)),
+                ('block_number', models.BigIntegerField()),
+                ('block_hash', models.CharField(max_length=66)),
+                ('tx_hash', models.CharField(max_length=66)),
+                ('log_index', models.IntegerField()),
+                ('from_address', models.CharField(max_length=42)),
+                ('to_address', models.CharField(max_length=42)),
+                ('value', models.DecimalField(decimal_places=0, max_digits=78)),
+                ('indexed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'transfer_events',
+                'indexes': [models.Index(fields=['contract_id', 'block_number'], name='transfers_contract_block_idx'), models.Index(fields=['block_number', 'log_index'], name='transfers_block_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tx_hash', 'log_index'), name='transfer_events_log_uniq')],
+            },
+        ),
+    ]
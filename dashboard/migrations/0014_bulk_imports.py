@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0013_transfer_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkImport',
+            fields=[
+                ('import_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('source', models.CharField(blank=True, default='', max_length=255)),
+                ('state', models.CharField(choices=[('queuing', 'Queuing'), ('queued', 'Queued')], default='queuing', max_length=20)),
+                ('total_rows', models.PositiveIntegerField(default=0)),
+                ('next_line', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'bulk_imports',
+            },
+        ),
+        migrations.CreateModel(
+            name='BulkImportRow',
+            fields=[
+                ('row_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('line_number', models.PositiveIntegerField()),
+                ('buyer_address', models.CharField(blank=True, default='', max_length=42)),
+                ('seller_address', models.CharField(blank=True, default='', max_length=42)),
+                ('product_name', models.CharField(blank=True, default='', max_length=100)),
+                ('price', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('quantity', models.IntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('invalid', 'Invalid'), ('pending', 'Pending'), ('queued', 'Queued')], default='pending', max_length=20)),
+                ('error', models.TextField(blank=True, default='')),
+                ('contract_id', models.IntegerField(blank=True, null=True)),
+                ('job_id', models.BigIntegerField(blank=True, null=True)),
+                ('bulk_import', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rows', to='dashboard.bulkimport')),
+            ],
+            options={
+                'db_table': 'bulk_import_rows',
+                'constraints': [models.UniqueConstraint(fields=('bulk_import', 'line_number'), name='bulk_rows_line_uniq')],
+            },
+        ),
+    ]
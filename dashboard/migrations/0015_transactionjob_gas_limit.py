@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0014_bulk_imports'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transactionjob',
+            name='gas_limit',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0015_transactionjob_gas_limit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contractartifact',
+            name='artifact_key',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+    ]
@@ -1,4 +1,36 @@
 from django.db import models
+from django.db.models import F
+from django.utils import timezone
+
+class ContractArtifact(models.Model):
+    # Deduplicated ABI registry, keyed by the SHA-256 of the canonical ABI JSON
+    # (see dashboard.artifacts.abi_hash). Bytecode is empty for rows that were
+    # backfilled from old contracts.contract_abi values. artifact_key is the
+    # compiled-artifact key (dashboard.artifacts.artifact_key) of the row that
+    # compile_contracts stored, so processes without the artifact file can
+    # load the bytecode from here.
+    abi_hash = models.CharField(max_length=64, primary_key=True)
+    contract_name = models.CharField(max_length=100, blank=True, default='')
+    abi = models.JSONField()
+    bytecode = models.TextField(blank=True, default='')
+    artifact_key = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'contract_artifacts'
+
+    def __str__(self):
+        return f"{self.contract_name or 'ABI'} {self.abi_hash[:12]}"
+
+
+class ContractQuerySet(models.QuerySet):
+    def update_versioned(self, **fields):
+        """
+        update() that also bumps version and updated_at, which the JSON API
+        uses for ETags and ?since= deltas. Use it for every change to contracts.
+        """
+        return self.update(version=F('version') + 1, updated_at=timezone.now(), **fields)
+
 
 class Contract(models.Model):
     # Matches DB: SERIAL PRIMARY KEY -> IntegerField
@@ -25,15 +57,343 @@ class Contract(models.Model):
     # Matches DB: VARCHAR(255). 42 is sufficient, but 255 is fine.
     contract_address = models.CharField(max_length=42, default='0x') 
     
-    # NEW FIELD: Uses Django's JSONField, which maps to PostgreSQL's JSONB type
-    contract_abi = models.JSONField(default=dict) 
+    # Reference into contract_artifacts instead of a per-row copy of the ABI;
+    # every SimpleTransfer deployment shares the same row.
+    artifact = models.ForeignKey(
+        'ContractArtifact', db_column='artifact_hash', null=True, blank=True,
+        on_delete=models.PROTECT, db_constraint=False, related_name='contracts',
+    )
     temperature_threshold = models.FloatField(default=-8)
     
     # Matches DB: VARCHAR(50). Default should match your DB if possible, but 'active' works for filtering.
     status = models.CharField(max_length=50, default='active') 
 
+    # Added by migration 0012. Bumped on every change (see update_versioned)
+    # so API clients can use ETags and ask for changes since a timestamp.
+    version = models.IntegerField(default=1)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    objects = ContractQuerySet.as_manager()
+
 
     class Meta:
         # Crucial: Link to your existing Supabase table name
         db_table = 'contracts' 
         managed = False
+        # Created by migration 0006 (Django skips indexes on unmanaged models).
+        # Serves the keyset-paginated listings: WHERE status = %s ORDER BY end_date, contract_id.
+        indexes = [
+            models.Index(fields=['status', 'end_date', 'contract_id'], name='contracts_status_end_idx'),
+            # Created by migration 0012; serves ?since= and the list ETags.
+            models.Index(fields=['updated_at'], name='contracts_updated_idx'),
+        ]
+
+
+class DeployerNonce(models.Model):
+    # One row per sending account. next_nonce is the next nonce to hand out;
+    # rows are only changed with single UPDATE statements so concurrent
+    # workers (threads or gunicorn processes) never get the same value.
+    address = models.CharField(max_length=42, primary_key=True)
+    next_nonce = models.BigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'deployer_nonces'
+
+
+class IdSequence(models.Model):
+    # Counters for ids that are not generated by the database (contracts is an
+    # existing Supabase table). next_value is the first id not yet reserved by
+    # any process; see dashboard/ids.py.
+    name = models.CharField(max_length=50, primary_key=True)
+    next_value = models.BigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'id_sequences'
+
+
+class TransactionJob(models.Model):
+    # Deploy and settlement transactions are queued here by the views and
+    # sent/confirmed by 'python manage.py run_tx_worker'.
+    KIND_DEPLOY = 'deploy'
+    KIND_FUND = 'fund'          # initial Refund to the seller after deployment
+    KIND_COMPLETE = 'complete'  # Deposit to the seller
+    KIND_REFUND = 'refund'      # Refund to the buyer
+    KIND_CHOICES = [
+        (KIND_DEPLOY, 'Deploy'),
+        (KIND_FUND, 'Initial funding'),
+        (KIND_COMPLETE, 'Complete'),
+        (KIND_REFUND, 'Refund'),
+    ]
+
+    STATE_QUEUED = 'queued'
+    STATE_SENT = 'sent'
+    STATE_CONFIRMED = 'confirmed'
+    STATE_FAILED = 'failed'
+    STATE_CHOICES = [
+        (STATE_QUEUED, 'Queued'),
+        (STATE_SENT, 'Sent'),
+        (STATE_CONFIRMED, 'Confirmed'),
+        (STATE_FAILED, 'Failed'),
+    ]
+    OPEN_STATES = (STATE_QUEUED, STATE_SENT)
+
+    job_id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default=STATE_QUEUED)
+    contract_id = models.IntegerField(db_index=True)
+
+    # Signed transaction is stored before broadcasting so a restarted worker
+    # can re-send the exact same transaction instead of signing a new one.
+    nonce = models.BigIntegerField(null=True, blank=True)
+    gas_limit = models.BigIntegerField(null=True, blank=True)
+    tx_hash = models.CharField(max_length=66, blank=True, default='')
+    raw_tx = models.TextField(blank=True, default='')
+
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'transaction_jobs'
+        ordering = ['job_id']
+        indexes = [
+            models.Index(fields=['state', 'job_id'], name='tx_jobs_state_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.job_id} ({self.state})"
+
+
+class TemperatureReading(models.Model):
+    # Raw sensor telemetry, written in bulk by dashboard.telemetry (COPY on
+    # Postgres). contract_id is a plain integer like TransactionJob's because
+    # contracts lives in an unmanaged table.
+    reading_id = models.BigAutoField(primary_key=True)
+    contract_id = models.IntegerField()
+    device_id = models.CharField(max_length=64)
+    recorded_at = models.DateTimeField()
+    temperature = models.FloatField()
+    received_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'temperature_readings'
+        indexes = [
+            models.Index(fields=['contract_id', 'recorded_at'], name='readings_contract_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.device_id} {self.temperature:.1f}°C @ {self.recorded_at:%Y-%m-%d %H:%M:%S}"
+
+
+class ReadingRollup(models.Model):
+    # Per-contract temperature aggregates for one time bucket, kept up to date
+    # by dashboard.rollups as readings are ingested. avg is total / count so
+    # buckets can be merged without rereading raw rows.
+    contract_id = models.IntegerField()
+    bucket = models.DateTimeField()  # start of the bucket, UTC
+    count = models.IntegerField()
+    total = models.FloatField()
+    min_temp = models.FloatField()
+    max_temp = models.FloatField()
+
+    class Meta:
+        abstract = True
+
+    @property
+    def avg_temp(self):
+        return self.total / self.count
+
+
+class ReadingRollupMinute(ReadingRollup):
+    class Meta:
+        db_table = 'reading_rollups_1m'
+        constraints = [
+            models.UniqueConstraint(fields=['contract_id', 'bucket'], name='rollups_1m_contract_bucket_uniq'),
+        ]
+
+
+class ReadingRollupHour(ReadingRollup):
+    class Meta:
+        db_table = 'reading_rollups_1h'
+        constraints = [
+            models.UniqueConstraint(fields=['contract_id', 'bucket'], name='rollups_1h_contract_bucket_uniq'),
+        ]
+
+
+class ContractHealth(models.Model):
+    # Precomputed Alert/OK state per contract, written by dashboard.alerting on
+    # every ingest batch so the views never compare readings themselves.
+    STATE_OK = 'ok'
+    STATE_ALERT = 'alert'
+    STATE_CHOICES = [
+        (STATE_OK, 'OK'),
+        (STATE_ALERT, 'Alert'),
+    ]
+
+    contract_id = models.IntegerField(primary_key=True)
+    state = models.CharField(max_length=10, choices=STATE_CHOICES, default=STATE_OK)
+    state_changed_at = models.DateTimeField(null=True, blank=True)
+
+    latest_temperature = models.FloatField()
+    latest_recorded_at = models.DateTimeField()
+    # Whether the latest reading is above the threshold, and since when the
+    # readings have been on that side of it (the debounce / duration window).
+    above_threshold = models.BooleanField(default=False)
+    run_started_at = models.DateTimeField()
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'contract_health'
+        indexes = [
+            # The live feed polls for rows changed since its last poll.
+            models.Index(fields=['updated_at'], name='contract_health_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"Contract {self.contract_id}: {self.get_state_display()}"
+
+
+class AlertIncident(models.Model):
+    # One threshold breach interval per contract, opened and closed by
+    # dashboard.incidents from the state changes dashboard.alerting reports.
+    # A breach starting soon after the previous one ended reopens that
+    # incident instead of creating a new one.
+    incident_id = models.BigAutoField(primary_key=True)
+    contract_id = models.IntegerField()
+    threshold = models.FloatField()
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField(null=True, blank=True)  # null while open
+    # Highest reading in the breach runs that opened or reopened the incident.
+    peak_temperature = models.FloatField()
+    breach_count = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'alert_incidents'
+        indexes = [
+            models.Index(fields=['contract_id', '-started_at'], name='incidents_contract_idx'),
+            models.Index(fields=['-ended_at'], name='incidents_ended_idx'),
+            models.Index(
+                fields=['-started_at'], name='incidents_open_idx',
+                condition=models.Q(ended_at__isnull=True),
+            ),
+        ]
+
+    @property
+    def is_open(self):
+        return self.ended_at is None
+
+    def __str__(self):
+        return f"Contract {self.contract_id} breach from {self.started_at:%Y-%m-%d %H:%M}"
+
+
+class TransferEvent(models.Model):
+    # Decoded SimpleTransfer Transfer(from, to, value) logs, written by
+    # dashboard.indexer ('python manage.py index_transfers'). Rows in the last
+    # INDEXER_REORG_DEPTH blocks are rewritten if those blocks get reorged.
+    event_id = models.BigAutoField(primary_key=True)
+    contract_id = models.IntegerField()
+    contract_address = models.CharField(max_length=42)
+    block_number = models.BigIntegerField()
+    block_hash = models.CharField(max_length=66)
+    tx_hash = models.CharField(max_length=66)
+    log_index = models.IntegerField()
+    from_address = models.CharField(max_length=42)
+    to_address = models.CharField(max_length=42)
+    value = models.DecimalField(max_digits=78, decimal_places=0)  # uint256, in wei
+    indexed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'transfer_events'
+        constraints = [
+            models.UniqueConstraint(fields=['tx_hash', 'log_index'], name='transfer_events_log_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['contract_id', 'block_number'], name='transfers_contract_block_idx'),
+            # Serves the re-index delete (block_number >= n) and the newest-first listing.
+            models.Index(fields=['block_number', 'log_index'], name='transfers_block_idx'),
+        ]
+
+    def __str__(self):
+        return f"Contract {self.contract_id}: {self.value} wei to {self.to_address} (block {self.block_number})"
+
+
+class IndexerCheckpoint(models.Model):
+    # Last block an indexer has fully processed, with its hash so the next
+    # run can tell whether that block was reorged away.
+    name = models.CharField(max_length=50, primary_key=True)
+    block_number = models.BigIntegerField()
+    block_hash = models.CharField(max_length=66)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'indexer_checkpoints'
+
+    def __str__(self):
+        return f"{self.name} @ {self.block_number}"
+
+
+class BulkImport(models.Model):
+    # One uploaded CSV of contracts (dashboard/bulk.py). next_line is the
+    # resume checkpoint: every valid row before it has its contract and
+    # deploy job committed.
+    STATE_QUEUING = 'queuing'
+    STATE_QUEUED = 'queued'
+    STATE_CHOICES = [
+        (STATE_QUEUING, 'Queuing'),
+        (STATE_QUEUED, 'Queued'),
+    ]
+
+    import_id = models.BigAutoField(primary_key=True)
+    source = models.CharField(max_length=255, blank=True, default='')
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default=STATE_QUEUING)
+    total_rows = models.PositiveIntegerField(default=0)
+    next_line = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'bulk_imports'
+
+    def __str__(self):
+        return f"Import #{self.import_id} ({self.source or 'upload'}, {self.total_rows} rows)"
+
+
+class BulkImportRow(models.Model):
+    # One CSV row and what became of it. Deployment progress is read from the
+    # row's transaction job, so nothing here changes after queuing.
+    STATUS_INVALID = 'invalid'
+    STATUS_PENDING = 'pending'
+    STATUS_QUEUED = 'queued'
+    STATUS_CHOICES = [
+        (STATUS_INVALID, 'Invalid'),
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_QUEUED, 'Queued'),
+    ]
+
+    row_id = models.BigAutoField(primary_key=True)
+    bulk_import = models.ForeignKey(BulkImport, on_delete=models.CASCADE, related_name='rows')
+    line_number = models.PositiveIntegerField()
+    buyer_address = models.CharField(max_length=42, blank=True, default='')
+    seller_address = models.CharField(max_length=42, blank=True, default='')
+    product_name = models.CharField(max_length=100, blank=True, default='')
+    price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    quantity = models.IntegerField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    error = models.TextField(blank=True, default='')
+    contract_id = models.IntegerField(null=True, blank=True)
+    job_id = models.BigIntegerField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'bulk_import_rows'
+        constraints = [
+            models.UniqueConstraint(fields=['bulk_import', 'line_number'], name='bulk_rows_line_uniq'),
+        ]
+
+    def __str__(self):
+        return f"Import #{self.bulk_import_id} line {self.line_number} ({self.status})"
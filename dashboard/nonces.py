@@ -0,0 +1,53 @@
+"""
+Local nonce allocation for the deployer account.
+
+Nonces are handed out from the deployer_nonces table instead of calling
+eth_getTransactionCount before every send. The row is seeded from the pending
+transaction count on first use and resynced from it whenever a send is
+rejected.
+
+A resync never moves the counter to or below a nonce an open (queued or
+sent) job holds: the node's pending count leaves out transactions it has
+not received yet or keeps behind a nonce gap, and handing such a nonce out
+again would sign two transactions for it.
+"""
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .counters import reserve_block
+from .models import DeployerNonce, TransactionJob
+
+
+def allocate_nonce(web3, address, count=1):
+    """
+    Reserves `count` sequential nonces for `address` and returns the first one
+    (see dashboard/counters.py). The row is seeded from the pending count.
+    """
+    return reserve_block(
+        DeployerNonce, address, 'next_nonce', count,
+        first_value=lambda: web3.eth.get_transaction_count(address, 'pending'),
+    )
+
+
+def resync_nonce(web3, address, pending=None):
+    """
+    Resets the local counter to the pending transaction count reported by
+    the node (or `pending`, if the caller just fetched it), or to just above
+    the highest nonce an open job holds if that is higher. Returns the new
+    value.
+    """
+    if pending is None:
+        pending = web3.eth.get_transaction_count(address, 'pending')
+    with transaction.atomic():
+        # Take the counter row's write lock first: a block another worker has
+        # reserved is stored on its jobs in the same transaction, so once the
+        # lock is ours those jobs are visible below.
+        DeployerNonce.objects.filter(address=address).update(updated_at=timezone.now())
+        highest = TransactionJob.objects.filter(
+            state__in=TransactionJob.OPEN_STATES,
+        ).aggregate(top=Max('nonce'))['top']
+        next_nonce = pending if highest is None else max(pending, highest + 1)
+        DeployerNonce.objects.update_or_create(address=address, defaults={'next_nonce': next_nonce})
+    return next_nonce
+
@@ -0,0 +1,61 @@
+"""
+Keyset (cursor) pagination for the contract listings.
+
+Pages are ordered by (end_date, contract_id) within one status and the
+cursor is the key of the last row shown, so fetching page N costs the same
+index range scan as fetching page 1 (no OFFSET). The contracts_status_end_idx
+index on (status, end_date, contract_id) covers both the filter and the sort.
+"""
+import base64
+import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+
+def encode_cursor(contract):
+    raw = f"{contract.end_date.isoformat()}|{contract.contract_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Returns (end_date, contract_id), or None for a missing/garbled cursor."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        end_date, contract_id = raw.split('|')
+        return datetime.datetime.fromisoformat(end_date), int(contract_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_page(queryset, cursor=None, page_size=None, descending=False):
+    """
+    Returns (rows, next_cursor) for the page after `cursor`. `queryset` must
+    already be filtered to a single status. next_cursor is None on the last page.
+    """
+    page_size = page_size or settings.CONTRACTS_PAGE_SIZE
+    key = decode_cursor(cursor)
+
+    if key is not None:
+        end_date, contract_id = key
+        # Written as a range on end_date plus a tie-break so the database can
+        # seek into the index instead of evaluating an OR per row.
+        if descending:
+            queryset = queryset.filter(end_date__lte=end_date).exclude(
+                Q(end_date=end_date) & Q(contract_id__gte=contract_id)
+            )
+        else:
+            queryset = queryset.filter(end_date__gte=end_date).exclude(
+                Q(end_date=end_date) & Q(contract_id__lte=contract_id)
+            )
+
+    ordering = ('-end_date', '-contract_id') if descending else ('end_date', 'contract_id')
+    rows = list(queryset.order_by(*ordering)[:page_size + 1])
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1])
+    return rows, next_cursor
@@ -0,0 +1,222 @@
+"""
+Opt-in per-request profiling of SQL queries and template rendering.
+
+With PROFILING_ENABLED=1, ProfilingMiddleware records for every request:
+
+- the number of SQL queries and the time spent in them,
+- duplicate queries (the same SQL with the same parameters, run again) and
+  similar ones (the same SQL with other parameters; a loop of these is
+  the usual N+1),
+- the time spent rendering templates (top-level renders only, so
+  {% include %} is not counted twice; queries run lazily from a template
+  count towards both).
+
+They are sent back as X-Profile-* headers. The last PROFILING_WINDOW
+requests of each view are kept in memory per process and summarised on
+/dashboard/profiling/. When disabled, the middleware removes itself at
+startup and costs nothing.
+
+QueryCountAssertions gives tests assertQueriesConstant(), which fails when
+a view's query count grows with the number of rows it lists.
+"""
+import collections
+import contextvars
+import statistics
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+_current_profile = contextvars.ContextVar('request_profile', default=None)
+_original_render = None
+
+
+class RequestProfile:
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+        self._statements = collections.Counter()  # (sql, params) -> executions
+        self._shapes = collections.Counter()      # sql -> executions
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper() hook; wraps every query on the connection.
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+            self._statements[(sql, repr(params))] += 1
+            self._shapes[sql] += 1
+
+    @property
+    def duplicates(self):
+        return sum(count - 1 for count in self._statements.values())
+
+    @property
+    def similar(self):
+        return sum(count - 1 for count in self._shapes.values())
+
+    def sample(self, total_seconds):
+        return {
+            'queries': self.queries,
+            'db_ms': self.db_seconds * 1000,
+            'duplicates': self.duplicates,
+            'similar': self.similar,
+            'template_ms': self.template_seconds * 1000,
+            'total_ms': total_seconds * 1000,
+        }
+
+
+def _install_template_timer():
+    """Wraps django.template.base.Template.render once so renders are timed per request."""
+    global _original_render
+    from django.template.base import Template
+
+    if _original_render is not None:
+        return
+    _original_render = Template.render
+
+    def render(self, context):
+        profile = _current_profile.get()
+        if profile is None:
+            return _original_render(self, context)
+        profile.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return _original_render(self, context)
+        finally:
+            profile.template_depth -= 1
+            if profile.template_depth == 0:
+                profile.template_seconds += time.perf_counter() - started
+
+    Template.render = render
+
+
+def capture(func, *args, **kwargs):
+    """Runs `func` with queries and template renders recorded; returns (result, RequestProfile)."""
+    _install_template_timer()
+    profile = RequestProfile()
+    token = _current_profile.set(profile)
+    try:
+        with ExitStack() as stack:
+            # Getting the wrapper does not connect; the hook also covers
+            # connections first opened inside the block.
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(profile))
+            result = func(*args, **kwargs)
+    finally:
+        _current_profile.reset(token)
+    return result, profile
+
+
+def within_current(func, *args, **kwargs):
+    """
+    Runs `func` with its queries added to the current request's profile, if any.
+    For work handed to another thread (see async_db), whose connections the
+    request's own execute_wrapper() does not cover.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return func(*args, **kwargs)
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(profile))
+        return func(*args, **kwargs)
+
+
+class ProfileSummary:
+    """Rolling per-view window of request samples, for the summary page."""
+
+    def __init__(self, window=None):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}  # view name -> deque of sample dicts
+
+    def record(self, view, sample):
+        with self._lock:
+            samples = self._samples.get(view)
+            if samples is None:
+                samples = self._samples[view] = collections.deque(maxlen=self.window or settings.PROFILING_WINDOW)
+            samples.append(sample)
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def rows(self):
+        """One summary dict per view, the most queries per request first."""
+        with self._lock:
+            snapshot = {view: list(samples) for view, samples in self._samples.items()}
+
+        rows = []
+        for view, samples in snapshot.items():
+            queries = [s['queries'] for s in samples]
+            total = sorted(s['total_ms'] for s in samples)
+            rows.append({
+                'view': view,
+                'requests': len(samples),
+                'avg_queries': round(statistics.fmean(queries), 1),
+                'max_queries': max(queries),
+                'avg_db_ms': round(statistics.fmean(s['db_ms'] for s in samples), 2),
+                'avg_template_ms': round(statistics.fmean(s['template_ms'] for s in samples), 2),
+                'avg_duplicates': round(statistics.fmean(s['duplicates'] for s in samples), 1),
+                'avg_similar': round(statistics.fmean(s['similar'] for s in samples), 1),
+                'p50_total_ms': round(total[len(total) // 2], 2),
+                'p95_total_ms': round(total[min(len(total) - 1, int(len(total) * 0.95))], 2),
+            })
+        rows.sort(key=lambda row: row['avg_queries'], reverse=True)
+        return rows
+
+
+profile_summary = ProfileSummary()
+
+
+class ProfilingMiddleware:
+    """Adds X-Profile-* headers and feeds profile_summary. Only active with PROFILING_ENABLED."""
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response, profile = capture(self.get_response, request)
+        sample = profile.sample(time.perf_counter() - started)
+
+        match = getattr(request, 'resolver_match', None)
+        profile_summary.record(match.view_name if match else 'unresolved', sample)
+
+        response['X-Profile-Queries'] = str(sample['queries'])
+        response['X-Profile-DB-ms'] = f"{sample['db_ms']:.2f}"
+        response['X-Profile-Duplicate-Queries'] = str(sample['duplicates'])
+        response['X-Profile-Similar-Queries'] = str(sample['similar'])
+        response['X-Profile-Template-ms'] = f"{sample['template_ms']:.2f}"
+        response['X-Profile-Total-ms'] = f"{sample['total_ms']:.2f}"
+        return response
+
+
+class QueryCountAssertions:
+    """TestCase mixin with an N+1 check for views."""
+
+    def assertQueriesConstant(self, url, add_rows, sizes=(1, 10), client=None):
+        """
+        Calls `add_rows(n)` to bring the listing to each size in `sizes`, GETs
+        `url` and fails if the query count differs between the sizes.
+        """
+        client = client or self.client
+        counts = {}
+        for size in sizes:
+            add_rows(size)
+            response, profile = capture(client.get, url)
+            self.assertEqual(response.status_code, 200, f"GET {url} with {size} rows")
+            counts[size] = profile.queries
+        if len(set(counts.values())) > 1:
+            self.fail(f"Query count of {url} grows with the rows listed (rows: queries): {counts}")
+        return counts
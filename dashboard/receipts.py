@@ -0,0 +1,80 @@
+"""
+Block-driven receipt watcher.
+
+Instead of one wait_for_transaction_receipt() polling loop per transaction,
+the worker asks for the current block number and, only when a new block has
+arrived, fetches the receipts of every sent job in a single JSON-RPC batch.
+"""
+from collections import namedtuple
+
+from .metrics import span
+from .models import TransactionJob
+
+# The receipt fields the job queue uses, parsed from the raw JSON-RPC result.
+Receipt = namedtuple('Receipt', ['transactionHash', 'blockNumber', 'status', 'contractAddress', 'gasUsed'])
+
+
+def parse_receipt(raw):
+    from eth_utils import to_checksum_address
+
+    contract_address = raw.get('contractAddress')
+    return Receipt(
+        transactionHash=raw['transactionHash'],
+        blockNumber=int(raw['blockNumber'], 16),
+        status=int(raw['status'], 16),
+        contractAddress=to_checksum_address(contract_address) if contract_address else None,
+        gasUsed=int(raw.get('gasUsed') or '0x0', 16),
+    )
+
+
+def fetch_receipts(web3, tx_hashes):
+    """
+    Returns a list of receipts (or None for still-pending transactions) in the
+    same order as `tx_hashes`, using one batched eth_getTransactionReceipt
+    round trip. web3's own batch helper raises TransactionNotFound for the
+    whole batch on a single null result, so the raw provider call is used.
+    """
+    if not tx_hashes:
+        return []
+
+    responses = web3.provider.make_batch_request(
+        [('eth_getTransactionReceipt', [tx_hash]) for tx_hash in tx_hashes]
+    )
+    if not isinstance(responses, list):
+        # A single error object comes back when the node rejects the batch.
+        raise ConnectionError(f"Receipt batch failed: {responses.get('error')}")
+
+    receipts = []
+    for response in responses:
+        raw = response.get('result')
+        receipts.append(parse_receipt(raw) if raw else None)
+    return receipts
+
+
+class ReceiptWatcher:
+    """Tracks every 'sent' job and checks their receipts once per new block."""
+
+    def __init__(self, web3):
+        self.web3 = web3
+        self.last_block = None
+
+    def poll(self):
+        """
+        Checks for a new block and, if there is one, returns (job, receipt)
+        pairs for every sent job whose receipt is now available.
+        """
+        block_number = self.web3.eth.block_number
+        if block_number == self.last_block:
+            return []
+        self.last_block = block_number
+
+        sent_jobs = list(TransactionJob.objects.filter(state=TransactionJob.STATE_SENT))
+        if not sent_jobs:
+            return []
+
+        with span('receipt_poll'):
+            receipts = fetch_receipts(self.web3, [job.tx_hash for job in sent_jobs])
+        return [
+            (job, receipt) for job, receipt in zip(sent_jobs, receipts)
+            if receipt is not None
+        ]
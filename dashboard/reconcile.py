@@ -0,0 +1,171 @@
+"""
+Batched reconciliation of contracts.status against the chain.
+
+The worker keeps statuses in sync as receipts arrive, but a worker that died
+mid-flight, a failed job whose transaction was mined anyway, or a row edited
+by hand can leave contracts out of step with the chain. sweep() walks every
+contract that can still change (Pending, Active, Failed; Completed and
+Refunded are final) in contract_id order, RECONCILE_BATCH_SIZE rows at a
+time. Per batch it makes one JSON-RPC batch and a handful of indexed queries:
+
+1. Receipts: jobs still 'sent' after RECONCILE_STALE_SECONDS (the worker
+   normally handles them well before that) get their receipts in the batch;
+   mined ones go through jobs.apply_receipts() exactly as the worker would.
+2. Code: eth_getCode for every contract_address in the batch. An address
+   with no code means the deployment never landed (or was reorged away).
+3. Events: the Transfer events dashboard.indexer stored. A transfer to the
+   buyer is a refund; the first transfer to the seller is the initial
+   funding and a second one is the completion payment.
+
+Chain evidence only ever moves a status forward (Pending/Failed -> Active ->
+Completed/Refunded), except for step 2, which marks a contract whose code
+is missing and which has no transfers as Failed. Divergent rows are fixed
+with one update_versioned() per target status. eth_getBalance is not
+checked: SimpleTransfer forwards every payment, so its balance is always 0.
+"""
+import datetime
+import logging
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import jobs
+from .models import Contract, TransactionJob, TransferEvent
+from .receipts import parse_receipt
+
+OPEN_STATUSES = ('Pending', 'Active', 'Failed')
+# How far along the contract lifecycle each status is.
+STATUS_RANK = {'Pending': 0, 'Failed': 0, 'Active': 1, 'Completed': 2, 'Refunded': 2}
+LIST_FIELDS = ('contract_id', 'status', 'contract_address', 'buyer_address', 'seller_address')
+
+
+logger = logging.getLogger(__name__)
+
+
+def _has_address(contract):
+    address = contract.contract_address or ''
+    return len(address) == 42 and address.startswith('0x')
+
+
+def _status_from_events(contract, recipients):
+    """Status implied by the Transfer events sent to the buyer/seller, or None."""
+    buyer = (contract.buyer_address or '').lower()
+    seller = (contract.seller_address or '').lower()
+    if buyer in recipients:
+        return 'Refunded'
+    seller_transfers = recipients.count(seller)
+    if seller_transfers >= 2:
+        return 'Completed'
+    if seller_transfers == 1:
+        return 'Active'
+    return None
+
+
+class Reconciler:
+    def __init__(self, web3, batch_size=None):
+        self.web3 = web3
+        self.batch_size = batch_size or settings.RECONCILE_BATCH_SIZE
+
+    def _chain_state(self, contracts, stale_jobs):
+        """One JSON-RPC batch: eth_getCode per address, then receipts of the stale jobs."""
+        with_address = [c for c in contracts if _has_address(c)]
+        calls = [('eth_getCode', [c.contract_address, 'latest']) for c in with_address]
+        calls += [('eth_getTransactionReceipt', [job.tx_hash]) for job in stale_jobs]
+        if not calls:
+            return {}, []
+
+        responses = self.web3.provider.make_batch_request(calls)
+        if not isinstance(responses, list):
+            raise ConnectionError(f"Reconcile batch failed: {responses.get('error')}")
+        for response in responses:
+            if 'error' in response:
+                raise ConnectionError(f"Reconcile call failed: {response['error']}")
+
+        code = {
+            c.contract_id: response['result'] not in (None, '0x', '0x0')
+            for c, response in zip(with_address, responses)
+        }
+        receipts = [
+            (job, parse_receipt(response['result']))
+            for job, response in zip(stale_jobs, responses[len(with_address):])
+            if response['result']
+        ]
+        return code, receipts
+
+    def _expected_status(self, contract, has_code, recipients):
+        current = contract.status
+        from_events = _status_from_events(contract, recipients)
+        if from_events is not None:
+            return from_events if STATUS_RANK[from_events] > STATUS_RANK.get(current, 0) else current
+        if has_code is False and current in ('Pending', 'Active'):
+            return 'Failed'
+        return current
+
+    def _reconcile_batch(self, contracts):
+        ids = [c.contract_id for c in contracts]
+        stale_before = timezone.now() - datetime.timedelta(seconds=settings.RECONCILE_STALE_SECONDS)
+        stale_jobs = list(TransactionJob.objects.filter(
+            contract_id__in=ids, state=TransactionJob.STATE_SENT, updated_at__lt=stale_before,
+        ))
+        code, receipts = self._chain_state(contracts, stale_jobs)
+
+        # 1. Receipts the worker never applied. Re-read the batch afterwards,
+        #    since applying them can change statuses and addresses.
+        applied = jobs.apply_receipts(receipts) if receipts else 0
+        if applied:
+            contracts = list(Contract.objects.filter(contract_id__in=ids).only(*LIST_FIELDS))
+
+        # 2./3. Code and indexed Transfer events.
+        recipients = {}
+        for contract_id, to_address in TransferEvent.objects.filter(
+            contract_id__in=ids
+        ).values_list('contract_id', 'to_address'):
+            recipients.setdefault(contract_id, []).append(to_address.lower())
+
+        changes = {}       # new status -> [contract_id, ...]
+        transitions = {}   # (old, new) -> count, for the log
+        for contract in contracts:
+            expected = self._expected_status(
+                contract, code.get(contract.contract_id), recipients.get(contract.contract_id, []),
+            )
+            if expected != contract.status:
+                changes.setdefault(expected, []).append(contract.contract_id)
+                key = (contract.status, expected)
+                transitions[key] = transitions.get(key, 0) + 1
+
+        for status, contract_ids in changes.items():
+            Contract.objects.filter(contract_id__in=contract_ids).update_versioned(status=status)
+        if transitions:
+            summary = ', '.join(f"{old} -> {new}: {count}" for (old, new), count in transitions.items())
+            logger.info("contracts %s-%s: %s.", ids[0], ids[-1], summary)
+        return applied, sum(len(contract_ids) for contract_ids in changes.values())
+
+    def sweep(self):
+        """Reconciles every open contract. Returns a summary dict."""
+        started = time.perf_counter()
+        checked = batches = changed = receipts = 0
+        last_id = None
+
+        while True:
+            # Keyset batches on the primary key, so each one is an index range scan.
+            queryset = Contract.objects.filter(status__in=OPEN_STATUSES)
+            if last_id is not None:
+                queryset = queryset.filter(contract_id__gt=last_id)
+            contracts = list(queryset.only(*LIST_FIELDS).order_by('contract_id')[:self.batch_size])
+            if not contracts:
+                break
+            applied, updated = self._reconcile_batch(contracts)
+            checked += len(contracts)
+            batches += 1
+            receipts += applied
+            changed += updated
+            last_id = contracts[-1].contract_id
+
+        return {
+            'contracts': checked,
+            'batches': batches,
+            'receipts_applied': receipts,
+            'changed': changed,
+            'seconds': round(time.perf_counter() - started, 3),
+        }
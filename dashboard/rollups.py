@@ -0,0 +1,121 @@
+"""
+Incremental 1-minute / 1-hour temperature rollups and history queries.
+
+telemetry.write_readings() calls apply_readings() in the same transaction as
+the raw insert. The batch is folded into per-(contract, bucket) aggregates
+in Python and merged into reading_rollups_1m / reading_rollups_1h with one
+multi-row INSERT ... ON CONFLICT DO UPDATE per table (split only where
+SQLite's parameter limit requires it), so the rollups never need a rescan
+of temperature_readings.
+
+history() answers chart queries from the finest rollup that keeps the
+window under `max_points` buckets (a 7-day contract window is 168 hourly
+rows), so its cost depends on the window, not on how many readings exist.
+"""
+import datetime
+
+from django.db import connection
+
+from .models import ReadingRollupHour, ReadingRollupMinute
+
+# (name, bucket width, model), finest first
+RESOLUTIONS = (
+    ('1m', datetime.timedelta(minutes=1), ReadingRollupMinute),
+    ('1h', datetime.timedelta(hours=1), ReadingRollupHour),
+)
+DEFAULT_MAX_POINTS = 500
+
+
+def _floor(moment, width):
+    seconds = int(width.total_seconds())
+    timestamp = int(moment.timestamp())
+    return datetime.datetime.fromtimestamp(timestamp - timestamp % seconds, tz=datetime.timezone.utc)
+
+
+def _fold(rows, width):
+    buckets = {}
+    for contract_id, _, recorded_at, temperature in rows:
+        key = (contract_id, _floor(recorded_at, width))
+        agg = buckets.get(key)
+        if agg is None:
+            buckets[key] = [1, temperature, temperature, temperature]
+        else:
+            agg[0] += 1
+            agg[1] += temperature
+            if temperature < agg[2]:
+                agg[2] = temperature
+            if temperature > agg[3]:
+                agg[3] = temperature
+    return buckets
+
+
+def _upsert(model, buckets):
+    qn = connection.ops.quote_name
+    # Scalar two-argument MIN/MAX in SQLite, LEAST/GREATEST in Postgres.
+    least, greatest = ('LEAST', 'GREATEST') if connection.vendor == 'postgresql' else ('MIN', 'MAX')
+    table = qn(model._meta.db_table)
+    columns = ('contract_id', 'bucket', 'count', 'total', 'min_temp', 'max_temp')
+    adapt = connection.ops.adapt_datetimefield_value
+    # Sorted so concurrent ingests lock rollup rows in the same order.
+    rows = [
+        (contract_id, adapt(bucket), count, total, low, high)
+        for (contract_id, bucket), (count, total, low, high) in sorted(buckets.items())
+    ]
+    # One multi-row INSERT per chunk; only SQLite limits the parameters per query.
+    chunk = connection.ops.bulk_batch_size(columns, rows) or 1
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), chunk):
+            part = rows[start:start + chunk]
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(qn(column) for column in columns)}) VALUES "
+                + ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(part))
+                + f" ON CONFLICT ({qn('contract_id')}, {qn('bucket')}) DO UPDATE SET "
+                f"{qn('count')} = {table}.{qn('count')} + EXCLUDED.{qn('count')}, "
+                f"{qn('total')} = {table}.{qn('total')} + EXCLUDED.{qn('total')}, "
+                f"{qn('min_temp')} = {least}({table}.{qn('min_temp')}, EXCLUDED.{qn('min_temp')}), "
+                f"{qn('max_temp')} = {greatest}({table}.{qn('max_temp')}, EXCLUDED.{qn('max_temp')})",
+                [value for row in part for value in row],
+            )
+
+
+def apply_readings(rows):
+    """Merges (contract_id, device_id, recorded_at, temperature) rows into every rollup table."""
+    if not rows:
+        return
+    for _, width, model in RESOLUTIONS:
+        _upsert(model, _fold(rows, width))
+
+
+def pick_resolution(start, end, max_points=DEFAULT_MAX_POINTS):
+    """Returns the finest (name, width, model) with at most `max_points` buckets in [start, end)."""
+    for resolution in RESOLUTIONS:
+        if (end - start) / resolution[1] <= max_points:
+            return resolution
+    return RESOLUTIONS[-1]
+
+
+def history(contract_id, start, end, max_points=DEFAULT_MAX_POINTS):
+    """
+    Returns {'resolution': name, 'points': [...]} for one contract, each point
+    being {'t', 'min', 'max', 'avg', 'count'} for one bucket in [start, end).
+    """
+    name, width, model = pick_resolution(start, end, max_points)
+    rows = model.objects.filter(
+        contract_id=contract_id,
+        bucket__gte=_floor(start, width),
+        bucket__lt=end,
+    ).order_by('bucket').values_list('bucket', 'count', 'total', 'min_temp', 'max_temp')
+
+    return {
+        'resolution': name,
+        'points': [
+            {
+                't': bucket.isoformat(),
+                'min': low,
+                'max': high,
+                'avg': round(total / count, 3),
+                'count': count,
+            }
+            for bucket, count, total, low, high in rows
+        ],
+    }
@@ -0,0 +1,203 @@
+"""
+Batching JSON-RPC provider.
+
+BatchingHTTPProvider coalesces read calls issued close together (from any
+thread or gevent greenlet sharing the process-wide Web3) into a single
+JSON-RPC batch, over a pooled keep-alive requests.Session. While one batch is
+on the wire, new calls queue up and go out together in the next one, so a lone
+caller pays no extra latency. The caller that sends a batch sends only that
+one: the oldest call still queued is woken to send the next, so no thread is
+kept busy sending for others while calls keep arriving.
+
+Every call and HTTP round trip is attributed to the rpc_stats.track_rpc()
+scope that issued it, so we can see how many round trips batching saved.
+"""
+import threading
+import time
+
+import requests
+from eth_utils import to_bytes
+from requests.adapters import HTTPAdapter
+from web3 import HTTPProvider
+from web3._utils.encoding import FriendlyJsonSerde, Web3JsonEncoder
+
+from .rpc_stats import current_stats
+
+
+# Read-only calls that are safe to send in any order within one batch.
+BATCHABLE_METHODS = frozenset({
+    'eth_chainId',
+    'eth_gasPrice',
+    'eth_feeHistory',
+    'eth_blockNumber',
+    'eth_getTransactionCount',
+    'eth_estimateGas',
+    'eth_getTransactionReceipt',
+    'eth_getTransactionByHash',
+    'eth_getBalance',
+    'eth_getCode',
+    'eth_call',
+    'eth_getLogs',
+    'eth_getBlockByNumber',
+})
+
+
+# --- PROVIDER ---
+
+class _PendingCall:
+    __slots__ = ('method', 'params', 'stats', 'response', 'error', 'leads', 'done')
+
+    def __init__(self, method, params):
+        self.method = method
+        self.params = params
+        self.stats = current_stats()
+        self.response = None
+        self.error = None
+        self.leads = False           # its caller sends the next batch
+        self.done = threading.Event()  # set when answered, or when it comes to lead
+
+
+class BatchingHTTPProvider(HTTPProvider):
+
+    def __init__(self, endpoint_uri=None, window=0.0, max_batch_size=50, pool_size=10, **kwargs):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        super().__init__(endpoint_uri, session=session, **kwargs)
+
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._lock = threading.Lock()
+        self._pending = []
+        self._flushing = False
+
+    # -- helpers --
+
+    def _encode(self, calls):
+        payload = [
+            {
+                'jsonrpc': '2.0',
+                'method': call.method,
+                'params': call.params or [],
+                'id': request_id,
+            }
+            for request_id, call in calls
+        ]
+        return to_bytes(text=FriendlyJsonSerde().json_encode(payload, Web3JsonEncoder))
+
+    def _post(self, request_data):
+        return self._request_session_manager.make_post_request(
+            self.endpoint_uri, request_data, **self.get_request_kwargs()
+        )
+
+    @staticmethod
+    def _record(calls):
+        # A batch of n calls costs one round trip, i.e. 1/n per call.
+        share = 1.0 / len(calls)
+        for call in calls:
+            if call.stats is not None:
+                call.stats.record(1, share)
+
+    def _send_batch(self, calls):
+        if len(calls) == 1:
+            call = calls[0]
+            try:
+                call.response = super().make_request(call.method, call.params)
+            except Exception as e:
+                call.error = e
+            self._record(calls)
+            call.done.set()
+            return
+
+        numbered = [(next(self.request_counter), call) for call in calls]
+        try:
+            responses = self.decode_rpc_response(self._post(self._encode(numbered)))
+            if not isinstance(responses, list):
+                # The node rejected the batch as a whole.
+                raise ConnectionError(f"JSON-RPC batch rejected: {responses.get('error')}")
+            by_id = {response.get('id'): response for response in responses}
+            for request_id, call in numbered:
+                call.response = by_id.get(request_id) or {
+                    'jsonrpc': '2.0', 'id': request_id,
+                    'error': {'code': -32603, 'message': 'Missing response in JSON-RPC batch'},
+                }
+        except Exception as e:
+            for _, call in numbered:
+                call.error = e
+        self._record(calls)
+        for call in calls:
+            call.done.set()
+
+    def _hand_off(self):
+        # Under self._lock: the oldest queued call sends the next batch.
+        if self._pending:
+            self._pending[0].leads = True
+            self._pending[0].done.set()
+        else:
+            self._flushing = False
+
+    def _drain(self, leader):
+        """Sends one batch of queued calls, starting with `leader`'s, then hands off."""
+        batch = []
+        try:
+            if self.window:
+                time.sleep(self.window)
+            with self._lock:
+                batch = self._pending[:self.max_batch_size]
+                del self._pending[:self.max_batch_size]
+            self._send_batch(batch)
+        finally:
+            for call in batch:
+                if not call.done.is_set():
+                    # Interrupted mid-send (e.g. KeyboardInterrupt); do not leave callers waiting.
+                    call.error = ConnectionError('JSON-RPC batch was interrupted')
+                    call.done.set()
+            with self._lock:
+                if leader in self._pending:
+                    self._pending.remove(leader)
+                self._hand_off()
+
+    def _abandon(self, call):
+        # The caller stopped waiting; nobody would send a batch it was made to lead.
+        with self._lock:
+            if call in self._pending:
+                self._pending.remove(call)
+                if call.leads:
+                    self._hand_off()
+
+    # -- provider API --
+
+    def make_request(self, method, params):
+        if method not in BATCHABLE_METHODS:
+            response = super().make_request(method, params)
+            stats = current_stats()
+            if stats is not None:
+                stats.record(1, 1)
+            return response
+
+        call = _PendingCall(method, params)
+        with self._lock:
+            self._pending.append(call)
+            call.leads = not self._flushing
+            self._flushing = True
+
+        try:
+            if not call.leads:
+                call.done.wait()
+            if call.leads:
+                # Its call is first in the queue, so it goes out in this batch.
+                self._drain(call)
+        except BaseException:
+            self._abandon(call)
+            raise
+        if call.error is not None:
+            raise call.error
+        return call.response
+
+    def make_batch_request(self, batch_requests):
+        response = super().make_batch_request(batch_requests)
+        stats = current_stats()
+        if stats is not None:
+            stats.record(len(batch_requests), 1)
+        return response
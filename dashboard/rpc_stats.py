@@ -0,0 +1,67 @@
+"""
+JSON-RPC call and round-trip accounting.
+
+Every call and HTTP round trip made by dashboard.rpc.BatchingHTTPProvider is
+attributed to the `track_rpc()` scope that issued it (a view name via
+RPCStatsMiddleware, or the worker), so we can see how many round trips
+batching saved per view. Kept apart from the provider so the middleware does
+not import web3.
+"""
+import contextvars
+import threading
+from contextlib import contextmanager
+
+
+class RPCStats:
+    """Counts logical RPC calls and HTTP round trips for one scope."""
+
+    def __init__(self, label):
+        self.label = label
+        self.calls = 0
+        self.round_trips = 0.0
+
+    @property
+    def saved(self):
+        return self.calls - self.round_trips
+
+    def record(self, calls, round_trips):
+        self.calls += calls
+        self.round_trips += round_trips
+
+
+_current_stats = contextvars.ContextVar('rpc_stats', default=None)
+_totals_lock = threading.Lock()
+_totals = {}  # label -> {'requests', 'calls', 'round_trips'}
+
+
+@contextmanager
+def track_rpc(label):
+    """
+    Attributes every RPC call made inside the block to `label`. The label
+    can be changed on the yielded stats object before the block exits.
+    """
+    stats = RPCStats(label)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        with _totals_lock:
+            totals = _totals.setdefault(stats.label, {'requests': 0, 'calls': 0, 'round_trips': 0.0})
+            totals['requests'] += 1
+            totals['calls'] += stats.calls
+            totals['round_trips'] += stats.round_trips
+
+
+def current_stats():
+    """The RPCStats of the innermost track_rpc() block, or None."""
+    return _current_stats.get()
+
+
+def rpc_totals():
+    """Per-label totals since process start, including round trips saved."""
+    with _totals_lock:
+        return {
+            label: dict(totals, saved=totals['calls'] - totals['round_trips'])
+            for label, totals in _totals.items()
+        }
@@ -0,0 +1,244 @@
+"""
+Minimal in-process JSON-RPC stand-in for an Ethereum node.
+
+Used by the tests and benchmarks so the chain code can run without Sepolia.
+It accepts single and batched requests, "mines" a sent transaction into the
+next block when `mine()` is called, and counts HTTP posts and RPC calls.
+Event logs added with `add_log()` are served by eth_getLogs, and `reorg()`
+replaces the most recent blocks to exercise reorg handling.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from eth_utils import keccak, to_checksum_address
+
+# Well-known Hardhat test key; only ever used against the stub chain.
+STUB_DEPLOYER_KEY = '0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80'
+STUB_DEPLOYER_ADDRESS = '0xf39fd6e51aad88f6f4ce6ab8827279cfffb92266'
+
+
+class StubChain:
+    def __init__(self, chain_id=11155111, gas_price=10**9, latency=0.0, max_log_range=None):
+        self.chain_id = chain_id
+        self.gas_price = gas_price
+        self.latency = latency        # seconds added to every HTTP post
+        self.block_number = 100
+        self.transactions = {}        # tx hash -> {'block': n or None, 'contract_address': ...}
+        self.nonce = 0                # of the deployer; every other account has sent nothing
+        self.balances = {}            # lowercase address -> wei, for eth_getBalance (default 0)
+        self.send_errors = []         # messages the next eth_sendRawTransaction calls are rejected with
+        self.logs = []                # raw log dicts, see add_log()
+        self.forks = {}               # block number -> times it was replaced by reorg()
+        self.max_log_range = max_log_range  # eth_getLogs rejects wider block ranges, like hosted nodes
+        self.posts = 0
+        self.calls = 0
+        self.method_counts = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    # -- chain simulation --
+
+    def mine(self):
+        """Includes every pending transaction in a new block."""
+        with self._lock:
+            self.block_number += 1
+            for tx in self.transactions.values():
+                if tx['block'] is None:
+                    tx['block'] = self.block_number
+        return self.block_number
+
+    def block_hash(self, number):
+        return '0x' + keccak(text=f"{number}:{self.forks.get(number, 0)}").hex()
+
+    def add_log(self, address, topics, data, block=None):
+        """Adds a log to `block` (default: the current block) and returns it."""
+        with self._lock:
+            block = self.block_number if block is None else block
+            log = {
+                'address': to_checksum_address(address),
+                'topics': topics,
+                'data': data,
+                'blockNumber': hex(block),
+                'blockHash': self.block_hash(block),
+                'transactionHash': '0x' + keccak(text=f"log-{len(self.logs)}").hex(),
+                'transactionIndex': '0x0',
+                'logIndex': hex(sum(1 for log in self.logs if log['blockNumber'] == hex(block))),
+                'removed': False,
+            }
+            self.logs.append(log)
+        return log
+
+    def reorg(self, depth):
+        """Replaces the last `depth` blocks: new hashes, and their logs are dropped."""
+        with self._lock:
+            first = self.block_number - depth + 1
+            for number in range(first, self.block_number + 1):
+                self.forks[number] = self.forks.get(number, 0) + 1
+            self.logs = [log for log in self.logs if int(log['blockNumber'], 16) < first]
+
+    def _get_logs(self, query):
+        from_block = int(query.get('fromBlock', '0x0'), 16)
+        to_block = int(query.get('toBlock', hex(self.block_number)), 16)
+        if self.max_log_range and to_block - from_block + 1 > self.max_log_range:
+            return None
+        addresses = query.get('address') or []
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        addresses = {address.lower() for address in addresses}
+        topic0 = (query.get('topics') or [None])[0]
+        return [
+            log for log in self.logs
+            if from_block <= int(log['blockNumber'], 16) <= to_block
+            and (not addresses or log['address'].lower() in addresses)
+            and (topic0 is None or log['topics'][0] == topic0)
+        ]
+
+    def reset_counters(self):
+        with self._lock:
+            self.posts = 0
+            self.calls = 0
+            self.method_counts = {}
+
+    def _receipt(self, tx_hash):
+        tx = self.transactions.get(tx_hash)
+        if tx is None or tx['block'] is None:
+            return None
+        return {
+            'transactionHash': tx_hash,
+            'transactionIndex': '0x0',
+            'blockNumber': hex(tx['block']),
+            'blockHash': self.block_hash(tx['block']),
+            'from': '0x' + '00' * 20,
+            'to': None,
+            'status': '0x1',
+            'contractAddress': tx['contract_address'],
+            'gasUsed': hex(21000),
+            'cumulativeGasUsed': hex(21000),
+            'effectiveGasPrice': hex(self.gas_price),
+            'logs': [],
+            'logsBloom': '0x' + '00' * 256,
+            'type': '0x0',
+        }
+
+    def handle(self, request):
+        method = request.get('method')
+        params = request.get('params') or []
+        with self._lock:
+            self.calls += 1
+            self.method_counts[method] = self.method_counts.get(method, 0) + 1
+
+            if method == 'eth_chainId':
+                result = hex(self.chain_id)
+            elif method == 'net_version':
+                result = str(self.chain_id)
+            elif method == 'web3_clientVersion':
+                result = 'SolTrack/StubChain'
+            elif method == 'eth_gasPrice':
+                result = hex(self.gas_price)
+            elif method == 'eth_blockNumber':
+                result = hex(self.block_number)
+            elif method == 'eth_getTransactionCount':
+                result = hex(self.nonce if params[0].lower() == STUB_DEPLOYER_ADDRESS else 0)
+            elif method == 'eth_estimateGas':
+                result = hex(60000)
+            elif method == 'eth_getBalance':
+                result = hex(self.balances.get(params[0].lower(), 0))
+            elif method == 'eth_getCode':
+                # Contracts whose deployment has been mined have code.
+                deployed = {
+                    tx['contract_address'].lower() for tx in self.transactions.values() if tx['block'] is not None
+                }
+                result = '0x6080' if params[0].lower() in deployed else '0x'
+            elif method == 'eth_call':
+                result = '0x'
+            elif method == 'eth_getLogs':
+                result = self._get_logs(params[0])
+                if result is None:
+                    return {
+                        'jsonrpc': '2.0', 'id': request.get('id'),
+                        'error': {'code': -32005, 'message': f"block range too large (max {self.max_log_range})"},
+                    }
+            elif method == 'eth_getBlockByNumber':
+                number = self.block_number if params[0] == 'latest' else int(params[0], 16)
+                result = None if number > self.block_number else {
+                    'number': hex(number),
+                    'hash': self.block_hash(number),
+                    'parentHash': self.block_hash(number - 1),
+                    'timestamp': hex(1_700_000_000 + number * 12),
+                }
+            elif method == 'eth_sendRawTransaction' and self.send_errors:
+                return {
+                    'jsonrpc': '2.0', 'id': request.get('id'),
+                    'error': {'code': -32000, 'message': self.send_errors.pop(0)},
+                }
+            elif method == 'eth_sendRawTransaction':
+                tx_hash = '0x' + keccak(hexstr=params[0]).hex()
+                known = self.transactions.get(tx_hash)
+                if known is not None:
+                    # The same signed bytes again: a node does not take them twice.
+                    return {
+                        'jsonrpc': '2.0', 'id': request.get('id'),
+                        'error': {'code': -32000, 'message': 'already known' if known['block'] is None else 'nonce too low'},
+                    }
+                self.transactions[tx_hash] = {
+                    'block': None,
+                    'contract_address': to_checksum_address(keccak(text=tx_hash)[:20]),
+                }
+                self.nonce += 1
+                result = tx_hash
+            elif method == 'eth_getTransactionReceipt':
+                result = self._receipt(params[0])
+            elif method == 'eth_getTransactionByHash':
+                tx = self.transactions.get(params[0])
+                result = None if tx is None else {
+                    'hash': params[0],
+                    'blockNumber': None if tx['block'] is None else hex(tx['block']),
+                }
+            else:
+                return {
+                    'jsonrpc': '2.0', 'id': request.get('id'),
+                    'error': {'code': -32601, 'message': f"Method {method} not supported by stub"},
+                }
+        return {'jsonrpc': '2.0', 'id': request.get('id'), 'result': result}
+
+    # -- HTTP server --
+
+    def start(self, port=0):
+        """Starts serving on 127.0.0.1 and returns the endpoint URL."""
+        chain = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, like a real node
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with chain._lock:
+                    chain.posts += 1
+                if chain.latency:
+                    time.sleep(chain.latency)
+                if isinstance(body, list):
+                    result = [chain.handle(item) for item in body]
+                else:
+                    result = chain.handle(body)
+                data = json.dumps(result).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
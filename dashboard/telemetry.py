@@ -0,0 +1,174 @@
+"""
+Bulk ingestion of sensor temperature readings.
+
+Devices (or a gateway in front of them) POST batches of readings for many
+contracts at once to /dashboard/telemetry/ingest/, either as JSON lines or
+as packed binary records. Each batch is validated in one pass, checked
+against the contracts table with a single query and written with one COPY
+(Postgres) or a chunked bulk_create (other databases); the 1m/1h rollups in
+dashboard.rollups, the Alert/OK state in dashboard.alerting and the
+incidents in dashboard.incidents are updated in the same transaction.
+
+JSON lines, one reading per line:
+
+    {"contract_id": 12, "device_id": "truck-7", "recorded_at": 1760800000.5, "temperature": -7.9}
+
+recorded_at is Unix seconds or an ISO-8601 string with a UTC offset.
+
+Binary (Content-Type: application/octet-stream), little-endian records of
+BINARY_RECORD.size (32) bytes each:
+
+    uint32 contract_id | int64 recorded_at (Unix ms) | float32 temperature | 16s device_id (NUL padded)
+"""
+import datetime
+import io
+import json
+import math
+import re
+import struct
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import alerting, incidents, rollups
+from .models import Contract, TemperatureReading
+
+BINARY_CONTENT_TYPE = 'application/octet-stream'
+BINARY_RECORD = struct.Struct('<Iqf16s')
+
+DEVICE_ID_RE = re.compile(r'^[A-Za-z0-9_.:-]{1,64}$')
+COPY_COLUMNS = ('contract_id', 'device_id', 'recorded_at', 'temperature', 'received_at')
+
+
+class IngestError(ValueError):
+    """The request body could not be parsed as a batch of readings."""
+
+
+def _to_datetime(value):
+    if isinstance(value, (int, float)):
+        return datetime.datetime.fromtimestamp(value, tz=datetime.timezone.utc)
+    recorded_at = datetime.datetime.fromisoformat(value)
+    if timezone.is_naive(recorded_at):
+        raise ValueError("recorded_at needs a UTC offset")
+    return recorded_at
+
+
+def parse_jsonl(body):
+    """Returns (rows, rejected) where rows are (contract_id, device_id, recorded_at, temperature)."""
+    rows, rejected = [], 0
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            row = (
+                int(item['contract_id']),
+                str(item['device_id']),
+                _to_datetime(item['recorded_at']),
+                float(item['temperature']),
+            )
+        except (ValueError, TypeError, KeyError, OverflowError):
+            rejected += 1
+            continue
+        if not DEVICE_ID_RE.match(row[1]) or not math.isfinite(row[3]):
+            rejected += 1
+            continue
+        rows.append(row)
+    return rows, rejected
+
+
+def parse_binary(body):
+    if len(body) % BINARY_RECORD.size:
+        raise IngestError(f"Binary body must be a multiple of {BINARY_RECORD.size} bytes.")
+
+    rows, rejected = [], 0
+    fromtimestamp = datetime.datetime.fromtimestamp
+    utc = datetime.timezone.utc
+    for contract_id, recorded_ms, temperature, device_id in BINARY_RECORD.iter_unpack(body):
+        try:
+            device_id = device_id.rstrip(b'\0').decode('ascii')
+            recorded_at = fromtimestamp(recorded_ms / 1000, tz=utc)
+        except (UnicodeDecodeError, ValueError, OverflowError):
+            rejected += 1
+            continue
+        if not DEVICE_ID_RE.match(device_id) or not math.isfinite(temperature):
+            rejected += 1
+            continue
+        rows.append((contract_id, device_id, recorded_at, temperature))
+    return rows, rejected
+
+
+def pack_binary(rows):
+    """Inverse of parse_binary; used by clients, tests and bench_ingest."""
+    return b''.join(
+        BINARY_RECORD.pack(contract_id, int(recorded_at.timestamp() * 1000), temperature, device_id.encode('ascii'))
+        for contract_id, device_id, recorded_at, temperature in rows
+    )
+
+
+def _copy_rows(rows, received_at):
+    # COPY ... FROM STDIN in text format. device_id is restricted to
+    # DEVICE_ID_RE, so no field needs escaping.
+    buffer = io.StringIO()
+    received = received_at.isoformat()
+    for contract_id, device_id, recorded_at, temperature in rows:
+        buffer.write(f"{contract_id}\t{device_id}\t{recorded_at.isoformat()}\t{temperature!r}\t{received}\n")
+    buffer.seek(0)
+
+    table = connection.ops.quote_name(TemperatureReading._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(c) for c in COPY_COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN", buffer)
+
+
+def write_readings(rows):
+    """
+    Stores (contract_id, device_id, recorded_at, temperature) rows for known
+    contracts and returns (written, rejected).
+    """
+    if not rows:
+        return 0, 0
+
+    known = set(
+        Contract.objects.filter(contract_id__in={row[0] for row in rows})
+        .values_list('contract_id', flat=True)
+    )
+    accepted = [row for row in rows if row[0] in known]
+    received_at = timezone.now()
+
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            _copy_rows(accepted, received_at)
+        else:
+            TemperatureReading.objects.bulk_create(
+                [
+                    TemperatureReading(
+                        contract_id=contract_id, device_id=device_id, recorded_at=recorded_at,
+                        temperature=temperature, received_at=received_at,
+                    )
+                    for contract_id, device_id, recorded_at, temperature in accepted
+                ],
+                batch_size=1000,
+            )
+        rollups.apply_readings(accepted)
+        changes = alerting.evaluate_readings(accepted, now=received_at)
+        incidents.record_changes(changes)
+    return len(accepted), len(rows) - len(accepted)
+
+
+def ingest(body, content_type):
+    """Parses and stores one request body. Returns {'accepted': n, 'rejected': m}."""
+    if content_type == BINARY_CONTENT_TYPE:
+        rows, rejected = parse_binary(body)
+    else:
+        try:
+            rows, rejected = parse_jsonl(body.decode('utf-8'))
+        except UnicodeDecodeError:
+            raise IngestError("JSON lines body must be UTF-8.")
+
+    if len(rows) > settings.TELEMETRY_MAX_BATCH:
+        raise IngestError(f"At most {settings.TELEMETRY_MAX_BATCH} readings per request.")
+
+    written, unknown = write_readings(rows)
+    return {'accepted': written, 'rejected': rejected + unknown}
@@ -1,3 +1,1448 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import os
+import tempfile
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.db.transaction import TransactionManagementError
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from web3 import Web3
+
+from .ids import BlockAllocator, _max_contract_id
+from .indexer import TRANSFER_TOPIC, TransferIndexer
+from . import alerting, artifacts, bulk, chain, gas, incidents, jobs, metrics, rollups, telemetry
+from .live import LiveFeed, live_feed_app
+from .models import (
+    AlertIncident, BulkImport, BulkImportRow, Contract, ContractArtifact, ContractHealth, DeployerNonce,
+    IndexerCheckpoint, ReadingRollupHour, ReadingRollupMinute, TemperatureReading, TransactionJob, TransferEvent,
+)
+from .nonces import allocate_nonce, resync_nonce
+from .pagination import keyset_page
+from .profiling import QueryCountAssertions, capture, profile_summary
+from .reconcile import Reconciler
+from .chain_cache import ChainMetadata, chain_metadata
+from .gas import gas_estimates
+from .receipts import Receipt, ReceiptWatcher
+from .rpc import BatchingHTTPProvider
+from .rpc_stats import rpc_totals, track_rpc
+from .rpc_stub import STUB_DEPLOYER_KEY, StubChain
+
+
+class BatchingHTTPProviderTests(SimpleTestCase):
+
+    def setUp(self):
+        self.chain = StubChain(latency=0.05)
+        self.web3 = Web3(BatchingHTTPProvider(self.chain.start()))
+
+    def tearDown(self):
+        self.chain.stop()
+
+    def test_single_call_is_not_delayed_or_batched(self):
+        with track_rpc('single') as stats:
+            self.assertEqual(self.web3.eth.chain_id, 11155111)
+
+        self.assertEqual(self.chain.posts, 1)
+        self.assertEqual(stats.calls, 1)
+        self.assertEqual(stats.round_trips, 1)
+
+    def test_concurrent_calls_share_round_trips(self):
+        results = []
+
+        def read_gas_price():
+            with track_rpc('concurrent'):
+                results.append(self.web3.eth.gas_price)
+
+        threads = [threading.Thread(target=read_gas_price) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [10**9] * 10)
+        self.assertEqual(self.chain.calls, 10)
+        self.assertLess(self.chain.posts, 10)
+
+        totals = rpc_totals()['concurrent']
+        self.assertEqual(totals['calls'], 10)
+        self.assertAlmostEqual(totals['round_trips'], self.chain.posts)
+        self.assertAlmostEqual(totals['saved'], 10 - self.chain.posts)
+
+    def test_each_caller_sends_at_most_one_batch(self):
+        provider = self.web3.provider
+        provider.max_batch_size = 1
+        senders = []
+        send_batch = provider._send_batch
+
+        def record_sender(calls):
+            senders.append(threading.get_ident())
+            send_batch(calls)
+
+        with mock.patch.object(provider, '_send_batch', record_sender):
+            threads = [threading.Thread(target=lambda: self.web3.eth.gas_price) for _ in range(6)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        # Queued calls are not all sent by the first caller.
+        self.assertEqual(len(senders), 6)
+        self.assertEqual(len(set(senders)), 6)
+
+    def test_interrupted_send_releases_the_queue(self):
+        provider = self.web3.provider
+        with mock.patch.object(provider, '_send_batch', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                self.web3.eth.gas_price
+        self.assertEqual((provider._pending, provider._flushing), ([], False))
+        self.assertEqual(self.web3.eth.gas_price, 10**9)
+
+    def test_error_in_batch_only_fails_that_call(self):
+        outcome = {}
+
+        def call(name, fn):
+            try:
+                outcome[name] = fn()
+            except Exception as e:
+                outcome[name] = e
+
+        # The stub rejects eth_getLogs ranges wider than max_log_range, so that
+        # call gets an error response whether or not it ends up in a batch.
+        self.chain.max_log_range = 10
+        bad_range = {'fromBlock': '0x0', 'toBlock': hex(100)}
+        threads = [
+            threading.Thread(target=call, args=('first', lambda: self.web3.eth.block_number)),
+            threading.Thread(target=call, args=('ok', lambda: self.web3.eth.chain_id)),
+            threading.Thread(target=call, args=('bad', lambda: self.web3.provider.make_request('eth_getLogs', [bad_range]))),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(outcome['first'], 100)
+        self.assertEqual(outcome['ok'], 11155111)
+        self.assertIn('error', outcome['bad'])
+
+    def test_explicit_batch_counts_one_round_trip(self):
+        with track_rpc('explicit') as stats:
+            responses = self.web3.provider.make_batch_request([
+                ('eth_chainId', []),
+                ('eth_gasPrice', []),
+                ('eth_blockNumber', []),
+            ])
+
+        self.assertEqual([r['result'] for r in responses], [hex(11155111), hex(10**9), hex(100)])
+        self.assertEqual(self.chain.posts, 1)
+        self.assertEqual(stats.calls, 3)
+        self.assertEqual(stats.saved, 2)
+
+
+class ChainMetadataTests(SimpleTestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        clock = mock.patch('dashboard.chain_cache.time.monotonic', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.gas_price = mock.PropertyMock(return_value=10**9)
+        self.chain_id = mock.PropertyMock(return_value=11155111)
+        web3 = mock.Mock()
+        type(web3.eth).gas_price = self.gas_price
+        type(web3.eth).chain_id = self.chain_id
+        self.metadata = ChainMetadata(web3=web3, ttl=10)
+
+    def test_gas_price_expires_after_ttl(self):
+        self.assertEqual(self.metadata.gas_price, 10**9)
+        self.now += 9.9
+        self.gas_price.return_value = 2 * 10**9
+        self.assertEqual(self.metadata.gas_price, 10**9)
+        self.now += 0.2
+        self.assertEqual(self.metadata.gas_price, 2 * 10**9)
+        self.assertEqual(self.gas_price.call_count, 2)
+        self.assertEqual(self.metadata.stats()['gas_price'], {'hits': 1, 'misses': 2})
+
+    def test_chain_id_never_expires(self):
+        self.metadata.chain_id
+        self.now += 10**6
+        self.metadata.chain_id
+        self.assertEqual(self.chain_id.call_count, 1)
+        self.assertEqual(self.metadata.stats()['chain_id'], {'hits': 1, 'misses': 1})
+
+    def test_invalidate(self):
+        self.metadata.chain_id, self.metadata.gas_price
+        self.metadata.invalidate('gas_price')
+        self.metadata.chain_id, self.metadata.gas_price
+        self.assertEqual((self.chain_id.call_count, self.gas_price.call_count), (1, 2))
+        self.metadata.invalidate()
+        self.metadata.chain_id, self.metadata.gas_price
+        self.assertEqual((self.chain_id.call_count, self.gas_price.call_count), (2, 3))
+
+
+class ArtifactTests(TransactionTestCase):
+
+    def setUp(self):
+        # No artifact file and an empty memory cache, like a freshly started web process.
+        empty = tempfile.TemporaryDirectory()
+        self.addCleanup(empty.cleanup)
+        settings_override = override_settings(ARTIFACT_DIR=empty.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for patcher in (
+            mock.patch.dict(artifacts._memory_cache, clear=True),
+            mock.patch.dict(artifacts._registered_abis, clear=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.artifact = {
+            'key': artifacts.artifact_key(), 'contract_name': 'SimpleTransfer', 'solc_version': '0.5.16',
+            'abi': [{'type': 'function', 'name': 'Deposit'}], 'bytecode': '6080',
+        }
+
+    def test_registry_stores_each_abi_once(self):
+        reordered = {**self.artifact, 'abi': [{'name': 'Deposit', 'type': 'function'}]}
+        other = {**self.artifact, 'abi': [{'type': 'function', 'name': 'Refund'}]}
+
+        key = artifacts.register_abi(self.artifact)
+        artifacts._registered_abis.clear()  # as in another process
+        self.assertEqual(artifacts.register_abi(reordered), key)
+        self.assertNotEqual(artifacts.register_abi(other), key)
+        self.assertEqual(ContractArtifact.objects.count(), 2)
+        self.assertEqual(ContractArtifact.objects.get(abi_hash=key).abi, self.artifact['abi'])
+
+    def test_missing_artifact_is_an_error_not_a_compile(self):
+        with mock.patch.object(artifacts, '_compile') as compile_source:
+            with self.assertRaisesMessage(artifacts.ArtifactMissing, 'compile_contracts'):
+                artifacts.get_artifact()
+        compile_source.assert_not_called()
+
+    def test_missing_file_loads_the_artifact_compile_contracts_stored(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        # The release step compiles and stores it; its files never reach this process.
+        with mock.patch.object(artifacts, '_compile', return_value=self.artifact):
+            call_command('compile_contracts', stdout=StringIO())
+        os.remove(artifacts._artifact_path(self.artifact['key']))
+        artifacts._memory_cache.clear()
+
+        with mock.patch.object(artifacts, '_compile') as compile_source:
+            artifact = artifacts.get_artifact()
+        compile_source.assert_not_called()
+        self.assertEqual((artifact['abi'], artifact['bytecode']), (self.artifact['abi'], '6080'))
+        with self.assertNumQueries(0):
+            artifacts.get_artifact()
+
+
+class ContractsTableMixin:
+    # contracts is unmanaged, so the test database does not create it.
+
+    def setUp(self):
+        with connection.schema_editor() as editor:
+            editor.create_model(Contract)
+
+    def tearDown(self):
+        with connection.schema_editor() as editor:
+            editor.delete_model(Contract)
+
+    def _create_contract(self, contract_id, status='Pending', end_date=None, threshold=-8.0):
+        Contract.objects.create(
+            contract_id=contract_id,
+            buyer_address='0x' + '1' * 40,
+            seller_address='0x' + '2' * 40,
+            product_name='Vaccines',
+            quantity=1,
+            price=1,
+            start_date=timezone.now(),
+            end_date=end_date or timezone.now(),
+            temperature_threshold=threshold,
+            status=status,
+        )
+
+
+class ArtifactMigrationTests(TransactionTestCase):
+    # Migration 0004 moves contracts.contract_abi into the contract_artifacts registry.
+    before = [('dashboard', '0003_transactionjob')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        self.latest = executor.loader.graph.leaf_nodes('dashboard')
+        executor.migrate(self.before)
+        self.addCleanup(self._restore_schema)
+        old_contract = executor.loader.project_state(self.before).apps.get_model('dashboard', 'Contract')
+        with connection.schema_editor() as editor:
+            editor.create_model(old_contract)
+
+        self.abi = [{'type': 'function', 'name': 'Deposit', 'inputs': []}]
+        same_abi_reordered = [{'inputs': [], 'name': 'Deposit', 'type': 'function'}]
+        other_abi = [{'type': 'function', 'name': 'Refund', 'inputs': []}]
+        for contract_id, abi in ((1, self.abi), (2, same_abi_reordered), (3, other_abi)):
+            old_contract.objects.create(
+                contract_id=contract_id, buyer_address='0x' + '1' * 40, seller_address='0x' + '2' * 40,
+                product_name='Vaccines', quantity=1, price=1, start_date=timezone.now(),
+                end_date=timezone.now(), contract_abi=abi, status='Active',
+            )
+
+    def _restore_schema(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.latest)
+        with connection.schema_editor() as editor:
+            editor.delete_model(Contract)
+
+    def _migrate(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.latest)
+
+    def test_backfill_shares_one_artifact_per_abi(self):
+        self._migrate()
+
+        self.assertEqual(ContractArtifact.objects.count(), 2)
+        hashes = dict(Contract.objects.values_list('contract_id', 'artifact_id'))
+        self.assertEqual(hashes[1], artifacts.abi_hash(self.abi))
+        self.assertEqual(hashes[2], hashes[1])
+        self.assertNotEqual(hashes[3], hashes[1])
+        with connection.cursor() as cursor:
+            columns = [c.name for c in connection.introspection.get_table_description(cursor, 'contracts')]
+        self.assertNotIn('contract_abi', columns)
+
+    def test_views_after_contract_abi_is_dropped(self):
+        self._migrate()
+
+        self.assertContains(self.client.get(reverse('active')), 'Vaccines')
+        listing = self.client.get(reverse('contract_list_api', args=['active'])).json()
+        self.assertEqual([row['contract_id'] for row in listing['contracts']], [1, 2, 3])
+        detail = self.client.get(reverse('contract_detail_api', args=[1]))
+        self.assertEqual(detail.json()['product_name'], 'Vaccines')
+        self.assertEqual(artifacts.get_abi(Contract.objects.get(contract_id=1).artifact_id), self.abi)
+
+
+class ContractIdAllocationTests(ContractsTableMixin, TransactionTestCase):
+
+    def test_seeds_from_existing_contracts(self):
+        self._create_contract(41)
+        allocator = BlockAllocator('test.seed', seed=_max_contract_id, block_size=5)
+
+        self.assertEqual(allocator.allocate(3), [42, 43, 44])
+        # The next request does not fit in what is left of the block.
+        self.assertEqual(allocator.allocate(4), [47, 48, 49, 50])
+
+    def test_parallel_creates_get_unique_ids(self):
+        # Two allocators stand in for two worker processes sharing the table.
+        # The rows are inserted afterwards: on the in-memory test database
+        # concurrent inserts fail with "table is locked", which the
+        # allocator retries but a plain create() does not.
+        allocators = [BlockAllocator('test.parallel', seed=_max_contract_id, block_size=4) for _ in range(2)]
+        allocated = []
+        errors = []
+
+        def allocate_ids(allocator):
+            try:
+                for _ in range(10):
+                    allocated.append(allocator.next_id())
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=allocate_ids, args=(allocators[i % 2],)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        for contract_id in allocated:
+            self._create_contract(contract_id)
+        ids = list(Contract.objects.values_list('contract_id', flat=True))
+        self.assertEqual(len(ids), 60)
+        self.assertEqual(len(set(ids)), 60)
+
+    def test_refuses_to_reserve_inside_a_transaction(self):
+        allocator = BlockAllocator('test.atomic', seed=lambda: 0)
+        with transaction.atomic():
+            with self.assertRaises(TransactionManagementError):
+                allocator.next_id()
+
+
+class KeysetPaginationTests(ContractsTableMixin, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        start = timezone.now()
+        # Several contracts share an end_date so pages have to break ties on contract_id.
+        for contract_id in range(1, 24):
+            end_date = start + datetime.timedelta(days=contract_id // 4)
+            self._create_contract(contract_id, status='Active', end_date=end_date)
+        self._create_contract(99, status='Completed')
+
+    def _walk(self, **kwargs):
+        seen, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(Contract.objects.filter(status='Active'), cursor, page_size=5, **kwargs)
+            seen.append([c.contract_id for c in rows])
+            if cursor is None:
+                return seen
+
+    def test_pages_cover_every_row_once(self):
+        pages = self._walk()
+        self.assertEqual([len(p) for p in pages], [5, 5, 5, 5, 3])
+        self.assertEqual(sum(pages, []), list(range(1, 24)))
+
+    def test_descending(self):
+        self.assertEqual(sum(self._walk(descending=True), []), list(range(23, 0, -1)))
+
+    def test_garbled_cursor_returns_first_page(self):
+        rows, _ = keyset_page(Contract.objects.filter(status='Active'), 'not-a-cursor', page_size=5)
+        self.assertEqual([c.contract_id for c in rows], [1, 2, 3, 4, 5])
+
+
+
+class ContractApiTests(ContractsTableMixin, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for contract_id in (1, 2, 3):
+            self._create_contract(contract_id, status='Active')
+
+    def _list(self, etag=None, **params):
+        headers = {'If-None-Match': etag} if etag else {}
+        return self.client.get(reverse('contract_list_api', args=['active']), params, headers=headers)
+
+    def test_unchanged_contract_is_304(self):
+        url = reverse('contract_detail_api', args=[1])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"1-1"')
+        self.assertEqual(response.json()['version'], 1)
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='"1-1"').status_code, 304)
+
+        Contract.objects.filter(contract_id=1).update_versioned(contract_address='0xabc')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='"1-1"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"1-2"')
+        self.assertEqual(response.json()['contract_address'], '0xabc')
+
+    def test_missing_contract_is_404(self):
+        self.assertEqual(self.client.get(reverse('contract_detail_api', args=[404])).status_code, 404)
+
+    def test_listing_etag_changes_with_any_contract(self):
+        response = self._list()
+        self.assertEqual([c['contract_id'] for c in response.json()['contracts']], [1, 2, 3])
+        etag = response['ETag']
+        self.assertEqual(self._list(etag=etag).status_code, 304)
+
+        Contract.objects.filter(contract_id=2).update_versioned(status='Completed')
+        self.assertEqual(self._list(etag=etag).status_code, 200)
+
+    def test_since_returns_only_changes(self):
+        Contract.objects.update(updated_at=timezone.now() - datetime.timedelta(minutes=5))
+        Contract.objects.filter(contract_id=3).update(updated_at=timezone.now() - datetime.timedelta(hours=1))
+        since = self._list().json()['since']
+
+        Contract.objects.filter(contract_id=1).update_versioned(contract_address='0xabc')
+        Contract.objects.filter(contract_id=2).update_versioned(status='Completed')
+        response = self._list(since=since)
+        data = response.json()
+        self.assertEqual([(c['contract_id'], c['contract_address']) for c in data['contracts']], [(1, '0xabc')])
+        self.assertEqual(data['removed'], [2])
+
+        # Nothing changed since: same token, same ETag, no body.
+        again = self._list(since=data['since'])
+        self.assertEqual(self._list(etag=again['ETag'], since=data['since']).status_code, 304)
+
+    def test_bad_since_is_400(self):
+        self.assertEqual(self._list(since='yesterday').status_code, 400)
+
+
+
+class ContractCardCacheTests(ContractsTableMixin, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'fragments': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                          'LOCATION': self.cache_dir.name},
+        })
+        self.settings_override.enable()
+        self._create_contract(1, status='Active')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.cache_dir.cleanup()
+        super().tearDown()
+
+    def _page(self):
+        return self.client.get(reverse('active')).content.decode()
+
+    def test_card_is_served_from_cache_until_version_changes(self):
+        self.assertIn('Vaccines', self._page())
+
+        # A write that skips update_versioned is invisible: the card comes from the cache.
+        Contract.objects.filter(contract_id=1).update(product_name='Insulin')
+        self.assertIn('Vaccines', self._page())
+
+        Contract.objects.filter(contract_id=1).update_versioned(product_name='Insulin')
+        self.assertIn('Insulin', self._page())
+
+    def test_new_reading_invalidates_card(self):
+        self.assertIn('--', self._page())
+        now = timezone.now()
+        ContractHealth.objects.create(
+            contract_id=1, latest_temperature=-11.5, latest_recorded_at=now, run_started_at=now,
+        )
+        self.assertIn('-11.5°C', self._page())
+
+    def test_csrf_tokens_are_not_per_card(self):
+        one_card = self._page().count('csrfmiddlewaretoken')
+        self._create_contract(2, status='Active')
+        self._create_contract(3, status='Active')
+        self.assertEqual(self._page().count('csrfmiddlewaretoken'), one_card)
+
+
+
+@override_settings(INDEXER_START_BLOCK=0, INDEXER_BLOCK_RANGE=2000, INDEXER_REORG_DEPTH=5)
+class TransferIndexerTests(ContractsTableMixin, TransactionTestCase):
+    ADDRESS = '0x' + 'ab' * 20
+
+    def setUp(self):
+        super().setUp()
+        # Like hosted nodes, the stub refuses wide eth_getLogs ranges.
+        self.chain = StubChain(max_log_range=40)
+        self.web3 = Web3(BatchingHTTPProvider(self.chain.start()))
+        self._create_contract(1, status='Active')
+        Contract.objects.filter(contract_id=1).update(contract_address=Web3.to_checksum_address(self.ADDRESS))
+
+    def tearDown(self):
+        self.chain.stop()
+        super().tearDown()
+
+    def _transfer(self, block, value, address=ADDRESS):
+        topic = lambda byte: '0x' + '00' * 12 + byte * 20
+        self.chain.add_log(address, [TRANSFER_TOPIC, topic('11'), topic('22')], hex(value), block=block)
+
+    def test_indexes_known_contracts_with_adaptive_ranges(self):
+        self._transfer(10, 5)
+        self._transfer(60, 7)
+        self._transfer(100, 9)
+        self._transfer(50, 1, address='0x' + 'cd' * 20)  # not one of ours
+
+        indexer = TransferIndexer(self.web3)
+        with self.assertLogs('dashboard.indexer', 'INFO') as logs:
+            summary = indexer.run()
+
+        events = list(TransferEvent.objects.order_by('block_number'))
+        self.assertEqual([(e.block_number, int(e.value)) for e in events], [(10, 5), (60, 7), (100, 9)])
+        self.assertEqual(events[0].contract_id, 1)
+        self.assertEqual(events[0].to_address, Web3.to_checksum_address('0x' + '22' * 20))
+        # The refused span (101 blocks up to the head) is halved, not the configured 2000.
+        self.assertGreater(indexer.shrinks, 0)
+        self.assertIn('refused blocks 0-100', logs.output[0])
+        self.assertTrue(logs.output[0].endswith('range is now 50.'))
+        self.assertEqual(summary['to_block'], 100)
+        self.assertEqual(IndexerCheckpoint.objects.get().block_number, 100)
+
+        # Nothing new: only the checkpoint's block hash is checked.
+        again = TransferIndexer(self.web3).run()
+        self.assertEqual((again['events'], again['round_trips']), (0, 1))
+
+    def test_reorged_blocks_are_reindexed(self):
+        self._transfer(90, 1)
+        self._transfer(99, 2)
+        TransferIndexer(self.web3).run()
+
+        self.chain.reorg(3)     # blocks 98-100 replaced; the transfer in 99 is gone
+        self._transfer(98, 3)
+        TransferIndexer(self.web3).run()
+
+        self.assertEqual(
+            [(e.block_number, int(e.value)) for e in TransferEvent.objects.order_by('block_number')],
+            [(90, 1), (98, 3)],
+        )
+        self.assertEqual(IndexerCheckpoint.objects.get().block_hash, self.chain.block_hash(100))
+
+    @override_settings(INDEXER_START_BLOCK=None)
+    def test_fresh_index_starts_at_first_deployment(self):
+        tx_hash = self.chain.handle({'method': 'eth_sendRawTransaction', 'params': ['0x01']})['result']
+        deployed_at = self.chain.mine()
+        for _ in range(5):
+            self.chain.mine()
+        TransactionJob.objects.create(
+            kind=TransactionJob.KIND_DEPLOY, contract_id=1, state=TransactionJob.STATE_CONFIRMED, tx_hash=tx_hash,
+        )
+        self._transfer(50, 1)
+        self._transfer(deployed_at, 2)
+
+        summary = TransferIndexer(self.web3).run()
+
+        self.assertEqual(summary['from_block'], deployed_at)
+        self.assertEqual([int(e.value) for e in TransferEvent.objects.all()], [2])
+
+    @override_settings(INDEXER_START_BLOCK=None, INDEXER_INITIAL_WINDOW=30)
+    def test_fresh_index_without_deployments_starts_a_window_before_head(self):
+        # Contract 1 has an address but no deploy job (deployed before the job queue).
+        self._transfer(60, 1)
+        self._transfer(80, 2)
+
+        summary = TransferIndexer(self.web3).run()
+
+        self.assertEqual(summary['from_block'], 70)
+        self.assertEqual([int(e.value) for e in TransferEvent.objects.all()], [2])
+
+
+
+class ReconcileTests(ContractsTableMixin, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.chain = StubChain()
+        self.web3 = Web3(BatchingHTTPProvider(self.chain.start()))
+
+    def tearDown(self):
+        self.chain.stop()
+        super().tearDown()
+
+    def _deployed_address(self, raw_tx):
+        tx_hash = self.chain.handle({'method': 'eth_sendRawTransaction', 'params': [raw_tx]})['result']
+        self.chain.mine()
+        return tx_hash, self.chain.transactions[tx_hash]['contract_address']
+
+    def _transfer(self, contract_id, to_address, block):
+        TransferEvent.objects.create(
+            contract_id=contract_id, contract_address='0x' + 'ab' * 20, block_number=block,
+            block_hash='0x' + '00' * 32, tx_hash=f"0x{contract_id:04x}{block:060x}", log_index=0,
+            from_address='0x' + '00' * 20, to_address=to_address, value=1,
+        )
+
+    def test_applies_receipts_the_worker_missed(self):
+        self._create_contract(1, status='Pending')
+        tx_hash, address = self._deployed_address('0x01')
+        job = TransactionJob.objects.create(
+            kind=TransactionJob.KIND_DEPLOY, contract_id=1, state=TransactionJob.STATE_SENT, tx_hash=tx_hash,
+        )
+        TransactionJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - datetime.timedelta(hours=1))
+
+        summary = Reconciler(self.web3).sweep()
+
+        self.assertEqual(summary['receipts_applied'], 1)
+        self.assertEqual(Contract.objects.get(contract_id=1).contract_address, address)
+        job.refresh_from_db()
+        self.assertEqual(job.state, TransactionJob.STATE_CONFIRMED)
+        self.assertTrue(TransactionJob.objects.filter(contract_id=1, kind=TransactionJob.KIND_FUND).exists())
+
+    def test_fixes_statuses_from_events_and_code(self):
+        seller = '0x' + '2' * 40
+        for contract_id, status in ((2, 'Active'), (3, 'Active'), (4, 'Failed'), (5, 'Completed'), (6, 'Active')):
+            self._create_contract(contract_id, status=status)
+        for contract_id, raw_tx in ((2, '0x02'), (4, '0x04'), (6, '0x06')):
+            Contract.objects.filter(contract_id=contract_id).update(contract_address=self._deployed_address(raw_tx)[1])
+        Contract.objects.filter(contract_id=3).update(contract_address='0x' + 'ef' * 20)  # never deployed
+
+        self._transfer(2, seller, 10)   # funding
+        self._transfer(2, seller, 11)   # completion payment
+        self._transfer(4, seller, 12)   # funded even though the job was marked failed
+        self._transfer(6, seller, 13)
+
+        summary = Reconciler(self.web3, batch_size=2).sweep()
+
+        statuses = dict(Contract.objects.values_list('contract_id', 'status'))
+        self.assertEqual(statuses, {2: 'Completed', 3: 'Failed', 4: 'Active', 5: 'Completed', 6: 'Active'})
+        self.assertEqual(Contract.objects.get(contract_id=2).version, 2)
+        self.assertEqual(Contract.objects.get(contract_id=6).version, 1)
+        self.assertEqual((summary['contracts'], summary['batches'], summary['changed']), (4, 2, 3))
+
+
+class StubClientMixin(ContractsTableMixin):
+    # Points get_client() (and so the worker code in jobs.py) at a StubChain.
+
+    def setUp(self):
+        super().setUp()
+        self.chain = StubChain()
+        self.chain_client = chain.ChainClient(self.chain.start(), STUB_DEPLOYER_KEY)
+        self._saved_client = (chain._client, chain._client_pid)
+        chain._client, chain._client_pid = self.chain_client, os.getpid()
+        chain_metadata.invalidate()
+        gas_estimates.invalidate()
+        # The database is flushed between tests; re-register the ABI.
+        artifacts._registered_abis.clear()
+
+    def tearDown(self):
+        chain._client, chain._client_pid = self._saved_client
+        chain_metadata.invalidate()
+        gas_estimates.invalidate()
+        self.chain.stop()
+        super().tearDown()
+
+
+class NonceAllocationTests(StubClientMixin, TransactionTestCase):
+
+    def test_block_reservation_seeds_from_pending_count(self):
+        self.chain.nonce = 3
+        address = self.chain_client.deployer_address
+        self.assertEqual(allocate_nonce(self.chain_client.web3, address, count=5), 3)
+        self.assertEqual(allocate_nonce(self.chain_client.web3, address), 8)
+        self.assertEqual(DeployerNonce.objects.get(address=address).next_nonce, 9)
+
+    def test_concurrent_allocations_are_unique(self):
+        web3, address = self.chain_client.web3, self.chain_client.deployer_address
+        nonces = []
+        errors = []
+
+        def allocate(count):
+            try:
+                for _ in range(5):
+                    first = allocate_nonce(web3, address, count=count)
+                    nonces.extend(range(first, first + count))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=allocate, args=(1 + i % 3,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(nonces), list(range(len(nonces))))
+
+    def test_failed_send_resyncs_from_node(self):
+        jobs.enqueue_deploy('0x' + '1' * 40, '0x' + '2' * 40, 'Vaccines', 1.5, 10)
+        address = self.chain_client.deployer_address
+        DeployerNonce.objects.create(address=address, next_nonce=7)  # drifted ahead of the node
+        self.chain.send_errors.append('insufficient funds for gas * price + value')
+
+        self.assertEqual(jobs.send_queued_jobs(), 0)
+        job = TransactionJob.objects.get()
+        self.assertEqual((job.state, job.nonce, job.raw_tx), (TransactionJob.STATE_QUEUED, None, ''))
+        self.assertEqual(DeployerNonce.objects.get(address=address).next_nonce, 0)
+
+        self.assertEqual(jobs.send_queued_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.state, job.nonce), (TransactionJob.STATE_SENT, 0))
+
+    def test_resync_stays_above_nonces_open_jobs_hold(self):
+        web3, address = self.chain_client.web3, self.chain_client.deployer_address
+        DeployerNonce.objects.create(address=address, next_nonce=6)
+        # Signed with nonce 4 by another worker but not on the node yet.
+        TransactionJob.objects.create(
+            kind=TransactionJob.KIND_DEPLOY, contract_id=1, state=TransactionJob.STATE_SENT, nonce=4,
+        )
+        TransactionJob.objects.create(
+            kind=TransactionJob.KIND_DEPLOY, contract_id=2, state=TransactionJob.STATE_FAILED, nonce=9,
+        )
+
+        self.assertEqual(resync_nonce(web3, address), 5)
+        self.assertEqual(DeployerNonce.objects.get(address=address).next_nonce, 5)
+        self.chain.nonce = 7
+        self.assertEqual(resync_nonce(web3, address), 7)
+
+    def test_build_failure_does_not_rewind_below_sent_jobs(self):
+        address = self.chain_client.deployer_address
+        TransactionJob.objects.create(
+            kind=TransactionJob.KIND_DEPLOY, contract_id=1, state=TransactionJob.STATE_SENT, nonce=2,
+        )
+        DeployerNonce.objects.create(address=address, next_nonce=3)
+        jobs.enqueue_deploy('0x' + '1' * 40, '0x' + '2' * 40, 'Vaccines', 1.5, 10)
+
+        with mock.patch.object(jobs, '_build_transaction', side_effect=ValueError('bad data')):
+            self.assertEqual(jobs.send_queued_jobs(), 0)
+        self.assertEqual(DeployerNonce.objects.get(address=address).next_nonce, 3)
+
+
+class SendRetryTests(StubClientMixin, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        jobs.enqueue_deploy('0x' + '1' * 40, '0x' + '2' * 40, 'Vaccines', 1.5, 10)
+        self.address = self.chain_client.deployer_address
+
+    def _answer_already_known(self):
+        # The node takes the batch but answers every transaction with an error.
+        provider = self.chain_client.web3.provider
+        forward = provider.make_batch_request
+
+        def forward_then_error(requests):
+            responses = forward(requests)
+            if requests[0][0] != 'eth_sendRawTransaction':
+                return responses
+            return [{'id': r['id'], 'error': {'code': -32000, 'message': 'already known'}} for r in responses]
+        return mock.patch.object(provider, 'make_batch_request', side_effect=forward_then_error)
+
+    def test_rejected_tx_the_node_holds_keeps_the_signed_tx(self):
+        with self._answer_already_known():
+            self.assertEqual(jobs.send_queued_jobs(), 1)
+        job = TransactionJob.objects.get()
+        self.assertEqual((job.state, job.nonce, job.attempts), (TransactionJob.STATE_SENT, 0, 1))
+        self.assertEqual(list(self.chain.transactions), [job.tx_hash])
+        self.assertEqual(job.error, 'already known')
+        self.assertEqual(DeployerNonce.objects.get(address=self.address).next_nonce, 1)
+        self.assertEqual(jobs.send_queued_jobs(), 0)  # nothing re-signed
+
+    def test_nonce_held_by_another_tx_requeues_with_a_fresh_nonce(self):
+        # Another transaction took nonce 0 behind the local counter's back.
+        self.chain.nonce = 1
+        DeployerNonce.objects.create(address=self.address, next_nonce=0)
+        self.chain.send_errors.append('nonce too low')
+
+        self.assertEqual(jobs.send_queued_jobs(), 0)
+        job = TransactionJob.objects.get()
+        self.assertEqual((job.state, job.nonce, job.raw_tx), (TransactionJob.STATE_QUEUED, None, ''))
+        self.assertEqual(DeployerNonce.objects.get(address=self.address).next_nonce, 1)
+
+        self.assertEqual(jobs.send_queued_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.state, job.nonce, job.attempts), (TransactionJob.STATE_SENT, 1, 2))
+        self.assertEqual(list(self.chain.transactions), [job.tx_hash])
+
+    def test_rejected_job_ahead_of_accepted_ones_keeps_its_nonce(self):
+        jobs.enqueue_deploy('0x' + '1' * 40, '0x' + '2' * 40, 'Moderna', 1.5, 10)
+        DeployerNonce.objects.create(address=self.address, next_nonce=0)
+        self.chain.send_errors.append('insufficient funds for gas * price + value')
+        web3 = self.chain_client.web3
+
+        # The node keeps nonce 1 as a future transaction; its pending count stays 0.
+        with mock.patch.object(web3.eth, 'get_transaction_count', return_value=0):
+            self.assertEqual(jobs.send_queued_jobs(), 1)
+        first, second = TransactionJob.objects.order_by('job_id')
+        self.assertEqual((first.state, first.nonce, first.raw_tx), (TransactionJob.STATE_QUEUED, 0, ''))
+        self.assertEqual((second.state, second.nonce), (TransactionJob.STATE_SENT, 1))
+        self.assertEqual(DeployerNonce.objects.get(address=self.address).next_nonce, 2)
+
+        self.assertEqual(jobs.send_queued_jobs(), 1)
+        first.refresh_from_db()
+        self.assertEqual((first.state, first.nonce), (TransactionJob.STATE_SENT, 0))
+        self.assertEqual(DeployerNonce.objects.get(address=self.address).next_nonce, 2)
+
+    def test_timeout_after_the_node_took_the_batch_resends_the_same_tx(self):
+        provider = self.chain_client.web3.provider
+        forward = provider.make_batch_request
+
+        def forward_then_time_out(requests):
+            responses = forward(requests)
+            if requests[0][0] == 'eth_sendRawTransaction':
+                raise TimeoutError('read timed out')
+            return responses
+
+        with mock.patch.object(provider, 'make_batch_request', side_effect=forward_then_time_out):
+            self.assertEqual(jobs.send_queued_jobs(), 0)
+        stored = TransactionJob.objects.values('state', 'nonce', 'tx_hash', 'raw_tx').get()
+        self.assertEqual(stored['state'], TransactionJob.STATE_SENT)
+        self.assertTrue(TransactionJob.objects.get().error.startswith(jobs.BROADCAST_FAILED))
+
+        # The next pass sends the stored bytes again; the node already has them.
+        self.assertEqual(jobs.send_queued_jobs(), 1)
+        self.assertEqual(len(self.chain.transactions), 1)
+        self.assertEqual(TransactionJob.objects.values('state', 'nonce', 'tx_hash', 'raw_tx').get(), stored)
+        self.assertEqual(TransactionJob.objects.get().attempts, 1)
+        self.assertEqual(jobs.send_queued_jobs(), 0)
+
+
+class WorkerRestartTests(StubClientMixin, TransactionTestCase):
+
+    def _run_worker(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        call_command('run_tx_worker', '--once', stdout=StringIO(), stderr=StringIO())
+
+    def test_restart_rebroadcasts_sent_jobs_without_signing_again(self):
+        jobs.enqueue_deploy('0x' + '1' * 40, '0x' + '2' * 40, 'Vaccines', 1.5, 10)
+        # The worker dies after storing the signed transaction, before broadcasting it.
+        with mock.patch.object(jobs, '_broadcast', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                jobs.send_queued_jobs()
+        stored = TransactionJob.objects.values('state', 'nonce', 'tx_hash', 'raw_tx').get()
+        self.assertEqual(stored['state'], TransactionJob.STATE_SENT)
+        self.assertEqual(self.chain.transactions, {})
+
+        self._run_worker()
+        self._run_worker()  # a second restart finds it in the mempool
+        self.assertEqual(list(self.chain.transactions), [stored['tx_hash']])
+        self.assertEqual(TransactionJob.objects.values('state', 'nonce', 'tx_hash', 'raw_tx').get(), stored)
+
+        self.chain.mine()
+        self._run_worker()
+        self.assertEqual(TransactionJob.objects.get(kind=TransactionJob.KIND_DEPLOY).state, TransactionJob.STATE_CONFIRMED)
+        self.assertEqual(list(self.chain.transactions), [stored['tx_hash']])
+
+
+class BulkImportTests(StubClientMixin, TransactionTestCase):
+    BUYER = '0x' + '1' * 40
+    SELLER = '0x' + '2' * 40
+
+    def _csv(self, count, extra=''):
+        lines = ['buyer,seller,product,price,quantity']
+        lines += [f"{self.BUYER},{self.SELLER},Vaccines {i},1.50,{i + 1}" for i in range(count)]
+        return '\n'.join(lines) + '\n' + extra
+
+    def test_invalid_rows_are_kept_with_reasons(self):
+        bulk_import = bulk.create_import(self._csv(2, extra=f"0x12,{self.SELLER},Moderna,-1,two\n"))
+
+        rows = list(bulk_import.rows.order_by('line_number'))
+        self.assertEqual([row.line_number for row in rows], [2, 3, 4])
+        self.assertEqual([row.status for row in rows], ['pending', 'pending', 'invalid'])
+        self.assertIn('buyer_address is not an address', rows[2].error)
+        self.assertIn('price', rows[2].error)
+        self.assertIn('quantity', rows[2].error)
+        with self.assertRaises(bulk.BulkImportError):
+            bulk.create_import('buyer,seller,price\n')
+
+    def test_queue_resumes_from_checkpoint(self):
+        bulk_import = bulk.create_import(self._csv(5))
+        allocate = bulk.contract_ids.allocate
+        with mock.patch.object(bulk.contract_ids, 'allocate', side_effect=[allocate(2), ConnectionError('db gone')]):
+            with self.assertRaises(ConnectionError):
+                bulk.queue_import(bulk_import, chunk_size=2)
+
+        bulk_import.refresh_from_db()
+        self.assertEqual((bulk_import.state, bulk_import.next_line), (BulkImport.STATE_QUEUING, 4))
+        self.assertEqual(Contract.objects.count(), 2)
+
+        self.assertEqual(bulk.queue_import(bulk_import, chunk_size=2), 3)
+        self.assertEqual(Contract.objects.filter(status='Pending').count(), 5)
+        self.assertEqual(TransactionJob.objects.filter(kind=TransactionJob.KIND_DEPLOY).count(), 5)
+        self.assertFalse(bulk_import.rows.exclude(status=BulkImportRow.STATUS_QUEUED).exists())
+        self.assertEqual(bulk_import.state, BulkImport.STATE_QUEUED)
+
+    def test_deployments_are_pipelined_and_confirmed_together(self):
+        bulk_import = bulk.create_import(self._csv(6))
+        bulk.queue_import(bulk_import)
+        watcher = ReceiptWatcher(self.chain_client.web3)
+        watcher.poll()
+        chain_metadata.chain_id, chain_metadata.gas_price  # warm, as in the worker
+
+        self.chain.reset_counters()
+        self.assertEqual(jobs.send_queued_jobs(), 6)
+        self.assertEqual(self.chain.method_counts.get('eth_sendRawTransaction'), 6)
+        self.assertEqual(self.chain.posts, 3)  # nonce seed + gas estimate + one broadcast batch
+        self.assertEqual(
+            list(TransactionJob.objects.order_by('job_id').values_list('nonce', flat=True)), list(range(6)),
+        )
+
+        self.chain.mine()
+        self.assertEqual(jobs.apply_receipts(watcher.poll()), 6)
+        results, counts = bulk.import_results(bulk_import)
+        self.assertEqual(counts, {'deployed': 6})
+        self.assertTrue(all(result['contract_address'].startswith('0x') for result in results))
+        self.assertFalse(bulk.open_deploy_jobs(bulk_import).exists())
+
+    def test_upload_view_shows_per_row_results(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        upload = SimpleUploadedFile('contracts.csv', self._csv(2, extra='bad,row\n').encode())
+        response = self.client.post(reverse('bulk_import'), {'csv_file': upload})
+        bulk_import = BulkImport.objects.get()
+        self.assertRedirects(response, reverse('bulk_import_detail', args=[bulk_import.import_id]))
+
+        page = self.client.get(response['Location'])
+        self.assertContains(page, 'Vaccines 1')
+        self.assertContains(page, 'Invalid')
+        self.assertEqual(TransactionJob.objects.count(), 2)
+
+
+class AsyncViewTests(StubClientMixin, TransactionTestCase):
+    # Served through the async middleware stack, as under SolTrack/asgi.py.
+
+    def setUp(self):
+        super().setUp()
+        self._create_contract(1, status='Active')
+        self._create_contract(2, status='Completed')
+
+    async def test_listings_and_history(self):
+        for name in ('active', 'completed', 'analytics', 'alerts'):
+            response = await self.async_client.get(reverse(name))
+            self.assertEqual(response.status_code, 200, name)
+        self.assertContains(await self.async_client.get(reverse('active')), 'Vaccines')
+
+        response = await self.async_client.get(reverse('contract_history', args=[1]))
+        self.assertEqual(response.json()['contract_id'], 1)
+        response = await self.async_client.get(reverse('contract_history', args=[99]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_create_and_action_queue_jobs(self):
+        response = await self.async_client.post(reverse('create_contract'), {
+            'buyer_address': '0x' + '1' * 40, 'seller_address': '0x' + '2' * 40,
+            'product_name': 'Moderna', 'payment_amount': '1.50', 'quantity': '10',
+        })
+        self.assertEqual(response.status_code, 302)
+        response = await self.async_client.post(
+            reverse('process_contract_action', args=[1]), {'action': 'complete'},
+        )
+        self.assertEqual(response.status_code, 302)
+
+        kinds = [kind async for kind in TransactionJob.objects.order_by('job_id').values_list('kind', flat=True)]
+        self.assertEqual(kinds, [TransactionJob.KIND_DEPLOY, TransactionJob.KIND_COMPLETE])
+        self.assertTrue(await Contract.objects.filter(product_name='Moderna', status='Pending').aexists())
+
+    async def test_api_answers_unchanged_polls_with_304(self):
+        for url in (reverse('contract_detail_api', args=[1]), reverse('contract_list_api', args=['active'])):
+            first = await self.async_client.get(url)
+            self.assertEqual(first.status_code, 200, url)
+            again = await self.async_client.get(url, headers={'if-none-match': first['ETag']})
+            self.assertEqual(again.status_code, 304, url)
+        response = await self.async_client.get(reverse('contract_detail_api', args=[99]))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(GAS_ESTIMATE_MARGIN=1.2)
+class GasEstimateTests(StubClientMixin, TransactionTestCase):
+
+    def _deploy_jobs(self, count):
+        for _ in range(count):
+            jobs.enqueue_deploy('0x' + '1' * 40, '0x' + '2' * 40, 'Vaccines', 1, 1)
+
+    def test_estimates_once_per_function_and_bytecode(self):
+        self._deploy_jobs(3)
+        hits = gas_estimates.stats()['hits']
+        self.assertEqual(jobs.send_queued_jobs(limit=2), 2)
+        self.assertEqual(jobs.send_queued_jobs(), 1)
+
+        # The stub estimates 60000 gas for everything.
+        self.assertEqual(self.chain.method_counts.get('eth_estimateGas'), 1)
+        self.assertEqual(set(TransactionJob.objects.values_list('gas_limit', flat=True)), {72000})
+        self.assertEqual(gas_estimates.stats()['hits'] - hits, 2)
+
+        # Funding calls Refund() on the deployed contracts: a new key.
+        watcher = ReceiptWatcher(self.chain_client.web3)
+        self.chain.mine()
+        jobs.apply_receipts(watcher.poll())
+        self.assertEqual(jobs.send_queued_jobs(), 3)
+        self.assertEqual(self.chain.method_counts.get('eth_estimateGas'), 2)
+
+    def test_value_to_an_empty_account_is_estimated_separately(self):
+        # Funding forwards value to the seller; an empty seller costs G_newaccount more.
+        funded, empty = '0x' + '3' * 40, '0x' + '4' * 40
+        self.chain.balances[funded] = 10**18
+        for seller in (funded, empty, funded):
+            jobs.enqueue_deploy('0x' + '1' * 40, seller, 'Vaccines', 1, 1)
+        jobs.send_queued_jobs()
+        self.chain.mine()
+        jobs.apply_receipts(ReceiptWatcher(self.chain_client.web3).poll())
+        self.assertEqual(jobs.send_queued_jobs(), 3)
+
+        # One estimate for the deployments, one per kind of recipient.
+        self.assertEqual(self.chain.method_counts.get('eth_estimateGas'), 3)
+        web3 = self.chain_client.web3
+        self.assertEqual(gas_estimates.recipient_kind(web3, {'value': 1}, empty), gas.NEW_ACCOUNT)
+        self.assertEqual(gas_estimates.recipient_kind(web3, {'value': 1}, funded), '')
+        self.assertEqual(gas_estimates.recipient_kind(web3, {'value': 0}, empty), '')
+
+    def test_out_of_gas_requeues_and_estimates_again(self):
+        self._deploy_jobs(1)
+        jobs.send_queued_jobs()
+        job = TransactionJob.objects.get()
+
+        receipt = Receipt(job.tx_hash, 101, 0, None, gasUsed=job.gas_limit)
+        self.assertEqual(jobs.apply_receipts([(job, receipt)]), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.state, job.gas_limit), (TransactionJob.STATE_QUEUED, None))
+        self.assertEqual(Contract.objects.get().status, 'Pending')
+
+        jobs.send_queued_jobs()
+        self.assertEqual(self.chain.method_counts.get('eth_estimateGas'), 2)
+
+
+class MetricsTests(StubClientMixin, TransactionTestCase):
+
+    def test_pipeline_stages_are_timed(self):
+        broadcasts = metrics.STAGE_SECONDS.count(stage='broadcast')
+        confirmed = metrics.JOBS.value(kind='deploy', outcome='confirmed')
+        jobs.enqueue_deploy('0x' + '1' * 40, '0x' + '2' * 40, 'Vaccines', 1, 1)
+        jobs.send_queued_jobs()
+        self.chain.mine()
+        jobs.apply_receipts(ReceiptWatcher(self.chain_client.web3).poll())
+
+        self.assertEqual(metrics.STAGE_SECONDS.count(stage='broadcast'), broadcasts + 1)
+        self.assertEqual(metrics.JOBS.value(kind='deploy', outcome='confirmed'), confirmed + 1)
+        for stage in ('enqueue', 'claim', 'nonce', 'db_fetch', 'build', 'sign', 'receipt_poll', 'receipt_wait'):
+            self.assertGreater(metrics.STAGE_SECONDS.count(stage=stage), 0, stage)
+
+    def test_histogram_exposition(self):
+        histogram = metrics.Histogram('test_seconds', "Test.", ['stage'], buckets=(0.1, 1.0))
+        metrics._registry.remove(histogram)
+        histogram.observe(0.05, stage='a')
+        histogram.observe(0.5, stage='a')
+        histogram.observe(5, stage='a')
+        self.assertEqual([line[1:] for line in histogram.samples()], [
+            ('{stage="a",le="0.1"}', 1), ('{stage="a",le="1.0"}', 2), ('{stage="a",le="+Inf"}', 3),
+            ('{stage="a"}', 5.55), ('{stage="a"}', 3),
+        ])
+
+    def test_endpoint(self):
+        with track_rpc('metrics-test') as stats:
+            stats.record(3, 1)
+        # Without METRICS_TOKEN only staff users see the metrics.
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        staff = get_user_model().objects.create_user('ops@example.com', 'Ops', 'secret', is_staff=True)
+        self.client.force_login(staff)
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        body = response.content.decode()
+        self.assertIn('# TYPE soltrack_stage_seconds histogram', body)
+        self.assertIn('soltrack_rpc_calls_total{scope="metrics-test"} 3', body)
+        # Each request records its duration and RPC call count.
+        self.assertIn('soltrack_request_rpc_calls_count{view="metrics"}', self.client.get('/metrics').content.decode())
+
+        self.client.logout()
+        with self.settings(METRICS_TOKEN='scrape'):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+            self.assertEqual(self.client.get('/metrics', headers={'Authorization': 'Bearer scrape'}).status_code, 200)
+
+
+@override_settings(PROFILING_ENABLED=True)
+class ProfilingTests(QueryCountAssertions, ContractsTableMixin, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        profile_summary.clear()
+        self.next_id = 1
+
+    def _add_contracts(self, status):
+        def add_rows(count):
+            while self.next_id <= count:
+                self._create_contract(self.next_id, status=status)
+                ContractHealth.objects.create(
+                    contract_id=self.next_id, latest_temperature=-10, latest_recorded_at=timezone.now(),
+                    run_started_at=timezone.now(),
+                )
+                TransactionJob.objects.create(kind=TransactionJob.KIND_FUND, contract_id=self.next_id)
+                self.next_id += 1
+        return add_rows
+
+    def test_listings_have_no_n_plus_one(self):
+        self.assertQueriesConstant(reverse('active'), self._add_contracts('Active'), sizes=(1, 8))
+
+    def test_completed_listing_has_no_n_plus_one(self):
+        self.assertQueriesConstant(reverse('completed'), self._add_contracts('Completed'), sizes=(1, 8))
+
+    def test_helper_catches_a_query_per_row(self):
+        def per_row():
+            for contract_id in Contract.objects.values_list('contract_id', flat=True):
+                Contract.objects.get(contract_id=contract_id)
+            Contract.objects.count()
+            Contract.objects.count()
+
+        self._add_contracts('Active')(3)
+        _, profile = capture(per_row)
+        self.assertEqual((profile.queries, profile.similar, profile.duplicates), (6, 3, 1))
+
+    def test_headers_and_summary_page(self):
+        self._add_contracts('Active')(2)
+        response = self.client.get(reverse('active'))
+        self.assertGreater(int(response['X-Profile-Queries']), 0)
+        self.assertGreater(float(response['X-Profile-Template-ms']), 0)
+        for header in ('X-Profile-DB-ms', 'X-Profile-Duplicate-Queries', 'X-Profile-Total-ms'):
+            self.assertIn(header, response)
+
+        page = self.client.get(reverse('profiling'))
+        self.assertContains(page, '<td>active</td>', html=False)
+        with self.settings(PROFILING_ENABLED=False):
+            self.assertEqual(self.client.get(reverse('profiling')).status_code, 404)
+
+
+@override_settings(TELEMETRY_INGEST_TOKEN='secret')
+class TelemetryIngestTests(ContractsTableMixin, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self._create_contract(1, status='Active')
+        self._create_contract(2, status='Active')
+
+    def _post(self, body, content_type, token='secret'):
+        return self.client.post(reverse('ingest_readings'), body, content_type=content_type,
+                                HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_jsonl_batch(self):
+        body = "\n".join([
+            '{"contract_id": 1, "device_id": "truck-1", "recorded_at": 1760800000, "temperature": -7.5}',
+            '{"contract_id": 2, "device_id": "truck-2", "recorded_at": "2025-10-18T12:00:00+00:00", "temperature": -9}',
+            '{"contract_id": 3, "device_id": "truck-3", "recorded_at": 1760800000, "temperature": -9}',
+            '{"contract_id": 1, "device_id": "bad id", "recorded_at": 1760800000, "temperature": -9}',
+            'not json',
+        ])
+        response = self._post(body, 'application/x-ndjson')
+
+        self.assertEqual(response.json(), {'accepted': 2, 'rejected': 3})
+        self.assertEqual(TemperatureReading.objects.count(), 2)
+
+    def test_binary_batch(self):
+        start = timezone.now()
+        rows = [(1, 'probe-a', start + datetime.timedelta(seconds=i), -8.0 + i) for i in range(5)]
+        response = self._post(telemetry.pack_binary(rows), telemetry.BINARY_CONTENT_TYPE)
+
+        self.assertEqual(response.json(), {'accepted': 5, 'rejected': 0})
+        self.assertEqual(
+            list(TemperatureReading.objects.order_by('recorded_at').values_list('temperature', flat=True)),
+            [-8.0, -7.0, -6.0, -5.0, -4.0],
+        )
+
+    def test_rejects_bad_token_and_truncated_binary(self):
+        self.assertEqual(self._post(b'', 'application/x-ndjson', token='wrong').status_code, 403)
+        self.assertEqual(self._post(b'\0' * 33, telemetry.BINARY_CONTENT_TYPE).status_code, 400)
+
+
+class ReadingRollupTests(ContractsTableMixin, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self._create_contract(1, status='Active')
+        self.start = datetime.datetime(2025, 10, 18, 12, 0, tzinfo=datetime.timezone.utc)
+
+    def _at(self, **delta):
+        return self.start + datetime.timedelta(**delta)
+
+    def test_batches_merge_into_existing_buckets(self):
+        telemetry.write_readings([(1, 'p', self._at(seconds=10), -8.0), (1, 'p', self._at(seconds=50), -6.0)])
+        telemetry.write_readings([(1, 'p', self._at(seconds=30), -9.0), (1, 'p', self._at(minutes=90), -7.0)])
+
+        minute = ReadingRollupMinute.objects.get(contract_id=1, bucket=self.start)
+        self.assertEqual((minute.count, minute.min_temp, minute.max_temp), (3, -9.0, -6.0))
+        self.assertAlmostEqual(minute.avg_temp, -23.0 / 3)
+
+        hours = ReadingRollupHour.objects.filter(contract_id=1).order_by('bucket')
+        self.assertEqual([(h.bucket, h.count) for h in hours], [(self.start, 3), (self._at(hours=1), 1)])
+
+    def test_batch_is_one_insert_per_rollup_table(self):
+        rows = [(1, 'p', self._at(minutes=m), -8.0) for m in range(10)]
+        with CaptureQueriesContext(connection) as queries:
+            rollups.apply_readings(rows)
+        inserts = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(ReadingRollupMinute.objects.count(), 10)
+        self.assertEqual(ReadingRollupHour.objects.get().count, 10)
+
+    def test_history_picks_resolution_from_window(self):
+        telemetry.write_readings([(1, 'p', self._at(minutes=m), -8.0) for m in range(0, 7 * 24 * 60, 30)])
+
+        week = rollups.history(1, self.start, self._at(days=7))
+        self.assertEqual(week['resolution'], '1h')
+        self.assertEqual(len(week['points']), 7 * 24)
+
+        hour = rollups.history(1, self._at(hours=5), self._at(hours=6))
+        self.assertEqual(hour['resolution'], '1m')
+        self.assertEqual([p['t'] for p in hour['points']], [self._at(hours=5).isoformat(), self._at(hours=5, minutes=30).isoformat()])
+
+
+@override_settings(ALERT_BREACH_MINUTES=5, ALERT_CLEAR_MINUTES=3)
+class AlertEvaluationTests(ContractsTableMixin, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self._create_contract(1, status='Active', threshold=-8.0)
+        self._create_contract(2, status='Active', threshold=2.0)
+        self._create_contract(3, status='Completed', threshold=-8.0)
+        self.start = datetime.datetime(2025, 10, 18, 12, 0, tzinfo=datetime.timezone.utc)
+
+    def _readings(self, contract_id, temps, first_minute=0):
+        return [(contract_id, 'p', self.start + datetime.timedelta(minutes=first_minute + i), t)
+                for i, t in enumerate(temps)]
+
+    def _state(self, contract_id):
+        return ContractHealth.objects.get(contract_id=contract_id).state
+
+    def test_spike_shorter_than_window_does_not_alert(self):
+        changes = alerting.evaluate_readings(self._readings(1, [-9, -5, -4, -9, -9]))
+
+        self.assertEqual(changes, [])
+        self.assertEqual(self._state(1), ContractHealth.STATE_OK)
+
+    def test_breach_carries_across_batches_then_clears(self):
+        self.assertEqual(alerting.evaluate_readings(self._readings(1, [-9, -7, -6, -7])), [])
+        self.assertEqual(alerting.evaluate_readings(self._readings(2, [0, 1])), [])
+
+        changes = alerting.evaluate_readings(self._readings(1, [-6, -7, -5], first_minute=4))
+        self.assertEqual(changes, [(1, 'alert', self.start + datetime.timedelta(minutes=1), -5.0)])
+        self.assertEqual(self._state(1), ContractHealth.STATE_ALERT)
+        self.assertEqual(self._state(2), ContractHealth.STATE_OK)
+
+        # Back under the threshold, but not yet for ALERT_CLEAR_MINUTES.
+        self.assertEqual(alerting.evaluate_readings(self._readings(1, [-9, -9], first_minute=7)), [])
+        changes = alerting.evaluate_readings(self._readings(1, [-9, -9], first_minute=9))
+        self.assertEqual([c[:2] for c in changes], [(1, 'ok')])
+
+    def test_ignores_inactive_contracts_and_stale_readings(self):
+        alerting.evaluate_readings(self._readings(3, [0] * 10) + self._readings(1, [-9], first_minute=10))
+        self.assertFalse(ContractHealth.objects.filter(contract_id=3).exists())
+
+        alerting.evaluate_readings(self._readings(1, [0] * 10))
+        health = ContractHealth.objects.get(contract_id=1)
+        self.assertEqual((health.state, health.latest_temperature), (ContractHealth.STATE_OK, -9.0))
+
+
+@override_settings(ALERT_BREACH_MINUTES=2, ALERT_CLEAR_MINUTES=2, ALERT_MERGE_MINUTES=10, ALERT_RING_SIZE=3)
+class AlertIncidentTests(ContractsTableMixin, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self._create_contract(1, status='Active', threshold=-8.0)
+        self.start = datetime.datetime(2025, 10, 18, 12, 0, tzinfo=datetime.timezone.utc)
+        self.recent = incidents.RecentIncidents(size=3, ttl=60)
+
+    def _ingest(self, temps, first_minute):
+        telemetry.write_readings([
+            (1, 'p', self.start + datetime.timedelta(minutes=first_minute + i), t) for i, t in enumerate(temps)
+        ])
+
+    def test_repeated_breaches_merge_into_one_incident(self):
+        self._ingest([-5, -5, -4], 0)               # breach opens at 12:00
+        self._ingest([-9, -9, -9], 3)               # cleared at 12:03
+        self._ingest([-6, -3, -6], 8)               # new breach 5 minutes later: reopened
+        incident = AlertIncident.objects.get()
+        self.assertEqual((incident.breach_count, incident.peak_temperature), (2, -3.0))
+        self.assertTrue(incident.is_open)
+
+        self._ingest([-9, -9, -9], 11)
+        self._ingest([-2, -2, -2], 40)              # far outside the merge window
+        self.assertEqual(AlertIncident.objects.count(), 2)
+        first = AlertIncident.objects.order_by('started_at').first()
+        self.assertEqual(first.ended_at, self.start + datetime.timedelta(minutes=11))
+
+    def test_ring_buffer_is_bounded_and_lists_open_incidents_first(self):
+        for minute in range(0, 100, 20):
+            AlertIncident.objects.create(
+                contract_id=1, threshold=-8, peak_temperature=-5,
+                started_at=self.start + datetime.timedelta(minutes=minute),
+                ended_at=self.start + datetime.timedelta(minutes=minute + 5),
+            )
+        open_incident = AlertIncident.objects.create(
+            contract_id=1, threshold=-8, peak_temperature=-5, started_at=self.start,
+        )
+
+        snapshot = self.recent.snapshot()
+        self.assertEqual(len(snapshot), 3)
+        self.assertEqual(snapshot[0], open_incident)
+        self.assertEqual([i.ended_at.minute for i in snapshot[1:]], [25, 5])
+
+        open_incident.ended_at = self.start + datetime.timedelta(minutes=200)
+        self.recent.push(open_incident)
+        self.assertEqual(self.recent.snapshot()[0], open_incident)
+        self.assertEqual(len(self.recent.snapshot()), 3)
+
+    def test_ring_buffer_evicts_closed_incidents_before_open_ones(self):
+        def incident(minute, closed):
+            return AlertIncident.objects.create(
+                contract_id=1, threshold=-8, peak_temperature=-5,
+                started_at=self.start + datetime.timedelta(minutes=minute),
+                ended_at=self.start + datetime.timedelta(minutes=minute + 5) if closed else None,
+            )
+
+        self.recent.snapshot()  # loaded while empty; pushes land on it
+        oldest_open = incident(0, closed=False)
+        self.recent.push(oldest_open)
+        for minute in (10, 20, 30):
+            self.recent.push(incident(minute, closed=True))
+        self.assertIn(oldest_open, self.recent.snapshot())
+
+        newer_open = [incident(minute, closed=False) for minute in (40, 50, 60)]
+        for open_incident in newer_open:
+            self.recent.push(open_incident)
+        self.assertEqual(self.recent.snapshot(), newer_open[::-1])
+
+    def test_alerts_page(self):
+        self._ingest([-5, -5, -4], 0)
+        incidents.recent_incidents.invalidate()
+
+        response = self.client.get(reverse('alerts'))
+        self.assertContains(response, 'Critical Temperature Breach')
+        self.assertContains(response, 'Contract #1 (Vaccines)')
+
+
+@override_settings(LIVE_FEED_INTERVAL=0.05, LIVE_FEED_KEEPALIVE=5)
+class LiveFeedTests(ContractsTableMixin, TransactionTestCase):
+
+    def _health(self, contract_id, temperature, state=ContractHealth.STATE_OK):
+        now = timezone.now()
+        ContractHealth.objects.update_or_create(
+            contract_id=contract_id,
+            defaults={'latest_temperature': temperature, 'latest_recorded_at': now,
+                      'run_started_at': now, 'state': state},
+        )
+
+    async def test_one_poll_fans_out_to_every_subscriber(self):
+        feed = LiveFeed(interval=0.05)
+        everyone = [feed.subscribe() for _ in range(20)]
+        only_two = feed.subscribe(contract_ids={2})
+        await asyncio.sleep(0.1)
+
+        polls_before = feed.polls
+        await asyncio.to_thread(self._health, 1, -7.5)
+        await asyncio.to_thread(self._health, 2, -3.0, ContractHealth.STATE_ALERT)
+        first = await asyncio.wait_for(everyone[0].queue.get(), timeout=2)
+        await asyncio.sleep(0.2)
+
+        self.assertEqual(first['contract_id'], 1)
+        self.assertEqual(everyone[0].queue.qsize(), 1)
+        self.assertTrue(all(s.queue.qsize() == 2 for s in everyone[1:]))
+        self.assertEqual((await only_two.queue.get())['state'], 'alert')
+        self.assertEqual(only_two.queue.qsize(), 0)
+        # Polls depend on time, not on the number of subscribers.
+        self.assertLess(feed.polls - polls_before, 10)
+
+        for subscriber in everyone + [only_two]:
+            feed.unsubscribe(subscriber)
+
+    async def test_contract_status_changes_are_pushed(self):
+        await asyncio.to_thread(self._create_contract, 3, 'Active')
+        await Contract.objects.filter(contract_id=3).aupdate(updated_at=timezone.now() - datetime.timedelta(hours=1))
+        feed = LiveFeed(interval=0.05)
+        subscriber = feed.subscribe(contract_ids={3})
+        await asyncio.sleep(0.1)
+
+        await asyncio.to_thread(Contract.objects.filter(contract_id=3).update_versioned, status='Completed')
+        event = await asyncio.wait_for(subscriber.queue.get(), timeout=2)
+        feed.unsubscribe(subscriber)
+        self.assertEqual(
+            (event['event'], event['contract_id'], event['status']), ('contract', 3, 'Completed'),
+        )
+
+    async def test_connections_are_checked_around_every_poll(self):
+        feed = LiveFeed(interval=0.05)
+        with mock.patch('dashboard.live.close_old_connections') as close_old:
+            feed._since = feed._contracts_since = timezone.now()
+            await feed._poll()
+            self.assertEqual(close_old.call_count, 2)
+            with mock.patch.object(feed, '_read_changes', side_effect=ConnectionError('server closed the connection')):
+                with self.assertRaises(ConnectionError):
+                    await feed._poll()
+            self.assertEqual(close_old.call_count, 4)
+
+    async def test_asgi_app_streams_events_until_disconnect(self):
+        sent = []
+        disconnect = asyncio.Event()
+
+        async def receive():
+            await disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'path': '/dashboard/live/', 'query_string': b'contracts=5'}
+        app = asyncio.ensure_future(live_feed_app(scope, receive, send))
+        await asyncio.sleep(0.1)
+        await asyncio.to_thread(self._health, 6, -1.0)
+        await asyncio.to_thread(self._health, 5, -2.0)
+        for _ in range(40):
+            if len(sent) > 2:
+                break
+            await asyncio.sleep(0.05)
+        disconnect.set()
+        await asyncio.wait_for(app, timeout=2)
+
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream'), sent[0]['headers'])
+        body = b''.join(m['body'] for m in sent[1:])
+        self.assertIn(b'event: reading\ndata: {"contract_id": 5', body)
+        self.assertNotIn(b'"contract_id": 6', body)
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 
 urlpatterns = [
@@ -7,9 +7,18 @@ urlpatterns = [
     path('active/', views.active_view, name='active'),
     path('contract/create/', views.create_contract_view, name='create_contract'),
     path('contract/<int:contract_id>/action/', views.process_contract_action, name='process_contract_action'),
+    path('contract/import/', views.bulk_import_view, name='bulk_import'),
+    path('contract/import/<int:import_id>/', views.bulk_import_detail_view, name='bulk_import_detail'),
     path('ongoing/', views.ongoing_view, name='ongoing'),
     path('completed/', views.completed_view, name='completed'),
     path('alerts/', views.alerts_view, name='alerts'),
     path('analytics/', views.analytics_view, name='analytics'),
+    path('telemetry/ingest/', views.ingest_readings_view, name='ingest_readings'),
+    path('contract/<int:contract_id>/history/', views.contract_history_view, name='contract_history'),
+    path('api/contracts/<int:contract_id>/', api.contract_detail_api, name='contract_detail_api'),
+    path('api/contracts/<str:listing>/', api.contract_list_api, name='contract_list_api'),
+    path('profiling/', views.profiling_view, name='profiling'),
+    # Streamed by SolTrack/asgi.py; this route only answers when running under WSGI.
+    path('live/', views.live_feed_unavailable_view, name='live_feed'),
 ]
 
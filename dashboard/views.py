@@ -1,203 +1,68 @@
-from django.shortcuts import render
-from django.utils import timezone 
-from django.http import HttpResponseRedirect
+from django.shortcuts import get_object_or_404, render
+from django.http import Http404, HttpResponse, HttpResponseRedirect, JsonResponse
 from django.urls import reverse
-import random 
-import json 
-import datetime
-from web3 import Web3
-from solcx import compile_source
-from .models import Contract 
-import os
-from dotenv import load_dotenv # NEW
-from eth_account import Account # NEW
-load_dotenv() 
-
-SEPOLIA_URL = os.getenv("SEPOLIA_RPC_URL")
-DEPLOYER_PRIVATE_KEY = os.getenv("DEPLOYER_PRIVATE_KEY")
-# Solidity Code (SimpleTransfer Contract)
-solidity_code = '''
-pragma solidity 0.5.16;
-
-contract SimpleTransfer {
-event Transfer(address indexed from, address indexed to, uint256 value);
-
-function Deposit(address payable _to) public payable {
-require(msg.value > 0, "Must send some Ether");
-_to.transfer(msg.value);
-emit Transfer(msg.sender, _to, msg.value);
-}
-
-function Refund(address payable _to) public payable {
-require(msg.value > 0, "Must send some Ether");
-_to.transfer(msg.value);
-emit Transfer(msg.sender, _to, msg.value);
-}
-
-}
-'''
-
-web3 = Web3(Web3.HTTPProvider(SEPOLIA_URL))
-
-# Get the deployer account address from the private key
-deployer_account = Account.from_key(DEPLOYER_PRIVATE_KEY)
-DEPLOYER_ADDRESS = deployer_account.address # The address used for transactions
-def _get_current_temp(threshold_float):
-    """Mocks a live temperature reading based on the threshold."""
-    current_temp_mock = random.uniform(threshold_float - 1, threshold_float + 2)
-    return f"{current_temp_mock:.1f}°C", current_temp_mock
-
-
-# --- CONTRACT DEPLOYMENT LOGIC (NOW USES CHAR(42) ADDRESSES) ---
-
-def deploy_contract_and_save(BuyerAddress, SellerAddress, ProductName, PaymentAmount, Quantity):
-    """
-    Compiles, signs, and sends the deployment and initial Refund transactions 
-    to the Sepolia testnet, then saves contract details using the Django ORM.
-    """
-    
-    print("--- Starting Contract Deployment Process ---")
-    
-    # 1. Check Web3 Connection
-    if not web3.is_connected():
-        print("ERROR: Web3 not connected. Check RPC URL and network status.")
-        raise ConnectionError("Could not connect to Sepolia RPC endpoint.")
-    
-    # 1. Compile and Deploy Contract (Web3 logic)
-    compiled_sol = compile_source(solidity_code)
-    contract_name, contract_interface = compiled_sol.popitem()
-    abi = contract_interface['abi']
-    bytecode = contract_interface['bin']
-    SimpleTransfer = web3.eth.contract(abi=abi, bytecode=bytecode)
-    
-    # ------------------------------------------------------------------
-    # 1. Prepare and Sign Contract Deployment Transaction
-    # ------------------------------------------------------------------
-    
-    nonce = web3.eth.get_transaction_count(DEPLOYER_ADDRESS)
-    print(f"1. Nonce for Deployment: {nonce}")
-
-    # Build the constructor transaction
-    construct_txn = SimpleTransfer.constructor().build_transaction({
-        'chainId': web3.eth.chain_id,
-        'from': DEPLOYER_ADDRESS,
-        'nonce': nonce,
-        'gasPrice': web3.eth.gas_price, 
-        'gas': 2000000 
-    })
-    
-    # Sign the transaction locally with the private key
-    signed_txn = web3.eth.account.sign_transaction(
-        construct_txn, 
-        private_key=DEPLOYER_PRIVATE_KEY
-    )
-    print("2. Contract deployment transaction signed.")
-    
-    # Send the signed transaction
-    tx_hash = web3.eth.send_raw_transaction(signed_txn.raw_transaction)
-    print(f"3. Deployment transaction sent. Hash: {tx_hash.hex()}")
-    tx_receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
-    contract_address = tx_receipt.contractAddress
-    print(f"4. Contract deployed successfully at: {contract_address}")
-    
-    # ------------------------------------------------------------------
-    # 2. Prepare and Sign Initial Refund Transaction
-    # ------------------------------------------------------------------
-    contract = web3.eth.contract(address=contract_address, abi=abi)
-    amount_eth = 0.05 
-    amount_wei = web3.to_wei(amount_eth, 'ether')
-    
-    # Get the new nonce for the second transaction
-    nonce = web3.eth.get_transaction_count(DEPLOYER_ADDRESS)
-    print(f"5. Nonce for Refund: {nonce}")
-    
-    # Build the Refund function call
-    refund_txn = contract.functions.Refund(SellerAddress).build_transaction({
-        'chainId': web3.eth.chain_id,
-        'from': DEPLOYER_ADDRESS,
-        'nonce': nonce,
-        'value': amount_wei,
-        'gasPrice': web3.eth.gas_price,
-        'gas': 2000000 
-    })
-    
-    # Sign and send the second transaction
-    signed_txn2 = web3.eth.account.sign_transaction(
-        refund_txn, 
-        private_key=DEPLOYER_PRIVATE_KEY
-    )
-    print("6. Refund transaction signed.")
-    tx_hash2 = web3.eth.send_raw_transaction(signed_txn2.raw_transaction)
-    print(f"7. Refund transaction sent. Hash: {tx_hash2.hex()}")
-
-    web3.eth.wait_for_transaction_receipt(tx_hash2) 
-    print("8. Refund transaction confirmed on chain.")
-
-    # ------------------------------------------------------------------
-    # 3. Save to Database using DJANGO ORM
-    # ------------------------------------------------------------------
-    MAX_INT_VALUE = 2147483647
-    buyer_id_int = abs(hash(BuyerAddress)) % MAX_INT_VALUE
-    seller_id_int = abs(hash(SellerAddress)) % MAX_INT_VALUE
-    latest_iot_contract = iot_devices.objects.aggregate(max_id=models.Max('contract_id'))['max_id']
-    next_contract_id = (latest_iot_contract or 0) + 1
-    print(f"10. Saving contract details to database (Attempting ID: {next_contract_id}).")
-    
-    new_contract = Contract.objects.create(
-    contract_id=next_contract_id,
-    # PASS THE FULL STRING ADDRESSES DIRECTLY:
-    buyer_address=BuyerAddress,   # <-- CORRECT
-    seller_address=SellerAddress, # <-- CORRECT 
-    
-    product_name=ProductName,
-    quantity=Quantity, 
-    price=PaymentAmount,
-    start_date=timezone.now(),
-    end_date=timezone.now() + timezone.timedelta(days=7),
-    
-      
-    contract_address=contract_address,      
-    contract_abi=abi,           # JSONField automatically handles the Python object 'abi'
-    
-    temperature_threshold=-8.0, 
-    status='Active'
-    )
-    print("11. Database save complete. Process SUCCESSFUL.")
-    
-    
-    return contract_address
-def overview_view(request):
-    return render(request, "dashboard/overview.html")
+from django.conf import settings
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+import hmac
+import logging
+from .models import BulkImport, Contract, ContractHealth, TransactionJob, TransferEvent
+from .async_db import run_db
+from .pagination import keyset_page
+from .incidents import recent_incidents
+from . import bulk, fragments, jobs, metrics, profiling, rollups, telemetry
 
+# Only the columns the listing cards render (plus the pagination key).
+# version is part of each card's cache key.
+ACTIVE_LIST_FIELDS = ('contract_id', 'status', 'product_name', 'contract_address', 'end_date', 'version')
+COMPLETED_LIST_FIELDS = ('contract_id', 'status', 'product_name', 'end_date', 'temperature_threshold', 'version')
 
-def active_view(request):
-    
-    # --- Live Data Fetch from Supabase via Django ORM ---
-    try:
-        contracts_queryset = Contract.objects.filter(status='Active').all()
-    except Exception as e:
-        print(f"Database query error: {e}")
-        contracts_queryset = []
+logger = logging.getLogger(__name__)
+
+# The listing, history and contract action views are async: under ASGI
+# (SolTrack/asgi.py) a request waiting on the database is a coroutine, not a
+# held thread, so one worker serves many requests at once. Each view's
+# queries run as one run_db() call on the database thread pool
+# (dashboard/async_db.py), and templates are rendered there too by
+# _arender(), since rendering can still reach the session or a non-local
+# fragment cache. See 'manage.py bench_concurrency'.
+
+
+async def _arender(request, template_name, context=None):
+    return await run_db(render, request, template_name, context)
+
+
+def active_card_items(contracts_queryset):
+    """Per-card data for the active listing, including the card cache-key parts."""
+    # Latest transaction job per listed contract, for the per-card tx state
+    latest_jobs = {}
+    for job in TransactionJob.objects.filter(
+        contract_id__in=[c.contract_id for c in contracts_queryset]
+    ).order_by('job_id'):
+        latest_jobs[job.contract_id] = job
+
+    # Latest reading and Alert/OK state, precomputed on ingest by dashboard.alerting
+    health = ContractHealth.objects.in_bulk([c.contract_id for c in contracts_queryset])
 
     active_contracts = []
     
     for contract_instance in contracts_queryset:
         
-        # 1. Get the temperature threshold (now a FloatField from the DB)
-        temp_threshold_float = contract_instance.temperature_threshold
-        
-        # 2. Get/Mock the current temperature
-        current_temp_str, current_temp_float = _get_current_temp(temp_threshold_float)
+        # 1. Get the current temperature from the latest reading
+        contract_health = health.get(contract_instance.contract_id)
+        current_temp_str = f"{contract_health.latest_temperature:.1f}°C" if contract_health else "--"
         
-        # 3. Determine status
+        # 2. Determine status
         status = 'Active'
         status_class = 'success'
         
-        if current_temp_float > temp_threshold_float:
+        if contract_health and contract_health.state == ContractHealth.STATE_ALERT:
             status = 'Alert' 
             status_class = 'warning'
         
-        # 4. Assemble final data object
+        # 3. Assemble final data object
         active_contracts.append({
             'contract': contract_instance,
             
@@ -205,15 +70,51 @@ def active_view(request):
             'current_temp': current_temp_str, 
             'status': status,
             'status_class': status_class,
+            'job': latest_jobs.get(contract_instance.contract_id),
+            # Parts of the card's {% cache %} key (see dashboard/fragments.py)
+            'health_stamp': fragments.health_stamp(contract_health),
+            'job_stamp': fragments.job_stamp(latest_jobs.get(contract_instance.contract_id)),
         })
-    
+    return active_contracts
+
+
+async def overview_view(request):
+    return await _arender(request, "dashboard/overview.html")
+
+
+def _active_page(cursor):
+    # --- Live Data Fetch from Supabase via Django ORM ---
+    try:
+        contracts_queryset, next_cursor = keyset_page(
+            Contract.objects.filter(status='Active').only(*ACTIVE_LIST_FIELDS),
+            cursor,
+        )
+    except Exception as e:
+        logger.error("Database query error: %s", e)
+        contracts_queryset, next_cursor = [], None
+
+    # Deployments and settlements the worker has not finished yet
+    pending_jobs = list(TransactionJob.objects.exclude(
+        state=TransactionJob.STATE_CONFIRMED
+    ).order_by('-job_id')[:20])
+    return active_card_items(contracts_queryset), next_cursor, pending_jobs
+
+
+async def active_view(request):
+    cursor = request.GET.get('after')
+    active_contracts, next_cursor, pending_jobs = await run_db(_active_page, cursor)
+
     context = {
-        'contracts': active_contracts
+        'contracts': active_contracts,
+        'pending_jobs': pending_jobs,
+        'cursor': cursor,
+        'next_cursor': next_cursor,
+        **fragments.card_cache_context(),
     }
     
-    return render(request, 'dashboard/active.html', context)
+    return await _arender(request, 'dashboard/active.html', context)
 
-def create_contract_view(request):
+async def create_contract_view(request):
     if request.method == 'POST':
         try:
             # 1. Get ALL required data from the POST request
@@ -225,8 +126,10 @@ def create_contract_view(request):
             payment_amount = float(request.POST.get('payment_amount'))
             quantity = int(request.POST.get('quantity')) 
             
-            # 2. Execute the deployment and database saving logic
-            contract_address = deploy_contract_and_save(
+            # 2. Save the contract as Pending and queue its deployment.
+            #    'manage.py run_tx_worker' sends and confirms it in the background
+            #    (progress is in the /metrics stage timings and job counters).
+            await run_db(jobs.enqueue_deploy,
                 buyer_address, 
                 seller_address, 
                 product_name, 
@@ -234,10 +137,8 @@ def create_contract_view(request):
                 quantity
             )
             
-            print(f"Contract deployed successfully at: {contract_address}")
-            
         except Exception as e:
-            print(f"Contract Creation Error: {e}")
+            logger.exception("Contract Creation Error: %s", e)
             
         # 3. Redirect back to the active contracts view after submission
         return HttpResponseRedirect(reverse('active')) 
@@ -245,103 +146,29 @@ def create_contract_view(request):
     return HttpResponseRedirect(reverse('active')) 
     
     
-def process_contract_action(request, contract_id):
+async def process_contract_action(request, contract_id):
     """
-    Handles contract completion (Deposit/ForwardPay) or refund by executing
-    the corresponding Web3 transaction and updating the database status.
+    Queues contract completion (Deposit to seller) or refund (Refund to buyer).
+    The transaction worker sends it and updates the database status once the
+    receipt arrives.
     """
     
     # --- 0. Initial Check and Request Parsing ---
     if request.method != 'POST':
-        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] ERROR: Invalid request method {request.method} for contract ID {contract_id}.")
+        logger.error("Invalid request method %s for contract ID %s.", request.method, contract_id)
         return HttpResponseRedirect(reverse('active'))
 
     action = request.POST.get('action') # 'complete' or 'refund'
-    print(f"\n===================================================================")
-    print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] STARTING ACTION: {action.upper()} for Contract ID: {contract_id}")
-    print(f"===================================================================")
-
 
     try:
-        # --- 1. Retrieve Contract Data from Django DB ---
-        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 1. Retrieving data from database...")
-        contract_db = Contract.objects.get(contract_id=contract_id)
-        
-        contract_address = contract_db.contract_address
-        contract_abi = contract_db.contract_abi 
-        
-        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] -> DB Retrieved. Contract Address: {contract_address}")
-        
-        # --- 2. Web3 Setup and Contract Instance ---
-        if not web3.is_connected():
-            raise ConnectionError("Web3 not connected. Check RPC URL.")
-            
-        contract = web3.eth.contract(address=contract_address, abi=contract_abi)
-        nonce = web3.eth.get_transaction_count(DEPLOYER_ADDRESS)
-        
-        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 2. Web3 Setup OK. Nonce: {nonce}. Deployer: {DEPLOYER_ADDRESS}")
-        
-        # --- 3. Determine Transaction Details ---
-        if action == 'complete':
-            recipient_address = contract_db.seller_address
-            contract_func = contract.functions.Deposit 
-            new_status = 'Completed'
-            print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 3. ACTION: COMPLETE (Deposit). Payout to Seller: {recipient_address}")
-
-        elif action == 'refund':
-            recipient_address = contract_db.buyer_address
-            contract_func = contract.functions.Refund 
-            new_status = 'Refunded'
-            print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 3. ACTION: REFUND. Payout to Buyer: {recipient_address}")
-            
-        else:
-            raise ValueError(f"Invalid contract action received: {action}")
-
-        # --- 4. Build and Sign Transaction ---
-        AMOUNT_TO_SEND = web3.to_wei(0.001, 'ether') # Placeholder for transaction execution
-        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 4. Building Tx data (Value: {web3.from_wei(AMOUNT_TO_SEND, 'ether')} ETH)")
-        
-        tx_data = contract_func(recipient_address).build_transaction({
-            'chainId': web3.eth.chain_id,
-            'from': DEPLOYER_ADDRESS, 
-            'nonce': nonce,
-            'value': AMOUNT_TO_SEND,
-            'gasPrice': web3.eth.gas_price, 
-            'gas': 2000000 
-        })
-        
-        signed_txn = web3.eth.account.sign_transaction(tx_data, private_key=DEPLOYER_PRIVATE_KEY)
-        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] -> Transaction signed successfully.")
-        
-        # --- 5. Send Transaction and Wait for Receipt ---
-        tx_hash = web3.eth.send_raw_transaction(signed_txn.raw_transaction)
-        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 5. Tx submitted to network. Hash: {tx_hash.hex()}")
-        
-        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] -> Waiting for transaction receipt...")
-        receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
-        
-        if receipt.status == 1:
-            print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 6. SUCCESS: Transaction confirmed on chain. Block: {receipt.blockNumber}")
-        else:
-            raise ContractLogicError(f"Transaction failed on-chain. Status: {receipt.status}")
-
-        # --- 7. Update Database Status ---
-        contract_db.status = new_status
-        contract_db.save()
-        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 7. DATABASE UPDATE: Contract ID {contract_id} status updated to {new_status}.")
-        
+        await run_db(jobs.enqueue_action, contract_id, action)
     except Contract.DoesNotExist:
-        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] ERROR: Contract ID {contract_id} not found in database.")
-    except ConnectionError as e:
-        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] CRITICAL ERROR: Web3 connection failed. Details: {e}")
-    except ContractLogicError as e:
-        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] ERROR: Solidity contract execution failed. Details: {e}")
+        logger.error("Contract ID %s not found in database.", contract_id)
+    except ValueError as e:
+        logger.error("%s", e)
     except Exception as e:
-        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] UNEXPECTED ERROR during contract action: {e}")
+        logger.exception("Unexpected error while queuing contract action: %s", e)
         
-    # --- 8. Final Redirect ---
-    print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] 8. Redirecting user back to active view.")
-    print(f"===================================================================")
     return HttpResponseRedirect(reverse('active'))
     
     
@@ -351,17 +178,126 @@ def process_contract_action(request, contract_id):
     
     
     
-def ongoing_view(request):
-    return render(request, 'dashboard/ongoing.html')
+@require_POST
+def bulk_import_view(request):
+    """
+    Creates contracts from an uploaded CSV (see dashboard/bulk.py) and shows
+    the per-row results. Deployment runs in the transaction worker.
+    """
+    upload = request.FILES.get('csv_file')
+    if upload is None:
+        logger.error("Bulk import without a file.")
+        return HttpResponseRedirect(reverse('active'))
+
+    try:
+        bulk_import = bulk.create_import(upload.read().decode('utf-8-sig'), source=upload.name)
+    except (UnicodeDecodeError, bulk.BulkImportError) as e:
+        logger.error("Bulk import of %s rejected: %s", upload.name, e)
+        return HttpResponseRedirect(reverse('active'))
+
+    try:
+        bulk.queue_import(bulk_import)
+    except Exception as e:
+        # The rows queued so far stay queued; the results page offers a resume.
+        bulk.record_failure(bulk_import, e)
+    return HttpResponseRedirect(reverse('bulk_import_detail', args=[bulk_import.import_id]))
+
+
+def bulk_import_detail_view(request, import_id):
+    """Per-row results of a bulk import. POST resumes an import that stopped."""
+    bulk_import = get_object_or_404(BulkImport, import_id=import_id)
+    if request.method == 'POST':
+        try:
+            bulk.queue_import(bulk_import)
+        except Exception as e:
+            bulk.record_failure(bulk_import, e)
+        return HttpResponseRedirect(reverse('bulk_import_detail', args=[import_id]))
+
+    results, counts = bulk.import_results(bulk_import)
+    return render(request, 'dashboard/bulk_import.html', {
+        'bulk_import': bulk_import,
+        'results': results,
+        'counts': sorted(counts.items()),
+    })
+
+
+@csrf_exempt
+@require_POST
+def ingest_readings_view(request):
+    """
+    Bulk telemetry ingest for sensor gateways (see dashboard/telemetry.py for
+    the formats). Authenticated with 'Authorization: Bearer <TELEMETRY_INGEST_TOKEN>'.
+    """
+    token = settings.TELEMETRY_INGEST_TOKEN
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not token or not hmac.compare_digest(supplied, token):
+        return JsonResponse({'error': 'Invalid or missing ingest token.'}, status=403)
+
+    try:
+        result = telemetry.ingest(request.body, request.content_type)
+    except telemetry.IngestError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(result)
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint for this process (see dashboard/metrics.py).
+    With METRICS_TOKEN set, scrapers send 'Authorization: Bearer <token>';
+    without one only logged-in staff users get the metrics.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        allowed = hmac.compare_digest(supplied, token)
+    else:
+        allowed = request.user.is_staff
+    if not allowed:
+        return HttpResponse('Invalid or missing metrics token.\n', status=403, content_type='text/plain')
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@require_GET
+def profiling_view(request):
+    """Rolling per-view query and render-time summary (see dashboard/profiling.py)."""
+    if not settings.PROFILING_ENABLED:
+        raise Http404("Profiling is disabled; set PROFILING_ENABLED=1.")
+    return render(request, 'dashboard/profiling.html', {
+        'rows': profiling.profile_summary.rows(),
+        'window': settings.PROFILING_WINDOW,
+    })
+
+
+def live_feed_unavailable_view(request):
+    """
+    The live feed needs the ASGI entry point (SolTrack/asgi.py). Under WSGI
+    (e.g. runserver) answer 204, which tells EventSource not to reconnect.
+    """
+    return HttpResponse(status=204)
+
+
+async def ongoing_view(request):
+    return await _arender(request, 'dashboard/ongoing.html')
 
 # In views.py
 
-def completed_view(request):
+def _completed_page(cursor):
+    # Most recently ended first
     try:
-        contracts_queryset = Contract.objects.filter(status='Completed').all()
+        return keyset_page(
+            Contract.objects.filter(status='Completed').only(*COMPLETED_LIST_FIELDS),
+            cursor,
+            descending=True,
+        )
     except Exception as e:
-        print(f"Database query error: {e}")
-        contracts_queryset = []
+        logger.error("Database query error: %s", e)
+        return [], None
+
+
+async def completed_view(request):
+    cursor = request.GET.get('after')
+    contracts_queryset, next_cursor = await run_db(_completed_page, cursor)
 
     completed_contracts = []
     
@@ -379,13 +315,87 @@ def completed_view(request):
         })
     
     context = {
-        'contracts': completed_contracts
+        'contracts': completed_contracts,
+        'cursor': cursor,
+        'next_cursor': next_cursor,
+        **fragments.card_cache_context(),
     }
     
-    return render(request, 'dashboard/completed.html', context)
+    return await _arender(request, 'dashboard/completed.html', context)
+
+def _alert_rows():
+    # At most ALERT_RING_SIZE incidents, open ones first (dashboard/incidents.py)
+    incidents = recent_incidents.snapshot()
+    contract_ids = {incident.contract_id for incident in incidents}
+    contracts = Contract.objects.only('product_name').in_bulk(contract_ids)
+    health = ContractHealth.objects.in_bulk([i.contract_id for i in incidents if i.is_open])
+    return incidents, contracts, health
 
-def alerts_view(request):
-    return render(request, 'dashboard/alerts.html')
 
-def analytics_view(request):
-    return render(request, 'dashboard/analytics.html')
+async def alerts_view(request):
+    incidents, contracts, health = await run_db(_alert_rows)
+    now = timezone.now()
+
+    alert_items = []
+    for incident in incidents:
+        contract_instance = contracts.get(incident.contract_id)
+        contract_health = health.get(incident.contract_id)
+        duration = (incident.ended_at or now) - incident.started_at
+        alert_items.append({
+            'incident': incident,
+            'product_name': contract_instance.product_name if contract_instance else '',
+            'current_temp': f"{contract_health.latest_temperature:.1f}°C" if contract_health else None,
+            'duration_minutes': int(duration.total_seconds() // 60),
+        })
+
+    context = {
+        'alerts': alert_items,
+        'open_count': sum(1 for incident in incidents if incident.is_open),
+    }
+    return await _arender(request, 'dashboard/alerts.html', context)
+
+def _analytics_rows():
+    # Contracts offered in the temperature history chart
+    history_contracts = list(Contract.objects.filter(status='Active').only(
+        'contract_id', 'product_name', 'end_date'
+    ).order_by('end_date', 'contract_id')[:50])
+
+    # Latest on-chain transfers, stored by 'manage.py index_transfers'
+    transfers = list(TransferEvent.objects.order_by('-block_number', '-log_index')[:20])
+    return history_contracts, transfers
+
+
+async def analytics_view(request):
+    history_contracts, transfers = await run_db(_analytics_rows)
+    recent_transfers = [{'event': event, 'value_eth': event.value / 10**18} for event in transfers]
+    return await _arender(request, 'dashboard/analytics.html', {
+        'history_contracts': history_contracts,
+        'recent_transfers': recent_transfers,
+    })
+
+
+@require_GET
+async def contract_history_view(request, contract_id):
+    """
+    Temperature history for one contract from the rollup tables. Defaults to
+    the contract's whole window (start_date to end_date); ?start= / ?end=
+    (ISO-8601) narrow it and ?points= caps the number of buckets.
+    """
+    contract = await run_db(Contract.objects.only('start_date', 'end_date').filter(contract_id=contract_id).first)
+    if contract is None:
+        return JsonResponse({'error': f"Contract {contract_id} not found."}, status=404)
+
+    try:
+        start = parse_datetime(request.GET['start']) if 'start' in request.GET else contract.start_date
+        end = parse_datetime(request.GET['end']) if 'end' in request.GET else contract.end_date
+        max_points = int(request.GET.get('points', rollups.DEFAULT_MAX_POINTS))
+    except ValueError:
+        start = None
+    if start is None or end is None or end <= start or max_points < 1:
+        return JsonResponse({'error': 'Invalid start, end or points.'}, status=400)
+    if timezone.is_naive(start) or timezone.is_naive(end):
+        return JsonResponse({'error': 'start and end need a UTC offset.'}, status=400)
+
+    result = await run_db(rollups.history, contract_id, start, end, max_points)
+    result.update(contract_id=contract_id, start=start.isoformat(), end=end.isoformat())
+    return JsonResponse(result)
@@ -0,0 +1,16 @@
+"""
+Gunicorn settings, picked up automatically when gunicorn starts from the
+project root.
+"""
+import os
+
+
+def post_worker_init(worker):
+    # Optional: build the per-process Web3 client and fetch chain_id before
+    # the first request instead of on it. Enable with CHAIN_WARMUP=1.
+    if os.getenv('CHAIN_WARMUP') == '1':
+        from dashboard.chain import warm_up
+        try:
+            warm_up()
+        except Exception as e:
+            worker.log.warning("Chain warm-up failed, will connect on first use: %s", e)
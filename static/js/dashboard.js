@@ -3,40 +3,25 @@
             document.querySelector('.sidebar').classList.toggle('show');
         }
 
-        // Update timestamp
+        // Update timestamp (called whenever the live feed delivers data)
         function updateTimestamp() {
-            const now = new Date();
-            document.getElementById('lastUpdated').textContent = now.toLocaleTimeString();
+            const lastUpdated = document.getElementById('lastUpdated');
+            if (lastUpdated) {
+                lastUpdated.textContent = new Date().toLocaleTimeString();
+            }
         }
-        
-        setInterval(updateTimestamp, 30000); // Update every 30 seconds
 
-        // Real-time temperature chart
+        // Real-time temperature chart, one line per contract seen on the live feed
+        const LIVE_CHART_COLORS = ['#22c55e', '#f59e0b', '#6366f1', '#ef4444', '#06b6d4'];
+        const LIVE_CHART_POINTS = 10;
+        let temperatureChart = null;
         const ctx = document.getElementById('temperatureChart')?.getContext('2d');
         if (ctx) {
-            const temperatureChart = new Chart(ctx, {
+            temperatureChart = new Chart(ctx, {
                 type: 'line',
                 data: {
-                    labels: ['12:00', '12:30', '13:00', '13:30', '14:00', '14:30', '15:00'],
-                    datasets: [{
-                        label: 'Sensor #001',
-                        data: [-1.2, -1.1, -1.3, -1.0, -1.2, -1.4, -1.2],
-                        borderColor: '#22c55e',
-                        backgroundColor: 'rgba(34, 197, 94, 0.1)',
-                        tension: 0.4
-                    }, {
-                        label: 'Sensor #002',
-                        data: [-8.1, -7.9, -8.2, -8.0, -8.1, -8.3, -8.1],
-                        borderColor: '#f59e0b',
-                        backgroundColor: 'rgba(245, 158, 11, 0.1)',
-                        tension: 0.4
-                    }, {
-                        label: 'Sensor #003',
-                        data: [-2.8, -2.7, -2.9, -2.6, -2.8, -3.0, -2.8],
-                        borderColor: '#6366f1',
-                        backgroundColor: 'rgba(99, 102, 241, 0.1)',
-                        tension: 0.4
-                    }]
+                    labels: [],
+                    datasets: []
                 },
                 options: {
                     responsive: true,
@@ -63,32 +48,128 @@
                     }
                 }
             });
+        }
 
-            // Simulate real-time updates
-            setInterval(() => {
-                const datasets = temperatureChart.data.datasets;
-                datasets.forEach(dataset => {
-                    // Add new random temperature reading
-                    const lastValue = dataset.data[dataset.data.length - 1];
-                    const newValue = lastValue + (Math.random() - 0.5) * 0.5;
-                    dataset.data.push(newValue);
-                    
-                    // Keep only last 10 data points
-                    if (dataset.data.length > 10) {
-                        dataset.data.shift();
+        function chartLiveReading(reading) {
+            if (!temperatureChart) {
+                return;
+            }
+            const label = `Contract #${reading.contract_id}`;
+            const datasets = temperatureChart.data.datasets;
+            let dataset = datasets.find(d => d.label === label);
+            if (!dataset) {
+                if (datasets.length >= LIVE_CHART_COLORS.length) {
+                    return;
+                }
+                const color = LIVE_CHART_COLORS[datasets.length];
+                dataset = {
+                    label: label,
+                    data: new Array(temperatureChart.data.labels.length).fill(null),
+                    borderColor: color,
+                    backgroundColor: color + '1a',
+                    spanGaps: true,
+                    tension: 0.4
+                };
+                datasets.push(dataset);
+            }
+
+            const timeLabel = new Date(reading.recorded_at).toLocaleTimeString([], {hour: '2-digit', minute: '2-digit', second: '2-digit'});
+            const labels = temperatureChart.data.labels;
+            if (labels[labels.length - 1] !== timeLabel) {
+                labels.push(timeLabel);
+                datasets.forEach(d => d.data.push(null));
+                // Keep only the last LIVE_CHART_POINTS points
+                if (labels.length > LIVE_CHART_POINTS) {
+                    labels.shift();
+                    datasets.forEach(d => d.data.shift());
+                }
+            }
+            dataset.data[dataset.data.length - 1] = reading.temperature;
+            temperatureChart.update('none');
+        }
+
+        // Contract temperature history (rollups via /dashboard/contract/<id>/history/)
+        const historyCanvas = document.getElementById('historyChart');
+        const historySelect = document.getElementById('historyContract');
+        if (historyCanvas && historySelect) {
+            const historyChart = new Chart(historyCanvas.getContext('2d'), {
+                type: 'line',
+                data: {
+                    labels: [],
+                    datasets: [{
+                        label: 'Max',
+                        data: [],
+                        borderColor: '#ef4444',
+                        pointRadius: 0,
+                        tension: 0.3
+                    }, {
+                        label: 'Average',
+                        data: [],
+                        borderColor: '#6366f1',
+                        backgroundColor: 'rgba(99, 102, 241, 0.1)',
+                        pointRadius: 0,
+                        tension: 0.3
+                    }, {
+                        label: 'Min',
+                        data: [],
+                        borderColor: '#06b6d4',
+                        pointRadius: 0,
+                        tension: 0.3
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    animation: false,
+                    plugins: {
+                        legend: {
+                            position: 'top'
+                        }
+                    },
+                    scales: {
+                        y: {
+                            beginAtZero: false,
+                            title: {
+                                display: true,
+                                text: 'Temperature (°C)'
+                            }
+                        }
                     }
-                });
-                
-                // Update labels
-                const now = new Date();
-                const timeLabel = now.toLocaleTimeString([], {hour: '2-digit', minute:'2-digit'});
-                temperatureChart.data.labels.push(timeLabel);
-                if (temperatureChart.data.labels.length > 10) {
-                    temperatureChart.data.labels.shift();
                 }
-                
-                temperatureChart.update('none');
-            }, 5000); // Update every 5 seconds
+            });
+
+            function loadHistory() {
+                const url = historySelect.selectedOptions[0]?.dataset.historyUrl;
+                if (!url) {
+                    return;
+                }
+                fetch(url)
+                    .then(response => response.json())
+                    .then(history => {
+                        const points = history.points || [];
+                        const hourly = history.resolution === '1h';
+                        historyChart.data.labels = points.map(p => {
+                            const t = new Date(p.t);
+                            return hourly
+                                ? t.toLocaleString([], {month: 'short', day: 'numeric', hour: '2-digit'})
+                                : t.toLocaleTimeString([], {hour: '2-digit', minute: '2-digit'});
+                        });
+                        historyChart.data.datasets[0].data = points.map(p => p.max);
+                        historyChart.data.datasets[1].data = points.map(p => p.avg);
+                        historyChart.data.datasets[2].data = points.map(p => p.min);
+                        historyChart.update('none');
+
+                        const note = document.getElementById('historyResolution');
+                        if (note) {
+                            note.textContent = points.length
+                                ? `${points.length} points, ${history.resolution} resolution`
+                                : 'No readings yet';
+                        }
+                    });
+            }
+
+            historySelect.addEventListener('change', loadHistory);
+            loadHistory();
         }
 
         // Performance chart
@@ -150,32 +231,103 @@
             });
         }
 
-        // Simulate real-time temperature updates
-        function updateSensorReadings() {
-            const sensors = document.querySelectorAll('[data-sensor]');
-            sensors.forEach(sensor => {
-                const currentTemp = parseFloat(sensor.textContent);
-                const variation = (Math.random() - 0.5) * 0.3;
-                const newTemp = (currentTemp + variation).toFixed(1);
-                sensor.textContent = newTemp + '°C';
-                
-                // Update status based on temperature
-                const statusBadge = sensor.parentNode.querySelector('.badge');
-                if (parseFloat(newTemp) < -8 || parseFloat(newTemp) > 2) {
-                    statusBadge.className = 'badge status-critical';
-                    statusBadge.innerHTML = '<i class="bi bi-exclamation-triangle me-1"></i>Critical';
-                } else if (parseFloat(newTemp) < -6 || parseFloat(newTemp) > 0) {
-                    statusBadge.className = 'badge status-warning';
-                    statusBadge.innerHTML = '<i class="bi bi-exclamation-circle me-1"></i>Warning';
-                } else {
-                    statusBadge.className = 'badge status-normal';
-                    statusBadge.innerHTML = '<i class="bi bi-check-circle me-1"></i>Normal';
+        // Apply a live reading to the contract cards on the page
+        function applyLiveReading(reading) {
+            document.querySelectorAll(`[data-live-temp="${reading.contract_id}"]`).forEach(el => {
+                el.textContent = reading.temperature.toFixed(1) + '°C';
+            });
+            document.querySelectorAll(`[data-live-status="${reading.contract_id}"]`).forEach(badge => {
+                const alerting = reading.state === 'alert';
+                if (alerting && badge.textContent.trim() !== 'Alert') {
+                    showNotification(`Contract #${reading.contract_id} temperature exceeded threshold`, 'danger');
                 }
+                badge.textContent = alerting ? 'Alert' : 'Active';
+                badge.classList.toggle('bg-warning', alerting);
+                badge.classList.toggle('bg-success', !alerting);
+            });
+        }
+
+        // Apply a contract status change (deployed, completed, refunded, failed)
+        function applyLiveContract(contract) {
+            document.querySelectorAll(`[data-live-address="${contract.contract_id}"] code`).forEach(el => {
+                el.textContent = contract.contract_address;
+            });
+            const cards = document.querySelectorAll(`[data-contract-card="${contract.contract_id}"]`);
+            if (cards.length && contract.status !== 'Active') {
+                showNotification(`Contract #${contract.contract_id} is now ${contract.status}`, 'info');
+                cards.forEach(card => card.remove());
+            }
+        }
+
+        // Live feed (Server-Sent Events from SolTrack/asgi.py)
+        const liveFeedUrl = document.body.dataset.liveFeedUrl;
+        if (liveFeedUrl && window.EventSource) {
+            const liveFeed = new EventSource(liveFeedUrl);
+            liveFeed.addEventListener('reading', (e) => {
+                const reading = JSON.parse(e.data);
+                applyLiveReading(reading);
+                chartLiveReading(reading);
+                updateTimestamp();
+            });
+            liveFeed.addEventListener('contract', (e) => {
+                applyLiveContract(JSON.parse(e.data));
+                updateTimestamp();
             });
         }
 
-        // Update sensor readings every 10 seconds
-        setInterval(updateSensorReadings, 10000);
+        // Contract changes (status, deployed address) from the JSON API.
+        // Polls with ?since= and If-None-Match, so an unchanged table costs a 304.
+        const contractList = document.querySelector('[data-contracts-api]');
+        if (contractList && window.fetch) {
+            const apiUrl = contractList.dataset.contractsApi;
+            let since = null;
+            let etag = null;
+
+            function applyContractChanges(data) {
+                if (data.reset) {
+                    window.location.reload();
+                    return;
+                }
+                let added = 0;
+                data.contracts.forEach(contract => {
+                    if (!document.querySelector(`[data-contract-card="${contract.contract_id}"]`)) {
+                        added += 1;
+                        return;
+                    }
+                    document.querySelectorAll(`[data-live-address="${contract.contract_id}"] code`).forEach(el => {
+                        el.textContent = contract.contract_address;
+                    });
+                });
+                data.removed.forEach(contractId => {
+                    document.querySelectorAll(`[data-contract-card="${contractId}"]`).forEach(card => card.remove());
+                });
+                if (added) {
+                    showNotification(`${added} new active contract${added > 1 ? 's' : ''} - refresh to see ${added > 1 ? 'them' : 'it'}`, 'info');
+                }
+            }
+
+            async function pollContracts() {
+                const url = since ? `${apiUrl}?since=${encodeURIComponent(since)}` : apiUrl;
+                try {
+                    const response = await fetch(url, { headers: etag ? { 'If-None-Match': etag } : {} });
+                    if (response.status === 200) {
+                        etag = response.headers.get('ETag');
+                        const data = await response.json();
+                        // The first response is the page already rendered; only its token is needed.
+                        if (since) {
+                            applyContractChanges(data);
+                            updateTimestamp();
+                        }
+                        since = data.since;
+                    }
+                } catch (e) {
+                    console.warn('Contract poll failed', e);
+                }
+            }
+
+            pollContracts();
+            setInterval(pollContracts, 10000);
+        }
 
         // Clear all alerts function
         function clearAllAlerts() {
@@ -228,15 +380,3 @@
                 notification.remove();
             }, 5000);
         }
-
-        // Simulate random notifications
-        setInterval(() => {
-            const messages = [
-                'Sensor #001 reading updated',
-                'New shipment tracking initiated',
-                'Temperature threshold maintained',
-                'Blockchain transaction confirmed'
-            ];
-            const randomMessage = messages[Math.floor(Math.random() * messages.length)];
-            showNotification(randomMessage, 'success');
-        }, 30000);
\ No newline at end of file